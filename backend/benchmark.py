@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(os.path.dirname(BACKEND_DIR), 'benchmarks', 'baseline.json')
+SCENARIOS = ('high_rate', 'connect_storm', 'permission_churn')
+PARAM_KEYS = ('clients', 'rate', 'format', 'duration', 'warmup', 'churn_interval', 'client_procs', 'server_mode')
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+def summarize(values):
+    return {
+        'samples': len(values),
+        'p50': percentile(values, 0.5),
+        'p90': percentile(values, 0.9),
+        'p99': percentile(values, 0.99),
+        'max': round(max(values), 3) if values else None
+    }
+
+def read_process_stats(pid):
+    stats = {}
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        stats['cpu_seconds'] = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS'):
+                    stats['rss_kb'] = int(line.split()[1])
+    except (OSError, IndexError, ValueError):
+        pass
+    return stats
+
+def scrape_metrics(url):
+    values = {}
+    try:
+        text = urllib.request.urlopen(url + '/metrics', timeout=5).read().decode('utf-8')
+    except OSError:
+        return values
+    for line in text.splitlines():
+        if line.startswith('#') or '{' in line:
+            continue
+        name, _, value = line.partition(' ')
+        try:
+            values[name] = float(value)
+        except ValueError:
+            pass
+    return values
+
+def run_server(args):
+    sys.path.insert(0, BACKEND_DIR)
+    from flask_server import run_flask_server, set_serial_reader
+    from serial_reader import SerialReader
+
+    reader = SerialReader(port=args.serial, baudrate=args.baudrate)
+    set_serial_reader(reader)
+    reader.start()
+    run_flask_server(host='127.0.0.1', port=args.port, server_mode=args.server_mode)
+
+def run_clients(args):
+    import socketio
+
+    epoch = args.epoch
+    start_ms = (args.start_at - epoch) * 1000.0
+    stop_ms = (args.stop_at - epoch) * 1000.0
+    latencies = []
+    received = [set() for _ in range(args.count)]
+    connect_ms = []
+    permissions = [0]
+    failures = [0]
+    clients = []
+
+    def make_client(i):
+        client = socketio.Client(reconnection=False)
+
+        def on_update(data):
+            now_ms = (time.time() - epoch) * 1000.0
+            frame_ms = data.get('time') if isinstance(data, dict) else None
+            if frame_ms is None or not (start_ms <= frame_ms < stop_ms):
+                return
+            latencies.append(now_ms - frame_ms)
+            received[i].add(frame_ms)
+
+        def on_permissions(_):
+            permissions[0] += 1
+
+        client.on('data_update', on_update)
+        client.on('widget_permissions', on_permissions)
+        started = time.monotonic()
+        try:
+            client.connect(args.url, auth={'id': f"{args.prefix}{i}"}, transports=['websocket'], wait_timeout=30)
+        except Exception:
+            failures[0] += 1
+            return
+        connect_ms.append((time.monotonic() - started) * 1000.0)
+        clients.append(client)
+
+    threads = []
+    for i in range(args.count):
+        t = threading.Thread(target=make_client, args=(i,), daemon=True)
+        t.start()
+        threads.append(t)
+        if args.ramp:
+            time.sleep(args.ramp)
+    for t in threads:
+        t.join(timeout=60)
+
+    time.sleep(max(0.0, args.stop_at - time.time()) + args.grace)
+    for client in clients:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+    json.dump({
+        'connected': len(clients),
+        'failures': failures[0],
+        'connect_ms': connect_ms,
+        'latency_ms': latencies,
+        'received': [len(r) for r in received],
+        'permission_events': permissions[0]
+    }, sys.stdout)
+
+def wait_for_server(url, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url + '/metrics', timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def churn_permissions(url, stop_at, interval):
+    import socketio
+    from flask_server import AVAILABLE_WIDGETS
+
+    admin = socketio.Client(reconnection=False)
+    admin.connect(url, auth={'id': 'BENCH_ADMIN', 'admin_secret': 'benchmark'}, transports=['websocket'])
+    changes = 0
+    full = list(AVAILABLE_WIDGETS)
+    while time.time() < stop_at:
+        widgets = full if changes % 2 else full[:max(1, len(full) // 2)]
+        admin.emit('update_global_widgets', widgets)
+        changes += 1
+        time.sleep(interval)
+    admin.emit('update_global_widgets', full)
+    time.sleep(0.2)
+    admin.disconnect()
+    return changes
+
+def run_scenario(name, args, port):
+    sys.path.insert(0, BACKEND_DIR)
+    from pty_device import PtyDevice
+
+    url = f"http://127.0.0.1:{port}"
+    epoch = time.time()
+    device = PtyDevice(rate_hz=args.rate, frame_format=args.format, epoch=epoch)
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'serve', '--port', str(port), '--serial', device.port, '--server-mode', args.server_mode],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {'scenario': name, 'clients': args.clients, 'rate_hz': args.rate, 'format': args.format, 'server_mode': args.server_mode}
+    try:
+        if not wait_for_server(url):
+            result['error'] = 'servidor nao respondeu'
+            return result
+        device.start()
+        time.sleep(args.warmup)
+        idle = read_process_stats(server.pid)
+
+        ramp = 0.0 if name == 'connect_storm' else min(0.01, 2.0 / max(1, args.clients))
+        setup = args.clients * ramp + 5.0
+        start_at = time.time() + setup
+        stop_at = start_at + args.duration
+
+        per_proc = [args.clients // args.client_procs + (1 if i < args.clients % args.client_procs else 0) for i in range(args.client_procs)]
+        workers = []
+        for i, count in enumerate(c for c in per_proc if c):
+            workers.append(subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), 'clients', '--url', url, '--count', str(count), '--prefix', f"bench{i}_",
+                 '--epoch', repr(epoch), '--start-at', repr(start_at), '--stop-at', repr(stop_at), '--ramp', repr(ramp), '--grace', repr(args.grace)],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            ))
+
+        churn = None
+        if name == 'permission_churn':
+            churn_result = {}
+            def churn_target():
+                time.sleep(max(0.0, start_at - time.time()))
+                churn_result['changes'] = churn_permissions(url, stop_at, args.churn_interval)
+            churn = threading.Thread(target=churn_target, daemon=True)
+            churn.start()
+
+        time.sleep(max(0.0, start_at - time.time()))
+        metrics_start = scrape_metrics(url)
+        cpu_start = read_process_stats(server.pid)
+        time.sleep(max(0.0, stop_at - time.time()))
+        cpu_stop = read_process_stats(server.pid)
+        metrics_stop = scrape_metrics(url)
+
+        reports = []
+        for worker in workers:
+            out, _ = worker.communicate(timeout=120)
+            try:
+                reports.append(json.loads(out))
+            except ValueError:
+                reports.append({'connected': 0, 'failures': 0, 'connect_ms': [], 'latency_ms': [], 'received': [], 'permission_events': 0})
+        if churn:
+            churn.join(timeout=10)
+            result['permission_changes'] = churn_result.get('changes', 0)
+            result['permission_events'] = sum(r['permission_events'] for r in reports)
+
+        start_ms = (start_at - epoch) * 1000.0
+        stop_ms = (stop_at - epoch) * 1000.0
+        expected = device.count_sent(start_ms, stop_ms)
+        received = [n for r in reports for n in r['received']]
+        dropped = [max(0, expected - n) for n in received]
+        latencies = [v for r in reports for v in r['latency_ms']]
+        connect_ms = [v for r in reports for v in r['connect_ms']]
+        frames_read = metrics_stop.get('spark_frames_total', 0) - metrics_start.get('spark_frames_total', 0)
+
+        result.update({
+            'duration_s': args.duration,
+            'connected': sum(r['connected'] for r in reports),
+            'connect_failures': sum(r['failures'] for r in reports),
+            'connect_ms': summarize(connect_ms),
+            'ingest': {
+                'frames_sent': expected,
+                'frames_read': frames_read,
+                'frames_per_sec': round(frames_read / args.duration, 1),
+                'bytes_per_sec': round((metrics_stop.get('spark_bytes_total', 0) - metrics_start.get('spark_bytes_total', 0)) / args.duration, 1),
+                'decode_errors': metrics_stop.get('spark_decode_errors_total', 0) - metrics_start.get('spark_decode_errors_total', 0)
+            },
+            'latency_ms': summarize(latencies),
+            'dropped_frames': {
+                'total': sum(dropped),
+                'per_client_mean': round(sum(dropped) / len(dropped), 1) if dropped else None,
+                'ratio': round(sum(dropped) / (expected * len(dropped)), 4) if dropped and expected else None
+            },
+            'server': {
+                'cpu_percent': round((cpu_stop.get('cpu_seconds', 0) - cpu_start.get('cpu_seconds', 0)) / args.duration * 100.0, 1),
+                'rss_kb_idle': idle.get('rss_kb'),
+                'rss_kb_loaded': cpu_stop.get('rss_kb'),
+                'rss_kb_per_client': round((cpu_stop.get('rss_kb', 0) - idle.get('rss_kb', 0)) / max(1, args.clients), 1)
+            }
+        })
+        return result
+    finally:
+        server.kill()
+        server.wait()
+        device.stop()
+
+def get_version():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(args):
+    if not sys.platform.startswith('linux'):
+        raise SystemExit("O benchmark so roda no Linux (usa os.openpty e /proc)")
+    scenarios = args.scenario or list(SCENARIOS)
+    results = {
+        'version': get_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'params': {key: getattr(args, key) for key in PARAM_KEYS},
+        'scenarios': []
+    }
+    for i, name in enumerate(scenarios):
+        print(f"Executando cenario {name} ({args.clients} clientes, {args.rate} Hz, {args.format})...")
+        result = run_scenario(name, args, args.port + i)
+        results['scenarios'].append(result)
+        print(json.dumps({k: result.get(k) for k in ('scenario', 'connected', 'latency_ms', 'dropped_frames', 'server')}))
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados salvos em {args.output}")
+
+def get_run_params(results):
+    params = dict(results.get('params') or {})
+    if results.get('scenarios'):
+        first = results['scenarios'][0]
+        for key, name in (('clients', 'clients'), ('rate', 'rate_hz'), ('format', 'format'), ('duration', 'duration_s'), ('server_mode', 'server_mode')):
+            if key not in params and name in first:
+                params[key] = first[name]
+    params['cpu_count'] = results.get('cpu_count')
+    return params
+
+def find_param_mismatches(baseline, candidate):
+    a, b = get_run_params(baseline), get_run_params(candidate)
+    return [(key, a[key], b[key]) for key in sorted(a.keys() & b.keys()) if a[key] != b[key]]
+
+def compare_results(args):
+    if len(args.files) > 2:
+        raise SystemExit("compare recebe no maximo dois arquivos: [baseline] candidato")
+    baseline_path, candidate_path = args.files if len(args.files) == 2 else (BASELINE_PATH, args.files[0])
+    print(f"Comparando {candidate_path} com {baseline_path}")
+    with open(baseline_path) as f:
+        baseline_results = json.load(f)
+    with open(candidate_path) as f:
+        candidate_results = json.load(f)
+
+    mismatches = find_param_mismatches(baseline_results, candidate_results)
+    for key, a, b in mismatches:
+        print(f"Aviso: parametro {key} difere ({a} na baseline, {b} no candidato)")
+    if mismatches and not args.force:
+        raise SystemExit("Os resultados usam parametros diferentes; repita o run com os parametros da baseline ou use --force")
+
+    baseline = {s['scenario']: s for s in baseline_results['scenarios']}
+    candidate = {s['scenario']: s for s in candidate_results['scenarios']}
+
+    metrics = [
+        ('latency p50 (ms)', lambda s: s['latency_ms']['p50']),
+        ('latency p99 (ms)', lambda s: s['latency_ms']['p99']),
+        ('frames/s lidos', lambda s: s['ingest']['frames_per_sec']),
+        ('frames perdidos (razao)', lambda s: s['dropped_frames']['ratio']),
+        ('cpu servidor (%)', lambda s: s['server']['cpu_percent']),
+        ('rss por cliente (kB)', lambda s: s['server']['rss_kb_per_client'])
+    ]
+    for name in baseline:
+        if name not in candidate:
+            continue
+        print(f"== {name}")
+        for label, getter in metrics:
+            try:
+                a, b = getter(baseline[name]), getter(candidate[name])
+            except (KeyError, TypeError):
+                continue
+            change = f"{(b - a) / a * 100.0:+.1f}%" if a and b is not None else '-'
+            print(f"  {label:26s} {a!s:>10} -> {b!s:>10}  {change}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark de ingestao e fan-out do SPARK',
+        epilog='Somente Linux: o dispositivo simulado usa os.openpty e as medidas de CPU/RSS leem /proc.'
+    )
+    sub = parser.add_subparsers(dest='command')
+
+    run = sub.add_parser('run', help='Executa os cenarios (somente Linux)')
+    run.add_argument('--scenario', action='append', choices=SCENARIOS)
+    run.add_argument('--clients', type=int, default=20)
+    run.add_argument('--client-procs', type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    run.add_argument('--rate', type=float, default=100.0)
+    run.add_argument('--format', choices=('json', 'binary'), default='json')
+    run.add_argument('--duration', type=float, default=8.0)
+    run.add_argument('--warmup', type=float, default=1.0)
+    run.add_argument('--churn-interval', type=float, default=0.5)
+    run.add_argument('--grace', type=float, default=2.0)
+    run.add_argument('--server-mode', default='threading')
+    run.add_argument('--port', type=int, default=8600)
+    run.add_argument('--output', default='benchmark_results.json')
+
+    serve = sub.add_parser('serve')
+    serve.add_argument('--port', type=int, required=True)
+    serve.add_argument('--serial', required=True)
+    serve.add_argument('--baudrate', type=int, default=115200)
+    serve.add_argument('--server-mode', default='threading')
+
+    clients = sub.add_parser('clients')
+    clients.add_argument('--url', required=True)
+    clients.add_argument('--count', type=int, required=True)
+    clients.add_argument('--prefix', default='bench_')
+    clients.add_argument('--epoch', type=float, required=True)
+    clients.add_argument('--start-at', type=float, required=True)
+    clients.add_argument('--stop-at', type=float, required=True)
+    clients.add_argument('--ramp', type=float, default=0.0)
+    clients.add_argument('--grace', type=float, default=2.0)
+
+    compare = sub.add_parser('compare', help=f"Compara dois resultados; com um so arquivo usa {os.path.relpath(BASELINE_PATH, os.path.dirname(BACKEND_DIR))}")
+    compare.add_argument('files', nargs='+', metavar='arquivo', help='[baseline] candidato')
+    compare.add_argument('--force', action='store_true', help='Compara mesmo com parametros de execucao diferentes')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        run_server(args)
+    elif args.command == 'clients':
+        run_clients(args)
+    elif args.command == 'compare':
+        compare_results(args)
+    elif args.command == 'run':
+        run_benchmark(args)
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
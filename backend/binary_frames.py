@@ -0,0 +1,167 @@
+import binascii
+import struct
+import numpy as np
+
+FORMAT_JSON = 'json'
+FORMAT_BINARY = 'binary'
+FORMAT_AUTO = 'auto'
+
+FRAME_DELIMITERS = {
+    FORMAT_JSON: b'\n',
+    FORMAT_BINARY: b'\x00'
+}
+
+BATCH_MIN_FRAMES = 4
+DETECT_MIN_FRAMES = 3
+
+_NUMPY_CODES = {'B': 'u1', 'H': 'u2', 'I': 'u4', 'i': 'i4', 'f': 'f4', 'd': 'f8'}
+
+class FrameSchema:
+    def __init__(self, schema_id, fields):
+        self.schema_id = schema_id
+        self.names = [name for name, _, _ in fields]
+        self.decimals = [decimals for _, _, decimals in fields]
+        self.struct = struct.Struct('<' + ''.join(code for _, code, _ in fields))
+        self.size = self.struct.size
+        self.dtype = np.dtype([(name, '<' + _NUMPY_CODES[code]) for name, code, _ in fields])
+
+    def unpack(self, record):
+        values = self.struct.unpack(record)
+        return {
+            name: (round(value, decimals) if decimals is not None else value)
+            for name, value, decimals in zip(self.names, values, self.decimals)
+        }
+
+    def unpack_many(self, records):
+        array = np.frombuffer(records, dtype=self.dtype)
+        columns = []
+        for name, decimals in zip(self.names, self.decimals):
+            column = array[name]
+            if decimals is not None:
+                column = np.round(column.astype(np.float64), decimals)
+            columns.append(column.tolist())
+        return [dict(zip(self.names, row)) for row in zip(*columns)]
+
+    def pack(self, data):
+        return self.struct.pack(*(data.get(name, 0) for name in self.names))
+
+TELEMETRY_SCHEMA_V1 = FrameSchema(1, [
+    ('time', 'I', None),
+    ('status', 'B', None),
+    ('pressure', 'f', 4),
+    ('temperature', 'f', 2),
+    ('bmp_altitude', 'f', 2),
+    ('max_altitude', 'f', 2),
+    ('accel_x', 'f', 4),
+    ('accel_y', 'f', 4),
+    ('accel_z', 'f', 4),
+    ('rotation_x', 'f', 2),
+    ('rotation_y', 'f', 2),
+    ('rotation_z', 'f', 2),
+    ('latitude', 'd', 6),
+    ('longitude', 'd', 6),
+    ('gps_altitude', 'f', 2),
+    ('voltage', 'f', 2)
+])
+
+SCHEMAS = {
+    TELEMETRY_SCHEMA_V1.schema_id: TELEMETRY_SCHEMA_V1
+}
+
+class FrameError(ValueError):
+    pass
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+def cobs_encode(data):
+    out = bytearray()
+    for piece in bytes(data).split(b'\x00'):
+        while len(piece) >= 0xFE:
+            out.append(0xFF)
+            out += piece[:0xFE]
+            piece = piece[0xFE:]
+        out.append(len(piece) + 1)
+        out += piece
+    return bytes(out)
+
+def cobs_decode(data):
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        code = data[i]
+        end = i + code
+        if code == 0 or end > n:
+            raise FrameError("Bloco COBS invalido")
+        out += data[i + 1:end]
+        i = end
+        if code != 0xFF and i < n:
+            out.append(0)
+    return bytes(out)
+
+def encode_frame(data, schema=TELEMETRY_SCHEMA_V1):
+    payload = bytes([schema.schema_id]) + schema.pack(data)
+    payload += crc16(payload).to_bytes(2, 'big')
+    return cobs_encode(payload) + FRAME_DELIMITERS[FORMAT_BINARY]
+
+def unwrap_frame(frame):
+    payload = cobs_decode(frame)
+    if len(payload) < 3:
+        raise FrameError("Frame binario curto demais")
+    body = payload[:-2]
+    if crc16(body) != int.from_bytes(payload[-2:], 'big'):
+        raise FrameError("CRC invalido")
+    schema = SCHEMAS.get(body[0])
+    if schema is None:
+        raise FrameError(f"Schema desconhecido: {body[0]}")
+    record = body[1:]
+    if len(record) != schema.size:
+        raise FrameError(f"Tamanho invalido para schema {schema.schema_id}: {len(record)}")
+    return schema, record
+
+def decode_frame(frame):
+    schema, record = unwrap_frame(frame)
+    return schema.unpack(record)
+
+def decode_frames(frames):
+    groups = {}
+    errors = 0
+    for frame in frames:
+        try:
+            schema, record = unwrap_frame(frame)
+        except FrameError:
+            errors += 1
+            continue
+        groups.setdefault(schema.schema_id, (schema, []))[1].append(record)
+
+    samples = []
+    for schema, records in groups.values():
+        if len(records) >= BATCH_MIN_FRAMES:
+            samples.extend(schema.unpack_many(b''.join(records)))
+        else:
+            samples.extend(schema.unpack(record) for record in records)
+    return samples, errors
+
+def _complete_frames(buffer, delimiter, count):
+    frames = [frame for frame in bytes(buffer).split(delimiter)[1:-1] if frame.strip()]
+    return frames[-count:] if len(frames) >= count else None
+
+def _looks_like_json(frame):
+    line = frame.strip()
+    return line.startswith(b'{') and line.endswith(b'}') and b'\x00' not in line
+
+def detect_format(buffer, min_frames=DETECT_MIN_FRAMES):
+    frames = _complete_frames(buffer, FRAME_DELIMITERS[FORMAT_BINARY], min_frames)
+    if frames is not None:
+        try:
+            for frame in frames:
+                unwrap_frame(frame)
+            return FORMAT_BINARY
+        except FrameError:
+            pass
+
+    frames = _complete_frames(buffer, FRAME_DELIMITERS[FORMAT_JSON], min_frames)
+    if frames is not None and all(_looks_like_json(frame) for frame in frames):
+        return FORMAT_JSON
+    return None
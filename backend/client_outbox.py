@@ -0,0 +1,55 @@
+import time
+
+DEFAULT_MAX_PENDING = 8
+
+class ClientOutbox:
+    def __init__(self, sid, eio_socket=None, max_pending=DEFAULT_MAX_PENDING):
+        self.sid = sid
+        self.eio_socket = eio_socket
+        self.max_pending = max_pending
+        self.pending = None
+        self.sent = 0
+        self.held = 0
+        self.coalesced = 0
+        self.last_delivery = time.monotonic()
+
+    def depth(self):
+        queue = getattr(self.eio_socket, 'queue', None)
+        return queue.qsize() if queue is not None else 0
+
+    def congested(self):
+        return self.depth() >= self.max_pending
+
+    def hold(self, item):
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = item
+        self.held += 1
+
+    def take(self):
+        item, self.pending = self.pending, None
+        return item
+
+    def discard_pending(self):
+        if self.pending is not None:
+            self.pending = None
+            self.coalesced += 1
+
+    def delivered(self, now=None):
+        self.sent += 1
+        self.last_delivery = time.monotonic() if now is None else now
+
+    def get_lag(self, now=None):
+        if self.pending is None:
+            return 0.0
+        return (time.monotonic() if now is None else now) - self.last_delivery
+
+    def get_stats(self, now=None):
+        return {
+            'queue_depth': self.depth(),
+            'pending': self.pending is not None,
+            'sent': self.sent,
+            'held': self.held,
+            'coalesced': self.coalesced,
+            'lag_ms': round(self.get_lag(now) * 1000.0, 1)
+        }
@@ -0,0 +1,102 @@
+import threading
+
+class ClientRegistry:
+    def __init__(self):
+        self._clients = {}
+        self._groups = {}
+        self._by_id = {}
+        self._by_type = {}
+        self._by_group = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, sid):
+        return sid in self._clients
+
+    def get(self, sid):
+        return self._clients.get(sid)
+
+    def add(self, sid, info):
+        with self._lock:
+            if sid in self._clients:
+                self._remove(sid)
+            self._clients[sid] = info
+            self._by_id.setdefault(info['id'], set()).add(sid)
+            self._by_type.setdefault(info['type'], set()).add(sid)
+
+    def update(self, sid, **changes):
+        with self._lock:
+            info = self._clients.get(sid)
+            if info is not None:
+                info.update(changes)
+            return info
+
+    def remove(self, sid):
+        with self._lock:
+            if sid not in self._clients:
+                return None, None
+            return self._remove(sid)
+
+    def _remove(self, sid):
+        info = self._clients.pop(sid)
+        group = self._groups.pop(sid, None)
+        _discard(self._by_id, info['id'], sid)
+        _discard(self._by_type, info['type'], sid)
+        if group is not None:
+            _discard(self._by_group, group, sid)
+        return info, group
+
+    def set_group(self, sid, group):
+        with self._lock:
+            if sid not in self._clients:
+                return False, None
+            previous = self._groups.get(sid)
+            if previous == group:
+                return False, previous
+            if previous is not None:
+                _discard(self._by_group, previous, sid)
+            self._groups[sid] = group
+            self._by_group.setdefault(group, set()).add(sid)
+            return True, previous
+
+    def group_of(self, sid):
+        return self._groups.get(sid)
+
+    def sids(self):
+        with self._lock:
+            return list(self._clients)
+
+    def items(self):
+        with self._lock:
+            return list(self._clients.items())
+
+    def sids_for_id(self, client_id):
+        with self._lock:
+            return list(self._by_id.get(client_id, ()))
+
+    def sids_of_type(self, client_type):
+        with self._lock:
+            return list(self._by_type.get(client_type, ()))
+
+    def sids_in_group(self, group):
+        with self._lock:
+            return list(self._by_group.get(group, ()))
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'ids': len(self._by_id),
+                'types': {t: len(s) for t, s in self._by_type.items()},
+                'groups': {g: len(s) for g, s in self._by_group.items()}
+            }
+
+def _discard(index, key, sid):
+    members = index.get(key)
+    if members is None:
+        return
+    members.discard(sid)
+    if not members:
+        del index[key]
@@ -0,0 +1,91 @@
+import threading
+
+class ClientRoster:
+    def __init__(self):
+        self.version = 0
+        self.entries = {}
+        self.remote = {}
+        self.deltas = 0
+        self.snapshots = 0
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def mark(self, *sids):
+        with self._lock:
+            self._dirty.update(sids)
+
+    def mark_all(self, sids):
+        with self._lock:
+            self._dirty.update(sids)
+            self._dirty.update(self.entries)
+
+    def collect(self, build):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            added = []
+            changed = []
+            removed = []
+            for sid in dirty:
+                entry = build(sid)
+                previous = self.entries.get(sid)
+                if entry is None:
+                    if previous is not None:
+                        del self.entries[sid]
+                        removed.append(sid)
+                elif previous is None:
+                    self.entries[sid] = entry
+                    added.append(entry)
+                elif entry != previous:
+                    self.entries[sid] = entry
+                    changed.append(entry)
+            if not (added or changed or removed):
+                return None
+            self.version += 1
+            self.deltas += 1
+            return {'version': self.version, 'added': added, 'changed': changed, 'removed': removed}
+
+    def apply_remote(self, worker, added=(), changed=(), removed=()):
+        with self._lock:
+            entries = self.remote.setdefault(worker, {})
+            updates = [dict(entry, worker=worker) for entry in list(added) + list(changed)]
+            added = [entry for entry in updates if entry['sid'] not in entries]
+            changed = [entry for entry in updates if entry['sid'] in entries and entries[entry['sid']] != entry]
+            for entry in updates:
+                entries[entry['sid']] = entry
+            removed = [sid for sid in removed if entries.pop(sid, None) is not None]
+            if not entries:
+                self.remote.pop(worker, None)
+            if not (added or changed or removed):
+                return None
+            self.version += 1
+            self.deltas += 1
+            return {'version': self.version, 'added': added, 'changed': changed, 'removed': removed}
+
+    def drop_remote(self, worker):
+        with self._lock:
+            sids = list(self.remote.get(worker, ()))
+        return self.apply_remote(worker, removed=sids)
+
+    def snapshot(self):
+        with self._lock:
+            self.snapshots += 1
+            clients = list(self.entries.values())
+            for entries in self.remote.values():
+                clients.extend(entries.values())
+            return {'version': self.version, 'clients': clients}
+
+    def count_by_worker(self, local):
+        with self._lock:
+            counts = {worker: len(entries) for worker, entries in self.remote.items()}
+            counts[local] = len(self.entries)
+            return counts
+
+    def get_stats(self):
+        return {
+            'version': self.version,
+            'clients': len(self.entries),
+            'remote_clients': sum(len(entries) for entries in self.remote.values()),
+            'pending': len(self._dirty),
+            'deltas': self.deltas,
+            'snapshots': self.snapshots
+        }
@@ -0,0 +1,89 @@
+import itertools
+import threading
+import time
+
+STREAM_FULL = 'full'
+STREAM_DELTA = 'delta'
+
+_stream_ids = itertools.count(1)
+
+FIELD_EPSILON = {
+    'pressure': 0.001,
+    'temperature': 0.01,
+    'bmp_altitude': 0.01,
+    'max_altitude': 0.01,
+    'accel_x': 0.0005,
+    'accel_y': 0.0005,
+    'accel_z': 0.0005,
+    'rotation_x': 0.01,
+    'rotation_y': 0.01,
+    'rotation_z': 0.01,
+    'latitude': 0.0000005,
+    'longitude': 0.0000005,
+    'gps_altitude': 0.01,
+    'voltage': 0.005
+}
+
+class DeltaEncoder:
+    def __init__(self, keyframe_interval=100, keyframe_seconds=2.0, epsilon=None):
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_seconds = keyframe_seconds
+        self.epsilon = FIELD_EPSILON if epsilon is None else epsilon
+        self.stream_id = next(_stream_ids)
+        self.state = {}
+        self.seq = 0
+        self.frames_since_key = 0
+        self.last_key_time = 0.0
+        self.keyframes = 0
+        self.deltas = 0
+        self.fields_sent = 0
+        self.fields_total = 0
+        self._lock = threading.Lock()
+
+    def _changed(self, key, value):
+        if key not in self.state:
+            return True
+        previous = self.state[key]
+        eps = self.epsilon.get(key, 0)
+        if eps and isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+            return abs(value - previous) > eps
+        return value != previous
+
+    def encode(self, data):
+        with self._lock:
+            now = time.monotonic()
+            self.fields_total += len(data)
+            if (self.frames_since_key >= self.keyframe_interval or now - self.last_key_time >= self.keyframe_seconds):
+                self.state.update(data)
+                return self._keyframe(now)
+
+            changes = {key: value for key, value in data.items() if self._changed(key, value)}
+            if not changes:
+                return None
+            self.state.update(changes)
+            self.seq += 1
+            self.frames_since_key += 1
+            self.deltas += 1
+            self.fields_sent += len(changes)
+            return {'stream': self.stream_id, 'seq': self.seq, 'key': False, 'data': changes}
+
+    def _keyframe(self, now):
+        self.seq += 1
+        self.frames_since_key = 0
+        self.last_key_time = now
+        self.keyframes += 1
+        self.fields_sent += len(self.state)
+        return {'stream': self.stream_id, 'seq': self.seq, 'key': True, 'data': dict(self.state)}
+
+    def snapshot(self):
+        with self._lock:
+            return {'stream': self.stream_id, 'seq': self.seq, 'key': True, 'data': dict(self.state)}
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'seq': self.seq,
+                'keyframes': self.keyframes,
+                'deltas': self.deltas,
+                'field_ratio': round(self.fields_sent / self.fields_total, 3) if self.fields_total else 1.0
+            }
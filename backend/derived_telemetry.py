@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+RESET_GAP_MS = 5000
+KALMAN_JERK_NOISE = 500.0
+KALMAN_ALTITUDE_NOISE = 1.0
+LAUNCH_VELOCITY = 15.0
+LAUNCH_ACCELERATION = 20.0
+BURNOUT_ACCELERATION = 0.0
+CONFIRM_SAMPLES = 3
+BATTERY_WINDOW_MS = 30000
+BATTERY_MIN_SPAN_MS = 5000
+DERIVED_DECIMALS = 3
+
+PHASE_GROUND = 0
+PHASE_POWERED = 1
+PHASE_COAST = 2
+PHASE_DESCENT = 3
+
+ALTITUDE_FIELDS = ['filtered_altitude', 'vertical_velocity', 'vertical_acceleration', 'flight_phase', 'apogee_altitude', 'apogee_time', 'burnout_time']
+GPS_FIELDS = ['track_distance', 'ground_range']
+BATTERY_FIELDS = ['battery_rate']
+DERIVED_FIELDS = ALTITUDE_FIELDS + GPS_FIELDS + BATTERY_FIELDS
+INPUT_FIELDS = ['time', 'bmp_altitude', 'latitude', 'longitude', 'voltage']
+NUMERIC_TYPES = (int, float)
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _columns(samples, names):
+    values = np.full((len(names), len(samples)), np.nan)
+    for i, sample in enumerate(samples):
+        for j, name in enumerate(names):
+            value = sample.get(name)
+            if type(value) in NUMERIC_TYPES:
+                values[j, i] = value
+    return values
+
+def _round(value):
+    return None if value is None else round(value, DERIVED_DECIMALS)
+
+class AltitudeKalman:
+    def __init__(self, jerk_noise=KALMAN_JERK_NOISE, altitude_noise=KALMAN_ALTITUDE_NOISE):
+        self.q = jerk_noise
+        self.r = altitude_noise
+        self.reset()
+
+    def reset(self):
+        self.ready = False
+        self.h = self.v = self.a = 0.0
+        self.p00 = self.p01 = self.p02 = self.p11 = self.p12 = self.p22 = 0.0
+
+    def step(self, z, dt):
+        if not self.ready:
+            self.h, self.v, self.a = z, 0.0, 0.0
+            self.p00, self.p11, self.p22 = self.r, 100.0, 100.0
+            self.p01 = self.p02 = self.p12 = 0.0
+            self.ready = True
+            return
+
+        if dt > 0:
+            d2 = dt * dt / 2.0
+            self.h += self.v * dt + self.a * d2
+            self.v += self.a * dt
+
+            f00 = self.p00 + dt * self.p01 + d2 * self.p02
+            f01 = self.p01 + dt * self.p11 + d2 * self.p12
+            f02 = self.p02 + dt * self.p12 + d2 * self.p22
+            f11 = self.p11 + dt * self.p12
+            f12 = self.p12 + dt * self.p22
+            q = self.q
+            dt3 = dt * dt * dt
+            self.p00 = f00 + dt * f01 + d2 * f02 + q * dt3 * dt * dt / 20.0
+            self.p01 = f01 + dt * f02 + q * dt3 * dt / 8.0
+            self.p02 = f02 + q * dt3 / 6.0
+            self.p11 = f11 + dt * f12 + q * dt3 / 3.0
+            self.p12 = f12 + q * dt * dt / 2.0
+            self.p22 = self.p22 + q * dt
+
+        s = self.p00 + self.r
+        k0, k1, k2 = self.p00 / s, self.p01 / s, self.p02 / s
+        y = z - self.h
+        self.h += k0 * y
+        self.v += k1 * y
+        self.a += k2 * y
+        p00, p01, p02 = self.p00, self.p01, self.p02
+        self.p00 = p00 - k0 * p00
+        self.p01 = p01 - k0 * p01
+        self.p02 = p02 - k0 * p02
+        self.p11 -= k1 * p01
+        self.p12 -= k1 * p02
+        self.p22 -= k2 * p02
+
+class DerivedTelemetry:
+    def __init__(self):
+        self.kalman = AltitudeKalman()
+        self.processed = 0
+        self.resets = 0
+        self.stale = 0
+        self.process_us_avg = 0.0
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.kalman.reset()
+        self.kalman_time = None
+        self.last_time = None
+        self.phase = PHASE_GROUND
+        self.apogee_altitude = None
+        self.apogee_time = None
+        self.burnout_time = None
+        self._max_altitude = None
+        self._max_time = None
+        self._confirm = 0
+        self.home = None
+        self.last_fix = None
+        self.track_distance = 0.0
+        self._battery = deque()
+
+    def restart(self):
+        with self._lock:
+            self.reset()
+            self.resets += 1
+
+    def process(self, samples):
+        if not samples:
+            return samples
+        started = time.perf_counter()
+        with self._lock:
+            columns = _columns(samples, INPUT_FIELDS)
+            run = []
+            for i, t in enumerate(columns[0].tolist()):
+                if t == t and self.last_time is not None and t <= self.last_time:
+                    if self.last_time - t <= RESET_GAP_MS:
+                        self.stale += 1
+                        continue
+                    self._process_run(samples, columns, run)
+                    self.reset()
+                    self.resets += 1
+                    run = []
+                if t == t:
+                    self.last_time = t
+                run.append(i)
+            self._process_run(samples, columns, run)
+            self.processed += len(samples)
+        elapsed_us = (time.perf_counter() - started) * 1e6 / len(samples)
+        self.process_us_avg += (elapsed_us - self.process_us_avg) * 0.05
+        return samples
+
+    def _process_run(self, samples, columns, run):
+        if not run:
+            return
+        samples = [samples[i] for i in run]
+        times, altitudes, lat, lon, voltages = columns[:, run]
+        self._derive_altitude(samples, times, altitudes)
+        self._derive_track(samples, lat, lon)
+        self._derive_battery(samples, times, voltages)
+
+    def _derive_altitude(self, samples, times, altitudes):
+        valid = ~np.isnan(altitudes) & ~np.isnan(times)
+        if not valid.any():
+            return
+        previous = self.kalman_time if self.kalman_time is not None else np.nan
+        dts = np.diff(np.concatenate(([previous], times[valid]))) / 1000.0
+        kalman = self.kalman
+        for sample, z, t, dt in zip((s for s, ok in zip(samples, valid) if ok), altitudes[valid].tolist(), times[valid].tolist(), dts.tolist()):
+            kalman.step(z, dt if dt == dt else 0.0)
+            self.kalman_time = t
+            self._detect_phase(kalman.h, kalman.v, kalman.a, t)
+            sample['filtered_altitude'] = _round(kalman.h)
+            sample['vertical_velocity'] = _round(kalman.v)
+            sample['vertical_acceleration'] = _round(kalman.a)
+            sample['flight_phase'] = self.phase
+            sample['apogee_altitude'] = _round(self.apogee_altitude)
+            sample['apogee_time'] = self.apogee_time
+            sample['burnout_time'] = self.burnout_time
+
+    def _detect_phase(self, h, v, a, t):
+        if self.phase == PHASE_GROUND:
+            if v > LAUNCH_VELOCITY or a > LAUNCH_ACCELERATION:
+                self.phase = PHASE_POWERED
+                self._max_altitude, self._max_time = h, t
+                self._confirm = 0
+            return
+
+        if h > self._max_altitude:
+            self._max_altitude, self._max_time = h, t
+
+        if self.phase == PHASE_POWERED:
+            self._confirm = self._confirm + 1 if a < BURNOUT_ACCELERATION else 0
+            if self._confirm >= CONFIRM_SAMPLES:
+                self.phase = PHASE_COAST
+                self.burnout_time = int(t)
+                self._confirm = 0
+        elif self.phase == PHASE_COAST:
+            self._confirm = self._confirm + 1 if v < 0 else 0
+            if self._confirm >= CONFIRM_SAMPLES:
+                self.phase = PHASE_DESCENT
+                self.apogee_altitude = self._max_altitude
+                self.apogee_time = int(self._max_time)
+                self._confirm = 0
+
+    def _derive_track(self, samples, lat, lon):
+        valid = ~np.isnan(lat) & ~np.isnan(lon) & ((lat != 0.0) | (lon != 0.0))
+        index = np.flatnonzero(valid)
+        if not len(index):
+            return
+
+        fix_lat, fix_lon = lat[index], lon[index]
+        if self.home is None:
+            self.home = (fix_lat[0], fix_lon[0])
+        if self.last_fix is None:
+            self.last_fix = (fix_lat[0], fix_lon[0])
+        count = len(index)
+        origin_lat = np.concatenate(([self.last_fix[0]], fix_lat[:-1], np.full(count, self.home[0])))
+        origin_lon = np.concatenate(([self.last_fix[1]], fix_lon[:-1], np.full(count, self.home[1])))
+        spans = haversine(origin_lat, origin_lon, np.tile(fix_lat, 2), np.tile(fix_lon, 2))
+        distance = np.cumsum(np.concatenate(([self.track_distance], spans[:count])))[1:]
+        ground_range = spans[count:]
+
+        for i, d, r in zip(index.tolist(), distance.tolist(), ground_range.tolist()):
+            samples[i]['track_distance'] = _round(d)
+            samples[i]['ground_range'] = _round(r)
+        self.track_distance = float(distance[-1])
+        self.last_fix = (fix_lat[-1], fix_lon[-1])
+
+    def _derive_battery(self, samples, times, voltages):
+        window = self._battery
+        for sample, v, t in zip(samples, voltages.tolist(), times.tolist()):
+            if v != v or t != t:
+                continue
+            window.append((t, v))
+            while t - window[0][0] > BATTERY_WINDOW_MS:
+                window.popleft()
+            span = t - window[0][0]
+            sample['battery_rate'] = _round((v - window[0][1]) / span * 60000.0) if span >= BATTERY_MIN_SPAN_MS else None
+
+    def get_stats(self):
+        return {
+            'processed': self.processed,
+            'resets': self.resets,
+            'stale': self.stale,
+            'phase': self.phase,
+            'apogee_altitude': _round(self.apogee_altitude),
+            'apogee_time': self.apogee_time,
+            'burnout_time': self.burnout_time,
+            'track_distance': _round(self.track_distance),
+            'process_us_avg': round(self.process_us_avg, 2)
+        }
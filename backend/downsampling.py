@@ -0,0 +1,162 @@
+import numpy as np
+
+DEFAULT_TIER_FACTORS = (10, 100, 1000, 10000)
+DEFAULT_TIER_CAPACITY = 8192
+MODE_LTTB = 'lttb'
+MODE_MINMAX = 'minmax'
+
+def _group_reduce(t_first, t_last, vmin, vmax, vsum, vcount, group):
+    m = len(t_first) // group
+    n = m * group
+    fields = vmin.shape[1]
+    return (
+        t_first[:n:group].copy(),
+        t_last[group - 1:n:group].copy(),
+        np.fmin.reduce(vmin[:n].reshape(m, group, fields), axis=1),
+        np.fmax.reduce(vmax[:n].reshape(m, group, fields), axis=1),
+        vsum[:n].reshape(m, group, fields).sum(axis=1),
+        vcount[:n].reshape(m, group, fields).sum(axis=1)
+    )
+
+class DecimationTier:
+    def __init__(self, factor, group, n_fields, capacity=DEFAULT_TIER_CAPACITY):
+        self.factor = factor
+        self.group = group
+        self.capacity = capacity
+        self.t_first = np.zeros(capacity, dtype=np.float64)
+        self.t_last = np.zeros(capacity, dtype=np.float64)
+        self.vmin = np.full((capacity, n_fields), np.nan, dtype=np.float64)
+        self.vmax = np.full((capacity, n_fields), np.nan, dtype=np.float64)
+        self.vsum = np.zeros((capacity, n_fields), dtype=np.float64)
+        self.vcount = np.zeros((capacity, n_fields), dtype=np.int64)
+        self.head = 0
+        self.count = 0
+        self._pending = None
+
+    @property
+    def name(self):
+        return f"x{self.factor}"
+
+    def add(self, t_first, t_last, vmin, vmax, vsum, vcount):
+        incoming = (t_first, t_last, vmin, vmax, vsum, vcount)
+        if self._pending is not None:
+            incoming = tuple(np.concatenate((p, x)) for p, x in zip(self._pending, incoming))
+
+        complete = len(incoming[0]) // self.group * self.group
+        rest = tuple(x[complete:] for x in incoming)
+        self._pending = rest if len(rest[0]) else None
+        if not complete:
+            return None
+
+        buckets = _group_reduce(*(x[:complete] for x in incoming), self.group)
+        self._store(*buckets)
+        return buckets
+
+    def _store(self, t_first, t_last, vmin, vmax, vsum, vcount):
+        m = len(t_first)
+        if m > self.capacity:
+            t_first, t_last, vmin, vmax, vsum, vcount = (x[-self.capacity:] for x in (t_first, t_last, vmin, vmax, vsum, vcount))
+            m = self.capacity
+        idx = (self.head + np.arange(m)) % self.capacity
+        self.t_first[idx] = t_first
+        self.t_last[idx] = t_last
+        self.vmin[idx] = vmin
+        self.vmax[idx] = vmax
+        self.vsum[idx] = vsum
+        self.vcount[idx] = vcount
+        self.head = (self.head + m) % self.capacity
+        self.count = min(self.count + m, self.capacity)
+
+    def _physical(self, start, stop):
+        oldest = self.head if self.count == self.capacity else 0
+        return (oldest + np.arange(start, stop)) % self.capacity
+
+    def ordered_t_last(self):
+        return self.t_last[self._physical(0, self.count)]
+
+    def oldest_time(self):
+        if not self.count:
+            return None
+        return float(self.t_first[self._physical(0, 1)[0]])
+
+    def select(self, t_start, field_idx):
+        t_last = self.ordered_t_last()
+        start = int(np.searchsorted(t_last, t_start, side='left'))
+        idx = self._physical(start, self.count)
+        t_first = self.t_first[idx]
+        t_end = self.t_last[idx]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.vsum[idx][:, field_idx] / self.vcount[idx][:, field_idx]
+        return (t_first + t_end) / 2.0, self.vmin[idx][:, field_idx], self.vmax[idx][:, field_idx], mean, (float(t_end[-1]) if len(idx) else None)
+
+    def buckets_since(self, t_start):
+        if not self.count:
+            return 0
+        return self.count - int(np.searchsorted(self.ordered_t_last(), t_start, side='left'))
+
+class DecimationTiers:
+    def __init__(self, n_fields, factors=DEFAULT_TIER_FACTORS, capacity=DEFAULT_TIER_CAPACITY):
+        self.n_fields = n_fields
+        self.tiers = []
+        previous = 1
+        for factor in factors:
+            self.tiers.append(DecimationTier(factor, factor // previous, n_fields, capacity))
+            previous = factor
+
+    def add_block(self, times, values):
+        finite = ~np.isnan(values)
+        buckets = (times, times, values, values, np.where(finite, values, 0.0), finite.astype(np.int64))
+        for tier in self.tiers:
+            buckets = tier.add(*buckets)
+            if buckets is None:
+                break
+
+    def get_stats(self):
+        return [{'tier': t.name, 'buckets': t.count, 'capacity': t.capacity} for t in self.tiers]
+
+def lttb_indices(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    finite = ~np.isnan(y)
+    if not finite.all():
+        y = np.interp(x, x[finite], y[finite]) if finite.any() else np.zeros(n)
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            avg_x = x[next_lo:next_hi].mean()
+            avg_y = y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        if hi <= lo:
+            hi = lo + 1
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_reduce(t, vmin, vmax, mean, n_bins):
+    n = len(t)
+    if n <= n_bins:
+        return t, vmin, vmax, mean
+    starts = np.linspace(0, n, n_bins + 1).astype(np.int64)[:-1]
+    finite = ~np.isnan(mean)
+    counts = np.add.reduceat(finite.astype(np.int64), starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        reduced_mean = np.add.reduceat(np.where(finite, mean, 0.0), starts, axis=0) / counts
+    return (
+        t[starts],
+        np.fmin.reduceat(vmin, starts, axis=0),
+        np.fmax.reduceat(vmax, starts, axis=0),
+        reduced_mean
+    )
@@ -1,61 +1,523 @@
 import os
 import sys
-import glob
-from flask import Flask, send_from_directory, send_file, request, redirect
+import socket
+import threading
+import time
+from flask import Flask, Response, request, redirect, jsonify
 from flask_socketio import SocketIO
+from telemetry_history import TelemetryRing, TELEMETRY_FIELDS, DEFAULT_HISTORY_SECONDS
+from derived_telemetry import DERIVED_FIELDS
+from downsampling import MODE_LTTB, MODE_MINMAX
+from delta_stream import DeltaEncoder, STREAM_DELTA, STREAM_FULL
+from frame_codec import EncodedFrame, FrameJSON, ENCODING_JSON, ENCODING_MSGPACK, get_supported_encodings
+from loop_bridge import LoopBridge, SERVER_MODES, SERVER_MODE_THREADING, SERVER_MODE_EVENTLET
+from client_outbox import ClientOutbox
+from client_roster import ClientRoster
+from client_registry import ClientRegistry
+from frame_feed import FrameFeed
+from static_assets import StaticManifest
+from startup import STARTUP
+from metrics import METRICS, READ_TO_EMIT_SECONDS, EMIT_SECONDS, CLIENT_RTT_SECONDS, UART_TO_BROWSER_SECONDS, EMITTED_FRAMES_TOTAL
+from rate_limit import WindowCoalescer, normalize_rate_limits, merge_rate_limits, build_rate_plan, rate_plan_name
+from widget_registry import WIDGET_MANIFEST, load_manifest, scan_widgets
 
-socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO(cors_allowed_origins="*", async_mode='threading', json=FrameJSON)
 
 SERVER_ADMIN_TOKEN = None
 ADMIN_SESSIONS = set()
-CONNECTED_CLIENTS = {}
+ADMIN_ROOM = 'admins'
+CLIENT_REGISTRY = ClientRegistry()
+PERMISSION_ROOM_GLOBAL = 'widgets:global'
 SERIAL_READER = None
+WORKER_LINK = None
+WORKER_INDEX = None
+LOOP_BRIDGE = LoopBridge()
+DEFAULT_SERVER_MODE = os.environ.get('SPARK_SERVER_MODE', SERVER_MODE_THREADING)
+EVENTLET_SERVER_OPTIONS = {
+    'keepalive': True,
+    'socket_timeout': 60,
+    'max_size': 4096,
+    'minimum_chunk_size': 0
+}
+TELEMETRY_HISTORY = TelemetryRing(fields=TELEMETRY_FIELDS + DERIVED_FIELDS)
+MAX_HISTORY_SECONDS = 24 * 3600.0
+MAX_HISTORY_POINTS = 10000
+SERVER_READY = threading.Event()
+SERVER_ADDRESS = None
 
 def set_serial_reader(instance):
     global SERIAL_READER
     SERIAL_READER = instance
 
-def get_available_widgets():
-    widgets = []
+def set_worker_link(link, index=None):
+    global WORKER_LINK, WORKER_INDEX
+    WORKER_LINK = link
+    WORKER_INDEX = index
+
+def get_widget_registry():
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    manifest = os.path.join(base_dir, WIDGET_MANIFEST)
+    if os.path.isfile(manifest):
+        try:
+            return load_manifest(manifest)
+        except Exception as e:
+            print(f"erro ao ler {WIDGET_MANIFEST}: {e}")
     try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        widgets_dir = os.path.join(base_dir, '..', 'frontend', 'src', 'components', 'widgets')
-        if os.path.exists(widgets_dir):
-            files = glob.glob(os.path.join(widgets_dir, '*.tsx'))
-            for f in files:
-                name = os.path.basename(f).replace('.tsx', '')
-                widgets.append(name)
+        return scan_widgets()
     except Exception as e:
         print(f"erro ao escanear widgets: {e}")
-    
-    if not widgets:
-        return []
-    return sorted(widgets)
+        return {}
 
-AVAILABLE_WIDGETS = get_available_widgets()
+WIDGET_REGISTRY = get_widget_registry()
+AVAILABLE_WIDGETS = list(WIDGET_REGISTRY)
 
 GLOBAL_WIDGETS = list(AVAILABLE_WIDGETS) 
 USER_WIDGET_CONFIG = {} 
+GLOBAL_RATE_LIMITS = None
+USER_RATE_LIMITS = {}
+
+WIDGET_FIELDS = {name: fields for name, fields in WIDGET_REGISTRY.items() if fields is not None}
+BASE_FIELDS = ['time', 'status']
+
+TELEMETRY_ROOMS = {}
+LATEST_FRAME = None
+CLIENT_TELEMETRY_ROOM = {}
+TELEMETRY_ROOMS_LOCK = threading.Lock()
+CLIENT_OUTBOXES = {}
+CLIENT_STATE_LOCK = threading.Lock()
+OUTBOX_FLUSH_INTERVAL = 0.25
+CLIENTS_STATS_INTERVAL = 2.0
+LATENCY_PROBE_INTERVAL = 1.0
+LAST_READ_TO_EMIT = 0.0
+CLIENT_ROSTER = ClientRoster()
+FRAME_FEED = FrameFeed()
+LONG_POLL_TIMEOUT = 25.0
+MAX_LONG_POLL_TIMEOUT = 60.0
+SSE_KEEPALIVE = 15.0
+SSE_MAX_RATE = 50.0
+SSE_RETRY_MS = 1000
 
 def get_client_widgets(client_id):
+    return USER_WIDGET_CONFIG.get(client_id, GLOBAL_WIDGETS)
+
+def client_room(client_id):
+    return f'client:{client_id}'
+
+def permission_room(client_id):
     if client_id in USER_WIDGET_CONFIG:
-        return USER_WIDGET_CONFIG[client_id]
-    return GLOBAL_WIDGETS
-
-
-def broadcast_clients_update():
-    clients_list = [
-        {
-            'id': info['id'], 
-            'type': info['type'], 
-            'ip': info['ip'], 
-            'sid': sid,
-            'widgets': get_client_widgets(info['id'])
+        return f'widgets:client:{client_id}'
+    return PERMISSION_ROOM_GLOBAL
+
+def assign_permission_room(sid, info):
+    room = permission_room(info['id'])
+    moved, previous = CLIENT_REGISTRY.set_group(sid, room)
+    if not moved:
+        return
+    if previous is not None:
+        socketio.server.leave_room(sid, previous, namespace='/')
+    socketio.server.enter_room(sid, room, namespace='/')
+
+def refresh_client_sids(sids):
+    for sid in sids:
+        info = CLIENT_REGISTRY.get(sid)
+        if info is None:
+            continue
+        if info['type'] == 'Viewer':
+            assign_permission_room(sid, info)
+        refresh_client_telemetry_room(sid, info)
+    CLIENT_ROSTER.mark(*sids)
+
+def get_client_rate_limits(info):
+    limits = USER_RATE_LIMITS.get(info['id'], GLOBAL_RATE_LIMITS)
+    return merge_rate_limits(limits, info.get('rate_limits'))
+
+def get_widget_fields(widgets):
+    fields = set(BASE_FIELDS)
+    for widget in widgets or []:
+        if widget not in WIDGET_FIELDS:
+            return None
+        fields.update(WIDGET_FIELDS[widget])
+    return tuple(sorted(fields))
+
+def telemetry_room_name(fields, stream=STREAM_FULL, encoding=ENCODING_JSON, plan=None):
+    prefix = 'telemetry:'
+    if stream == STREAM_DELTA:
+        prefix += 'delta:'
+    if encoding == ENCODING_MSGPACK:
+        prefix += 'msgpack:'
+    if plan is not None:
+        prefix += rate_plan_name(plan) + ':'
+    return prefix + ('*' if fields is None else ','.join(fields))
+
+def emit_frame(event, frame, room, encoding=ENCODING_JSON, skip_sid=None):
+    socketio.emit(event, frame.encoded(encoding), room=room, namespace='/', skip_sid=skip_sid)
+
+def open_client_outbox(sid):
+    eio_sid = socketio.server.manager.eio_sid_from_sid(sid, '/')
+    outbox = ClientOutbox(sid, socketio.server.eio.sockets.get(eio_sid))
+    with CLIENT_STATE_LOCK:
+        CLIENT_OUTBOXES[sid] = outbox
+
+def get_client_outboxes():
+    with CLIENT_STATE_LOCK:
+        return dict(CLIENT_OUTBOXES)
+
+def hold_congested_clients(members, item, now):
+    skipped = []
+    recovered = []
+    for sid in members:
+        outbox = CLIENT_OUTBOXES.get(sid)
+        if outbox is None:
+            continue
+        if outbox.congested():
+            outbox.hold(item)
+            skipped.append(sid)
+        elif outbox.pending is not None and item[2] is not None:
+            skipped.append(sid)
+            recovered.append(outbox)
+        else:
+            outbox.discard_pending()
+            outbox.delivered(now)
+    return skipped, recovered
+
+def flush_outbox(outbox):
+    item = outbox.take()
+    if item is None:
+        return
+    event, frame, encoder, encoding = item
+    if encoder is not None:
+        frame = EncodedFrame(encoder.snapshot())
+    emit_frame(event, frame, outbox.sid, encoding)
+    outbox.delivered()
+
+def service_client_outboxes():
+    last_stats = 0.0
+    last_probe = 0.0
+    while True:
+        socketio.sleep(OUTBOX_FLUSH_INTERVAL)
+        for outbox in get_client_outboxes().values():
+            if outbox.pending is not None and not outbox.congested():
+                flush_outbox(outbox)
+        now = time.monotonic()
+        if now - last_probe >= LATENCY_PROBE_INTERVAL:
+            last_probe = now
+            send_latency_probes(now)
+        if (ADMIN_SESSIONS or WORKER_LINK is not None) and now - last_stats >= CLIENTS_STATS_INTERVAL:
+            last_stats = now
+            CLIENT_ROSTER.mark_all(CLIENT_REGISTRY.sids())
+        publish_client_roster()
+
+def send_latency_probes(now):
+    for sid, info in CLIENT_REGISTRY.items():
+        if info.get('echo'):
+            socketio.emit('latency_probe', {'t': now}, room=sid)
+
+def get_client_lag_metrics():
+    now = time.monotonic()
+    outboxes = get_client_outboxes()
+    return {
+        (('client', info['id']),): round(outboxes[sid].get_lag(now), 3)
+        for sid, info in CLIENT_REGISTRY.items() if sid in outboxes
+    }
+
+def get_client_queue_metrics():
+    outboxes = get_client_outboxes()
+    return {
+        (('client', info['id']),): outboxes[sid].depth()
+        for sid, info in CLIENT_REGISTRY.items() if sid in outboxes
+    }
+
+def get_source_quality_metrics():
+    if not SERIAL_READER:
+        return {}
+    links = SERIAL_READER.merger.get_stats()
+    links['sources']['merged'] = links['merged']
+    return {(('source', name),): link['link_quality'] for name, link in links['sources'].items()}
+
+def get_roster_client_metrics():
+    local = 0 if WORKER_INDEX is None else WORKER_INDEX
+    return {(('worker', str(worker)),): count for worker, count in CLIENT_ROSTER.count_by_worker(local).items()}
+
+METRICS.gauge('spark_connected_clients', 'Clientes Socket.IO conectados a este processo web.', lambda: len(CLIENT_REGISTRY))
+METRICS.gauge('spark_roster_clients', 'Clientes conectados em cada worker web, conforme a lista compartilhada pelo supervisor.', get_roster_client_metrics)
+METRICS.gauge('spark_client_lag_seconds', 'Atraso do frame mais recente retido para cada cliente deste processo web.', get_client_lag_metrics)
+METRICS.gauge('spark_client_queue_depth', 'Pacotes na fila de envio do Engine.IO de cada cliente deste processo web.', get_client_queue_metrics)
+METRICS.gauge('spark_http_telemetry_streams', 'Streams SSE de telemetria abertos.', lambda: FRAME_FEED.streams)
+METRICS.gauge('spark_source_link_quality', 'Fracao de pacotes recebidos por fonte de telemetria (janela recente).', get_source_quality_metrics)
+
+def assign_telemetry_room(sid, fields, stream=STREAM_FULL, encoding=ENCODING_JSON, plan=None):
+    room = telemetry_room_name(fields, stream, encoding, plan)
+    with TELEMETRY_ROOMS_LOCK:
+        previous = CLIENT_TELEMETRY_ROOM.get(sid)
+        if previous == room:
+            return
+        if previous is not None:
+            _leave_telemetry_room(sid, previous)
+        CLIENT_TELEMETRY_ROOM[sid] = room
+        if room not in TELEMETRY_ROOMS:
+            encoder = DeltaEncoder() if stream == STREAM_DELTA else None
+            coalescer = WindowCoalescer(plan, BASE_FIELDS) if plan is not None else None
+            TELEMETRY_ROOMS[room] = (set(), fields, encoder, encoding, coalescer)
+        members, _, encoder, _, _ = TELEMETRY_ROOMS[room]
+        members.add(sid)
+    outbox = CLIENT_OUTBOXES.get(sid)
+    if outbox is not None:
+        outbox.take()
+    socketio.server.enter_room(sid, room, namespace='/')
+    if encoder is not None and encoder.state:
+        emit_frame('data_delta', EncodedFrame(encoder.snapshot()), sid, encoding)
+
+def _leave_telemetry_room(sid, room):
+    members = TELEMETRY_ROOMS[room][0] if room in TELEMETRY_ROOMS else set()
+    members.discard(sid)
+    if not members:
+        TELEMETRY_ROOMS.pop(room, None)
+    socketio.server.leave_room(sid, room, namespace='/')
+
+def release_telemetry_room(sid):
+    with TELEMETRY_ROOMS_LOCK:
+        room = CLIENT_TELEMETRY_ROOM.pop(sid, None)
+        if room is not None:
+            _leave_telemetry_room(sid, room)
+
+def refresh_client_telemetry_room(sid, info):
+    stream = info.get('stream', STREAM_FULL)
+    encoding = info.get('encoding', ENCODING_JSON)
+    limits = get_client_rate_limits(info)
+    if info['type'] == 'Viewer':
+        widgets = get_client_widgets(info['id'])
+        fields = get_widget_fields(widgets)
+    else:
+        widgets = list(WIDGET_FIELDS.keys())
+        fields = None
+    plan = build_rate_plan(fields, widgets, limits, WIDGET_FIELDS)
+    assign_telemetry_room(sid, fields, stream, encoding, plan)
+
+def parse_history_request(params):
+    try:
+        seconds = float(params.get('seconds', DEFAULT_HISTORY_SECONDS))
+    except (TypeError, ValueError):
+        seconds = DEFAULT_HISTORY_SECONDS
+    seconds = max(0.0, min(seconds, MAX_HISTORY_SECONDS))
+
+    fields = params.get('fields')
+    if isinstance(fields, str):
+        fields = [f for f in fields.split(',') if f]
+    elif not isinstance(fields, list):
+        fields = None
+
+    since = params.get('since')
+    try:
+        since = float(since) if since is not None else None
+    except (TypeError, ValueError):
+        since = None
+
+    try:
+        max_points = int(params.get('max_points') or 0)
+    except (TypeError, ValueError):
+        max_points = 0
+    max_points = max(0, min(max_points, MAX_HISTORY_POINTS))
+
+    mode = params.get('mode', MODE_LTTB)
+    if mode not in (MODE_LTTB, MODE_MINMAX):
+        mode = MODE_LTTB
+
+    key = params.get('key')
+    if not isinstance(key, str):
+        key = None
+    return seconds, fields, since, max_points, mode, key
+
+def parse_feed_fields(params):
+    fields = params.get('fields')
+    if not fields:
+        return None
+    return tuple(sorted(set(f for f in fields.split(',') if f) | set(BASE_FIELDS)))
+
+def parse_feed_number(params, name, default, maximum):
+    try:
+        value = float(params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(0.0, min(value, maximum))
+
+def parse_last_event_id(value):
+    boot_id, _, seq = (value or '').partition('-')
+    if boot_id != FRAME_FEED.boot_id:
+        return 0
+    try:
+        return int(seq)
+    except ValueError:
+        return 0
+
+def telemetry_feed_response(seq, frame, fields):
+    headers = {'Cache-Control': 'no-cache', 'X-Telemetry-Seq': str(seq)}
+    if frame is None:
+        return Response(status=204, headers=headers)
+    etag = FRAME_FEED.etag(seq, fields)
+    headers['ETag'] = f'"{etag}"'
+    FRAME_FEED.snapshots += 1
+    if request.if_none_match.contains(etag):
+        FRAME_FEED.not_modified += 1
+        return Response(status=304, headers=headers)
+    return Response(frame.project(fields).json_bytes, mimetype='application/json', headers=headers)
+
+def stream_telemetry(fields, interval, last_seq):
+    FRAME_FEED.streams += 1
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        next_at = 0.0
+        while True:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                socketio.sleep(delay)
+            seq, frame = FRAME_FEED.wait(last_seq, SSE_KEEPALIVE)
+            if seq <= last_seq or frame is None:
+                yield ': keepalive\n\n'
+                continue
+            last_seq = seq
+            next_at = time.monotonic() + interval
+            yield f'id: {FRAME_FEED.etag(seq)}\ndata: {frame.project(fields).json}\n\n'
+    finally:
+        FRAME_FEED.streams -= 1
+
+def broadcast_telemetry(data, origin=None):
+    global LATEST_FRAME
+    frame = data if isinstance(data, EncodedFrame) else EncodedFrame(data)
+    if LATEST_FRAME is None:
+        STARTUP.mark('first_telemetry')
+    LATEST_FRAME = frame
+    if socketio.server is None:
+        return
+    LOOP_BRIDGE.call(fan_out_telemetry, frame, origin)
+
+def fan_out_telemetry(frame, origin=None):
+    global LAST_READ_TO_EMIT
+    started = time.monotonic()
+    FRAME_FEED.publish(frame)
+    with TELEMETRY_ROOMS_LOCK:
+        rooms = [(room, list(members), fields, encoder, encoding, coalescer) for room, (members, fields, encoder, encoding, coalescer) in TELEMETRY_ROOMS.items()]
+
+    now = time.monotonic()
+    for room, members, fields, encoder, encoding, coalescer in rooms:
+        projected = frame.project(fields)
+
+        if coalescer is not None:
+            coalesced = coalescer.push(projected.data, now)
+            if coalesced is None:
+                continue
+            projected = EncodedFrame(coalesced)
+
+        if encoder is None:
+            skipped, _ = hold_congested_clients(members, ('data_update', projected, None, encoding), now)
+            emit_frame('data_update', projected, room, encoding, skipped)
+        else:
+            skipped, recovered = hold_congested_clients(members, ('data_delta', None, encoder, encoding), now)
+            message = encoder.encode(projected.data)
+            if message is not None:
+                emit_frame('data_delta', EncodedFrame(message), room, encoding, skipped)
+            for outbox in recovered:
+                flush_outbox(outbox)
+
+    finished = time.monotonic()
+    EMIT_SECONDS.observe(finished - started)
+    EMITTED_FRAMES_TOTAL.inc()
+    if origin is not None:
+        LAST_READ_TO_EMIT = finished - origin
+        READ_TO_EMIT_SECONDS.observe(LAST_READ_TO_EMIT)
+
+def build_client_entry(sid, now=None):
+    info = CLIENT_REGISTRY.get(sid)
+    if info is None:
+        return None
+    outbox = CLIENT_OUTBOXES.get(sid)
+    return {
+        'id': info['id'], 
+        'type': info['type'], 
+        'ip': info['ip'], 
+        'sid': sid,
+        'widgets': get_client_widgets(info['id']),
+        'queue': outbox.get_stats(now) if outbox is not None else None,
+        'rate_limits': USER_RATE_LIMITS.get(info['id']),
+        'requested_rate_limits': info.get('rate_limits'),
+        'rtt_ms': info.get('rtt_ms'),
+        'worker': WORKER_INDEX
+    }
+
+def publish_client_roster():
+    now = time.monotonic()
+    delta = CLIENT_ROSTER.collect(lambda sid: build_client_entry(sid, now))
+    if delta is None:
+        return
+    if WORKER_LINK is not None:
+        LOOP_BRIDGE.run_blocking(WORKER_LINK.share_roster, delta)
+    if ADMIN_SESSIONS:
+        socketio.emit('clients_delta', delta, room=ADMIN_ROOM)
+
+def emit_clients_delta(delta):
+    if delta is not None and ADMIN_SESSIONS:
+        socketio.emit('clients_delta', delta, room=ADMIN_ROOM)
+
+def apply_remote_roster(worker, delta):
+    delta = CLIENT_ROSTER.apply_remote(worker, delta['added'], delta['changed'], delta['removed'])
+    if delta is not None and socketio.server is not None:
+        LOOP_BRIDGE.call(emit_clients_delta, delta)
+
+def drop_remote_roster(worker):
+    delta = CLIENT_ROSTER.drop_remote(worker)
+    if delta is not None and socketio.server is not None:
+        LOOP_BRIDGE.call(emit_clients_delta, delta)
+
+def send_client_roster(sid):
+    socketio.emit('clients_snapshot', CLIENT_ROSTER.snapshot(), room=sid)
+
+def get_serial_ports_payload():
+    return {'current': SERIAL_READER.port, 'ports': SERIAL_READER.get_ports_info()}
+
+def emit_serial_ports(room=ADMIN_ROOM):
+    if not SERIAL_READER:
+        return
+    socketio.emit('serial_ports_list', LOOP_BRIDGE.run_blocking(get_serial_ports_payload), room=room)
+
+def broadcast_serial_ports():
+    if ADMIN_SESSIONS:
+        LOOP_BRIDGE.call(emit_serial_ports)
+
+def get_shared_state():
+    with CLIENT_STATE_LOCK:
+        return {
+            'admin_token': SERVER_ADMIN_TOKEN,
+            'global_widgets': GLOBAL_WIDGETS,
+            'user_widgets': dict(USER_WIDGET_CONFIG),
+            'global_rate_limits': GLOBAL_RATE_LIMITS,
+            'user_rate_limits': dict(USER_RATE_LIMITS)
         }
-        for sid, info in CONNECTED_CLIENTS.items()
-    ]
-    for admin_sid in ADMIN_SESSIONS:
-        socketio.emit('clients_update', clients_list, room=admin_sid)
+
+def share_state():
+    if WORKER_LINK is not None:
+        LOOP_BRIDGE.run_blocking(WORKER_LINK.share_state, get_shared_state())
+
+def apply_shared_state(state):
+    global SERVER_ADMIN_TOKEN, GLOBAL_WIDGETS, GLOBAL_RATE_LIMITS
+    SERVER_ADMIN_TOKEN = state['admin_token']
+    GLOBAL_WIDGETS = state['global_widgets']
+    GLOBAL_RATE_LIMITS = state['global_rate_limits']
+    with CLIENT_STATE_LOCK:
+        USER_WIDGET_CONFIG.clear()
+        USER_WIDGET_CONFIG.update(state['user_widgets'])
+        USER_RATE_LIMITS.clear()
+        USER_RATE_LIMITS.update(state['user_rate_limits'])
+    if socketio.server is not None:
+        LOOP_BRIDGE.call(refresh_shared_state)
+
+def refresh_shared_state():
+    refresh_client_sids(CLIENT_REGISTRY.sids())
+    for sid in CLIENT_REGISTRY.sids_of_type('Viewer'):
+        info = CLIENT_REGISTRY.get(sid)
+        if info is not None:
+            socketio.emit('widget_permissions', get_client_widgets(info['id']), room=sid)
+    if ADMIN_SESSIONS:
+        socketio.emit('global_widgets_update', GLOBAL_WIDGETS, room=ADMIN_ROOM)
+        socketio.emit('global_rate_limits_update', GLOBAL_RATE_LIMITS, room=ADMIN_ROOM)
 
 @socketio.on('get_global_widgets')
 def handle_get_global_widgets():
@@ -69,14 +531,11 @@ def handle_update_global_widgets(widgets):
     sid = request.sid
     if sid in ADMIN_SESSIONS:
         GLOBAL_WIDGETS = widgets
-        socketio.emit('global_widgets_update', GLOBAL_WIDGETS)
-        broadcast_clients_update()
-        
-        for client_sid, info in CONNECTED_CLIENTS.items():
-            if info['type'] == 'Viewer':
-                client_id = info['id']
-                if client_id not in USER_WIDGET_CONFIG:
-                    socketio.emit('widget_permissions', GLOBAL_WIDGETS, room=client_sid)
+        socketio.emit('global_widgets_update', GLOBAL_WIDGETS, room=ADMIN_ROOM)
+        refresh_client_sids(CLIENT_REGISTRY.sids_in_group(PERMISSION_ROOM_GLOBAL))
+        socketio.emit('widget_permissions', GLOBAL_WIDGETS, room=PERMISSION_ROOM_GLOBAL)
+        CLIENT_ROSTER.mark(*CLIENT_REGISTRY.sids_of_type('Admin'))
+        share_state()
 
 @socketio.on('update_client_widgets')
 def handle_update_client_widgets(data):
@@ -85,18 +544,112 @@ def handle_update_client_widgets(data):
         target_id = data.get('client_id')
         widgets = data.get('widgets')
         
-        if widgets == 'GLOBAL': 
-            if target_id in USER_WIDGET_CONFIG:
-                del USER_WIDGET_CONFIG[target_id]
-        else:
-            USER_WIDGET_CONFIG[target_id] = widgets
+        with CLIENT_STATE_LOCK:
+            if widgets == 'GLOBAL': 
+                USER_WIDGET_CONFIG.pop(target_id, None)
+            else:
+                USER_WIDGET_CONFIG[target_id] = widgets
             
-        broadcast_clients_update()
-        
-        target_widgets = get_client_widgets(target_id)
-        for client_sid, info in CONNECTED_CLIENTS.items():
-            if info['id'] == target_id:
-                socketio.emit('widget_permissions', target_widgets, room=client_sid)
+        refresh_client_sids(CLIENT_REGISTRY.sids_for_id(target_id))
+        socketio.emit('widget_permissions', get_client_widgets(target_id), room=client_room(target_id))
+        share_state()
+
+@socketio.on('latency_echo')
+def handle_latency_echo(payload):
+    sid = request.sid
+    info = CLIENT_REGISTRY.get(sid)
+    if info is None or not isinstance(payload, dict):
+        return
+    try:
+        rtt = time.monotonic() - float(payload.get('t'))
+    except (TypeError, ValueError):
+        return
+    if not 0 <= rtt < 60:
+        return
+    CLIENT_RTT_SECONDS.observe(rtt)
+    UART_TO_BROWSER_SECONDS.observe(LAST_READ_TO_EMIT + rtt / 2)
+    CLIENT_REGISTRY.update(sid, rtt_ms=round(rtt * 1000.0, 1))
+
+@socketio.on('get_metrics')
+def handle_get_metrics():
+    sid = request.sid
+    if sid in ADMIN_SESSIONS:
+        socketio.emit('metrics', LOOP_BRIDGE.run_blocking(METRICS.snapshot), room=sid)
+
+@socketio.on('set_rate_limits')
+def handle_set_rate_limits(config):
+    sid = request.sid
+    if sid not in CLIENT_REGISTRY:
+        return
+    try:
+        limits = normalize_rate_limits(config)
+    except ValueError as e:
+        socketio.emit('rate_limits_error', str(e), room=sid)
+        return
+    info = CLIENT_REGISTRY.update(sid, rate_limits=limits)
+    if info is None:
+        return
+    refresh_client_telemetry_room(sid, info)
+    CLIENT_ROSTER.mark(sid)
+
+@socketio.on('update_client_rate_limits')
+def handle_update_client_rate_limits(data):
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    target_id = data.get('client_id')
+    limits = data.get('limits')
+    use_global = limits == 'GLOBAL'
+    try:
+        limits = None if use_global else normalize_rate_limits(limits)
+    except ValueError as e:
+        socketio.emit('rate_limits_error', str(e), room=sid)
+        return
+    with CLIENT_STATE_LOCK:
+        if use_global:
+            USER_RATE_LIMITS.pop(target_id, None)
+        else:
+            USER_RATE_LIMITS[target_id] = limits
+
+    refresh_client_sids(CLIENT_REGISTRY.sids_for_id(target_id))
+    share_state()
+
+@socketio.on('get_global_rate_limits')
+def handle_get_global_rate_limits():
+    sid = request.sid
+    if sid in ADMIN_SESSIONS:
+        socketio.emit('global_rate_limits_update', GLOBAL_RATE_LIMITS, room=sid)
+
+@socketio.on('update_global_rate_limits')
+def handle_update_global_rate_limits(limits):
+    global GLOBAL_RATE_LIMITS
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+    try:
+        GLOBAL_RATE_LIMITS = normalize_rate_limits(limits)
+    except ValueError as e:
+        socketio.emit('rate_limits_error', str(e), room=sid)
+        return
+
+    socketio.emit('global_rate_limits_update', GLOBAL_RATE_LIMITS, room=ADMIN_ROOM)
+    for client_sid in CLIENT_REGISTRY.sids():
+        info = CLIENT_REGISTRY.get(client_sid)
+        if info is not None and info['id'] not in USER_RATE_LIMITS:
+            refresh_client_telemetry_room(client_sid, info)
+    share_state()
+
+def get_telemetry_room_stats():
+    with TELEMETRY_ROOMS_LOCK:
+        return [
+            {
+                'room': room,
+                'members': len(members),
+                'rate': coalescer.get_stats() if coalescer is not None else None
+            }
+            for room, (members, _, _, _, coalescer) in TELEMETRY_ROOMS.items()
+        ]
 
 def create_server(is_dev=False):
     app = Flask(__name__)
@@ -106,23 +659,57 @@ def create_server(is_dev=False):
     else:
         DIST_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'dist'))
     
+    static_manifest = None if is_dev else StaticManifest(DIST_DIR)
+
     @app.route('/')
     def serve_index():
         if is_dev:
             hostname = request.host.split(':')[0]
             return redirect(f"http://{hostname}:5173")
-        return send_file(os.path.join(DIST_DIR, 'index.html'))
+        return static_manifest.serve(request)
+
+    @app.route('/api/history')
+    def serve_history():
+        seconds, fields, since, max_points, mode, key = parse_history_request(request.args)
+        return jsonify(TELEMETRY_HISTORY.query(seconds, fields, since, max_points=max_points, mode=mode, key=key))
     
+    @app.route('/api/telemetry/latest')
+    def serve_latest_telemetry():
+        seq, frame = FRAME_FEED.latest()
+        return telemetry_feed_response(seq, frame, parse_feed_fields(request.args))
+
+    @app.route('/api/telemetry/wait')
+    def serve_wait_telemetry():
+        fields = parse_feed_fields(request.args)
+        try:
+            after = int(request.args.get('after', FRAME_FEED.seq))
+        except (TypeError, ValueError):
+            after = FRAME_FEED.seq
+        timeout = parse_feed_number(request.args, 'timeout', LONG_POLL_TIMEOUT, MAX_LONG_POLL_TIMEOUT)
+        seq, frame = FRAME_FEED.wait(after, timeout)
+        if seq <= after:
+            return Response(status=204, headers={'Cache-Control': 'no-cache', 'X-Telemetry-Seq': str(seq)})
+        return telemetry_feed_response(seq, frame, fields)
+
+    @app.route('/api/telemetry/stream')
+    def serve_telemetry_stream():
+        fields = parse_feed_fields(request.args)
+        rate = parse_feed_number(request.args, 'rate', SSE_MAX_RATE, SSE_MAX_RATE) or SSE_MAX_RATE
+        last_seq = parse_last_event_id(request.headers.get('Last-Event-ID'))
+        headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        return Response(stream_telemetry(fields, 1.0 / rate, last_seq), mimetype='text/event-stream', headers=headers)
+
+    @app.route('/metrics')
+    def serve_metrics():
+        return Response(LOOP_BRIDGE.run_blocking(METRICS.render_prometheus), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
     @app.route('/<path:path>')
     def serve_static(path):
         if is_dev:
             hostname = request.host.split(':')[0]
             return redirect(f"http://{hostname}:5173/{path}")
 
-        file_path = os.path.join(DIST_DIR, path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            return send_from_directory(DIST_DIR, path)
-        return send_file(os.path.join(DIST_DIR, 'index.html'))
+        return static_manifest.serve(request, path)
     
     return app
 
@@ -134,50 +721,89 @@ def handle_connect(auth=None):
     client_id = sid
     client_type = 'Viewer'
     admin_secret = None
+    stream = STREAM_FULL
+    encoding = ENCODING_JSON
+    echo = False
 
     if isinstance(auth, dict):
         if auth.get('id'):
             client_id = auth.get('id')
+        if auth.get('stream') == STREAM_DELTA:
+            stream = STREAM_DELTA
+        if auth.get('encoding') in get_supported_encodings():
+            encoding = auth.get('encoding')
+        echo = bool(auth.get('echo'))
         
         admin_secret = auth.get('admin_secret')
 
     if admin_secret:
         if SERVER_ADMIN_TOKEN is None:
-            SERVER_ADMIN_TOKEN = admin_secret
-            ADMIN_SESSIONS.add(sid)
-            socketio.emit('admin_auth_success', room=sid)
-            client_type = 'Admin'
-        elif SERVER_ADMIN_TOKEN == admin_secret:
-            ADMIN_SESSIONS.add(sid)
+            SERVER_ADMIN_TOKEN = LOOP_BRIDGE.run_blocking(WORKER_LINK.claim_admin_token, admin_secret) if WORKER_LINK is not None else admin_secret
+        if SERVER_ADMIN_TOKEN == admin_secret:
+            with CLIENT_STATE_LOCK:
+                ADMIN_SESSIONS.add(sid)
             socketio.emit('admin_auth_success', room=sid)
             client_type = 'Admin'
         else:
             socketio.emit('admin_auth_failed', "Token inválido.", room=sid)
     
-    CONNECTED_CLIENTS[sid] = {
+    info = {
         'id': client_id,
         'type': client_type,
-        'ip': request.remote_addr
+        'ip': request.remote_addr,
+        'stream': stream,
+        'encoding': encoding,
+        'echo': echo
     }
+    CLIENT_REGISTRY.add(sid, info)
+    socketio.server.enter_room(sid, client_room(client_id), namespace='/')
+    open_client_outbox(sid)
+    refresh_client_telemetry_room(sid, info)
     
     if client_type == 'Viewer':
+        assign_permission_room(sid, info)
         widgets = get_client_widgets(client_id)
         socketio.emit('widget_permissions', widgets, room=sid)
     elif client_type == 'Admin':
          socketio.emit('global_widgets_update', GLOBAL_WIDGETS, room=sid)
+         socketio.server.enter_room(sid, ADMIN_ROOM, namespace='/')
+         send_client_roster(sid)
 
-    broadcast_clients_update()
+    CLIENT_ROSTER.mark(sid)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     sid = request.sid
-    if sid in ADMIN_SESSIONS:
+    with CLIENT_STATE_LOCK:
         ADMIN_SESSIONS.discard(sid)
-    
-    if sid in CONNECTED_CLIENTS:
-        del CONNECTED_CLIENTS[sid]
+        CLIENT_OUTBOXES.pop(sid, None)
+    CLIENT_REGISTRY.remove(sid)
+    release_telemetry_room(sid)
 
-    broadcast_clients_update()
+    CLIENT_ROSTER.mark(sid)
+
+@socketio.on('clients_resync')
+def handle_clients_resync():
+    sid = request.sid
+    if sid in ADMIN_SESSIONS:
+        send_client_roster(sid)
+
+@socketio.on('delta_resync')
+def handle_delta_resync():
+    sid = request.sid
+    with TELEMETRY_ROOMS_LOCK:
+        room = CLIENT_TELEMETRY_ROOM.get(sid)
+        _, _, encoder, encoding, _ = TELEMETRY_ROOMS.get(room, (None, None, None, ENCODING_JSON, None))
+    if encoder is not None:
+        emit_frame('data_delta', EncodedFrame(encoder.snapshot()), sid, encoding)
+
+@socketio.on('history_request')
+def handle_history_request(params=None):
+    sid = request.sid
+    params = params if isinstance(params, dict) else {}
+    seconds, fields, since, max_points, mode, key = parse_history_request(params)
+    history = TELEMETRY_HISTORY.query(seconds, fields, since, binary=params.get('format') == 'binary', max_points=max_points, mode=mode, key=key)
+    socketio.emit('history_data', history, room=sid)
 
 @socketio.on('admin_publish_data')
 def handle_admin_publish(data):
@@ -185,18 +811,22 @@ def handle_admin_publish(data):
     if sid not in ADMIN_SESSIONS:
         socketio.emit('admin_auth_failed', "Não autenticado.", room=sid)
         return
-    socketio.emit('data_update', data)
+    if WORKER_LINK is not None:
+        LOOP_BRIDGE.run_blocking(WORKER_LINK.publish, data)
+        return
+    broadcast_telemetry(data)
 
 @socketio.on('get_serial_ports')
-def handle_get_serial_ports():
+def handle_get_serial_ports(options=None):
     sid = request.sid
     if sid not in ADMIN_SESSIONS:
         return
     
     if SERIAL_READER:
         try:
-            ports = SERIAL_READER.get_ports_info()
-            socketio.emit('serial_ports_list', {'current': SERIAL_READER.port, 'ports': ports}, room=sid)
+            if isinstance(options, dict) and options.get('refresh'):
+                LOOP_BRIDGE.run_blocking(SERIAL_READER.discovery.refresh)
+            emit_serial_ports(sid)
         except Exception as e:
             print(f"Erro ao listar portas: {e}")
             socketio.emit('serial_ports_error', str(e), room=sid)
@@ -208,10 +838,132 @@ def handle_set_serial_port(port_name):
         return
     
     if SERIAL_READER:
-        SERIAL_READER.set_port(port_name)
-        handle_get_serial_ports()
+        LOOP_BRIDGE.run_blocking(SERIAL_READER.set_port, port_name)
+        emit_serial_ports(sid)
+
+@socketio.on('add_serial_source')
+def handle_add_serial_source(port_name):
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
 
-def run_flask_server(host='127.0.0.1', port=8080, debug=False):
+    if SERIAL_READER:
+        try:
+            LOOP_BRIDGE.run_blocking(SERIAL_READER.add_source, port_name)
+        except ValueError as e:
+            socketio.emit('serial_ports_error', str(e), room=sid)
+            return
+        emit_serial_ports()
+
+@socketio.on('remove_serial_source')
+def handle_remove_serial_source(port_name):
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    if SERIAL_READER:
+        try:
+            LOOP_BRIDGE.run_blocking(SERIAL_READER.remove_source, port_name)
+        except ValueError as e:
+            socketio.emit('serial_ports_error', str(e), room=sid)
+            return
+        emit_serial_ports()
+
+@socketio.on('get_replay_status')
+def handle_get_replay_status():
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    if SERIAL_READER:
+        socketio.emit('replay_status', LOOP_BRIDGE.run_blocking(SERIAL_READER.get_replay_status), room=sid)
+
+@socketio.on('replay_control')
+def handle_replay_control(data):
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    if SERIAL_READER and isinstance(data, dict):
+        try:
+            status = LOOP_BRIDGE.run_blocking(SERIAL_READER.control_replay, data.get('action'), data.get('value'))
+        except (ValueError, TypeError) as e:
+            socketio.emit('serial_ports_error', str(e), room=sid)
+            return
+        socketio.emit('replay_status', status, room=sid)
+
+@socketio.on('set_serial_format')
+def handle_set_serial_format(frame_format):
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    if SERIAL_READER:
+        try:
+            LOOP_BRIDGE.run_blocking(SERIAL_READER.set_frame_format, frame_format)
+        except ValueError as e:
+            socketio.emit('serial_ports_error', str(e), room=sid)
+            return
+        handle_get_ingest_stats()
+
+@socketio.on('get_ingest_stats')
+def handle_get_ingest_stats():
+    sid = request.sid
+    if sid not in ADMIN_SESSIONS:
+        return
+
+    if SERIAL_READER:
+        stats = LOOP_BRIDGE.run_blocking(SERIAL_READER.get_ingest_stats)
+        stats['server'] = LOOP_BRIDGE.get_stats()
+        stats['roster'] = CLIENT_ROSTER.get_stats()
+        stats['registry'] = CLIENT_REGISTRY.get_stats()
+        stats['rooms'] = get_telemetry_room_stats()
+        stats['feed'] = FRAME_FEED.get_stats()
+        socketio.emit('ingest_stats', stats, room=sid)
+
+def mark_server_ready(host, port):
+    global SERVER_ADDRESS
+    SERVER_ADDRESS = (host, port)
+    STARTUP.mark('server_ready')
+    print(f"Servidor ouvindo em http://{host}:{port}")
+    SERVER_READY.set()
+
+def run_flask_server(host='127.0.0.1', port=8080, debug=False, server_mode=None, reuse_port=False, transports=None):
+    server_mode = server_mode or DEFAULT_SERVER_MODE
+    if server_mode not in SERVER_MODES:
+        raise ValueError(f"Modo de servidor desconhecido: {server_mode}")
+
+    STARTUP.mark('server_init')
     app = create_server(is_dev=debug)
-    socketio.init_app(app)
-    socketio.run(app, host=host, port=port, debug=debug, use_reloader=False, allow_unsafe_werkzeug=True)
+    options = {'transports': transports} if transports else {}
+    socketio.init_app(app, async_mode=server_mode, **options)
+    LOOP_BRIDGE.start(server_mode, socketio.start_background_task)
+    FRAME_FEED.set_event_factory(LOOP_BRIDGE.create_event)
+    socketio.start_background_task(service_client_outboxes)
+    print(f"Servidor iniciado em modo {server_mode}")
+
+    app.debug = debug
+    if debug:
+        from werkzeug.debug import DebuggedApplication
+        socketio.sockio_mw.wsgi_app = DebuggedApplication(socketio.sockio_mw.wsgi_app, evalex=True)
+
+    if server_mode == SERVER_MODE_EVENTLET:
+        import eventlet
+        import eventlet.wsgi
+        listener = eventlet.listen((host, port), reuse_port=reuse_port or None)
+        mark_server_ready(host, listener.getsockname()[1])
+        eventlet.wsgi.server(listener, app, log_output=debug, **EVENTLET_SERVER_OPTIONS)
+    else:
+        from werkzeug.serving import make_server
+        listener = open_listener(host, port) if reuse_port else None
+        server = make_server(host, port, app, threaded=True, fd=listener.fileno() if listener else None)
+        mark_server_ready(host, server.socket.getsockname()[1])
+        server.serve_forever()
+
+def open_listener(host, port, backlog=128):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    return listener
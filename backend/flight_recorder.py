@@ -0,0 +1,350 @@
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import numpy as np
+from binary_frames import TELEMETRY_SCHEMA_V1
+
+MAGIC = b'SPARKREC'
+FOOTER_MAGIC = b'SPKINDEX'
+FORMAT_VERSION = 1
+HEADER_SIZE = 4096
+FOOTER_SIZE = 4096
+ALIGNMENT = 64
+SEGMENT_SUFFIX = '.sparkrec'
+DEFAULT_SEGMENT_CAPACITY = 1 << 18
+FIRST_SEGMENT_CAPACITY = 1 << 12
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+RECORD_COLUMNS = [('seq', '<u8'), ('recv_time', '<f8')] + [
+    (name, TELEMETRY_SCHEMA_V1.dtype[name].str) for name in TELEMETRY_SCHEMA_V1.names
+]
+
+def _align(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _layout(columns, capacity):
+    layout = []
+    offset = HEADER_SIZE
+    for name, dtype in columns:
+        layout.append({'name': name, 'dtype': dtype, 'offset': offset})
+        offset += _align(np.dtype(dtype).itemsize * capacity)
+    return layout, offset
+
+def _fill_value(dtype):
+    return np.nan if np.dtype(dtype).kind == 'f' else 0
+
+def get_default_recordings_dir():
+    if getattr(sys, 'frozen', False):
+        return os.path.join(os.path.dirname(sys.executable), 'recordings')
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'recordings'))
+
+class SegmentWriter:
+    def __init__(self, path, columns, capacity, meta):
+        self.path = path
+        self.capacity = capacity
+        self.count = 0
+        layout, self.footer_offset = _layout(columns, capacity)
+        size = self.footer_offset + FOOTER_SIZE
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, 'posix_fallocate'):
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        header = dict(meta)
+        header.update({'version': FORMAT_VERSION, 'capacity': capacity, 'columns': layout, 'footer_offset': self.footer_offset})
+        header_json = json.dumps(header).encode('utf-8')
+        if len(header_json) > HEADER_SIZE - 20:
+            raise ValueError("Cabecalho do segmento excede o tamanho reservado")
+        self._mm[0:8] = MAGIC
+        self._mm[16:20] = len(header_json).to_bytes(4, 'little')
+        self._mm[20:20 + len(header_json)] = header_json
+
+        self._count_view = np.ndarray((1,), '<u8', buffer=self._mm, offset=8)
+        self._count_view[0] = 0
+        self.columns = [
+            (col['name'], np.ndarray((capacity,), col['dtype'], buffer=self._mm, offset=col['offset']), _fill_value(col['dtype']))
+            for col in layout
+        ]
+        self._seq = self.columns[0][1]
+        self._recv_time = self.columns[1][1]
+        self._fields = self.columns[2:]
+
+    def is_full(self):
+        return self.count >= self.capacity
+
+    def append(self, seq, recv_time, sample):
+        i = self.count
+        self._seq[i] = seq
+        self._recv_time[i] = recv_time
+        for name, column, fill in self._fields:
+            value = sample.get(name)
+            try:
+                column[i] = fill if value is None else value
+            except (TypeError, ValueError, OverflowError):
+                column[i] = fill
+        self.count = i + 1
+        self._count_view[0] = self.count
+
+    def build_index(self):
+        n = self.count
+        index = {'count': n, 'closed': True}
+        if n:
+            index.update({
+                'seq_first': int(self._seq[0]),
+                'seq_last': int(self._seq[n - 1]),
+                'recv_first': float(self._recv_time[0]),
+                'recv_last': float(self._recv_time[n - 1])
+            })
+            for name, column, _ in self._fields:
+                if name == 'time':
+                    index['time_first'] = int(column[0])
+                    index['time_last'] = int(column[n - 1])
+        return index
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        footer = json.dumps(self.build_index()).encode('utf-8')
+        start = self.footer_offset
+        self._mm[start:start + 8] = FOOTER_MAGIC
+        self._mm[start + 8:start + 12] = len(footer).to_bytes(4, 'little')
+        self._mm[start + 12:start + 12 + len(footer)] = footer
+        self._count_view = None
+        self.columns = []
+        self._seq = self._recv_time = None
+        self._fields = []
+        self._mm.flush()
+        self._mm.close()
+
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[0:8] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"Arquivo de gravacao invalido: {path}")
+
+        header_len = int.from_bytes(self._mm[16:20], 'little')
+        self.header = json.loads(self._mm[20:20 + header_len])
+        self.count = int(np.frombuffer(self._mm, '<u8', 1, 8)[0])
+        self.columns = {
+            col['name']: np.frombuffer(self._mm, col['dtype'], self.count, col['offset'])
+            for col in self.header['columns']
+        }
+        self.index = self._read_footer()
+
+    def _read_footer(self):
+        start = self.header['footer_offset']
+        if self._mm[start:start + 8] == FOOTER_MAGIC:
+            footer_len = int.from_bytes(self._mm[start + 8:start + 12], 'little')
+            return json.loads(self._mm[start + 12:start + 12 + footer_len])
+
+        index = {'count': self.count, 'closed': False}
+        if self.count:
+            seq = self.columns['seq']
+            recv = self.columns['recv_time']
+            index.update({
+                'seq_first': int(seq[0]),
+                'seq_last': int(seq[-1]),
+                'recv_first': float(recv[0]),
+                'recv_last': float(recv[-1])
+            })
+        return index
+
+    @property
+    def fields(self):
+        return [col['name'] for col in self.header['columns']]
+
+    def column(self, name):
+        return self.columns[name]
+
+    def close(self):
+        self.columns = {}
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+class Recording:
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        paths = sorted(
+            os.path.join(session_dir, name) for name in os.listdir(session_dir)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        self.segments = []
+        for path in paths:
+            segment = Segment(path)
+            if segment.count:
+                self.segments.append(segment)
+            else:
+                segment.close()
+        if not self.segments:
+            raise ValueError(f"Nenhum segmento encontrado em {session_dir}")
+        self.offsets = np.cumsum([0] + [seg.count for seg in self.segments])
+        self.header = self.segments[0].header
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def fields(self):
+        return self.segments[0].fields
+
+    @property
+    def telemetry_fields(self):
+        return [name for name in self.fields if name not in ('seq', 'recv_time')]
+
+    def locate(self, index):
+        seg = int(np.searchsorted(self.offsets, index, side='right')) - 1
+        return seg, index - int(self.offsets[seg])
+
+    def read(self, start, stop, fields=None):
+        fields = fields or self.fields
+        start = max(0, start)
+        stop = min(len(self), stop)
+        if start >= stop:
+            return {name: np.empty(0, self.segments[0].column(name).dtype) for name in fields}
+
+        seg, local_start = self.locate(start)
+        parts = {name: [] for name in fields}
+        remaining = stop - start
+        while remaining > 0:
+            segment = self.segments[seg]
+            local_stop = min(segment.count, local_start + remaining)
+            for name in fields:
+                parts[name].append(segment.column(name)[local_start:local_stop])
+            remaining -= local_stop - local_start
+            seg += 1
+            local_start = 0
+
+        return {
+            name: chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+            for name, chunks in parts.items()
+        }
+
+    def search_recv_time(self, recv_time):
+        for i, segment in enumerate(self.segments):
+            if segment.index.get('recv_last', float('inf')) >= recv_time:
+                local = int(np.searchsorted(segment.column('recv_time'), recv_time))
+                return int(self.offsets[i]) + local
+        return len(self)
+
+    def get_info(self):
+        return {
+            'path': self.session_dir,
+            'samples': len(self),
+            'segments': len(self.segments),
+            'started_at': self.header.get('started_at'),
+            'duration': self.segments[-1].index.get('recv_last', 0.0) - self.segments[0].index.get('recv_first', 0.0),
+            'fields': self.telemetry_fields
+        }
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+class FlightRecorder:
+    def __init__(self, base_dir=None, segment_capacity=DEFAULT_SEGMENT_CAPACITY, columns=RECORD_COLUMNS, flush_interval=DEFAULT_FLUSH_INTERVAL, enabled=True):
+        self.base_dir = base_dir or get_default_recordings_dir()
+        self.segment_capacity = segment_capacity
+        self.flush_interval = flush_interval
+        self.columns = columns
+        self.enabled = enabled
+        self.session_dir = None
+        self.writer = None
+        self.segment_number = 0
+        self.seq = 0
+        self.started_at = None
+        self.monotonic_base = None
+        self.samples_written = 0
+        self.last_flush = 0.0
+        self._flushed_samples = 0
+        self._flush_thread = None
+        self._stop_flush = threading.Event()
+        self._lock = threading.Lock()
+
+    def _open_session(self):
+        self.started_at = time.time()
+        self.monotonic_base = time.monotonic()
+        name = time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started_at))
+        self.session_dir = os.path.join(self.base_dir, name)
+        os.makedirs(self.session_dir, exist_ok=True)
+        self.segment_number = 0
+        print(f"Gravando voo em {self.session_dir}")
+        if self.flush_interval and self._flush_thread is None:
+            self._stop_flush.clear()
+            self._flush_thread = threading.Thread(target=self._flush_loop, name='recorder-flush', daemon=True)
+            self._flush_thread.start()
+
+    def _flush_loop(self):
+        while not self._stop_flush.wait(self.flush_interval):
+            self.flush()
+
+    def _open_segment(self):
+        path = os.path.join(self.session_dir, f"segment_{self.segment_number:05d}{SEGMENT_SUFFIX}")
+        meta = {
+            'segment': self.segment_number,
+            'started_at': self.started_at,
+            'monotonic_base': self.monotonic_base
+        }
+        capacity = min(self.segment_capacity, FIRST_SEGMENT_CAPACITY << min(self.segment_number, 16))
+        self.writer = SegmentWriter(path, self.columns, capacity, meta)
+        self.segment_number += 1
+
+    def append(self, sample, recv_time=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.session_dir is None:
+                self._open_session()
+            if self.writer is None or self.writer.is_full():
+                if self.writer is not None:
+                    self.writer.close()
+                self._open_segment()
+            self.writer.append(self.seq, time.monotonic() if recv_time is None else recv_time, sample)
+            self.seq += 1
+            self.samples_written += 1
+
+    def flush(self):
+        with self._lock:
+            if self.writer is not None and self.samples_written != self._flushed_samples:
+                self.writer.flush()
+                self._flushed_samples = self.samples_written
+                self.last_flush = time.time()
+
+    def close(self):
+        self._stop_flush.set()
+        if self._flush_thread is not None:
+            self._flush_thread.join(timeout=2.0)
+            self._flush_thread = None
+        with self._lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+            self.session_dir = None
+            self._flushed_samples = self.samples_written
+            self.last_flush = time.time()
+
+    def get_stats(self):
+        return {
+            'enabled': self.enabled,
+            'session': self.session_dir,
+            'segments': self.segment_number,
+            'samples_written': self.samples_written,
+            'segment_fill': self.writer.count if self.writer else 0,
+            'segment_capacity': self.writer.capacity if self.writer else self.segment_capacity,
+            'last_flush': self.last_flush
+        }
@@ -0,0 +1,93 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODING_JSON = 'json'
+ENCODING_MSGPACK = 'msgpack'
+
+def dumps_text(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def get_supported_encodings():
+    encodings = [ENCODING_JSON]
+    if msgpack is not None:
+        encodings.append(ENCODING_MSGPACK)
+    return encodings
+
+class EncodedFrame:
+    __slots__ = ('data', '_json', '_json_bytes', '_msgpack', '_projections')
+
+    def __init__(self, data):
+        self.data = data
+        self._json = None
+        self._json_bytes = None
+        self._msgpack = None
+        self._projections = None
+
+    @classmethod
+    def from_json(cls, text):
+        frame = cls(loads(text))
+        frame._json = text
+        return frame
+
+    @property
+    def json(self):
+        if self._json is None:
+            self._json = dumps_text(self.data)
+        return self._json
+
+    @property
+    def json_bytes(self):
+        if self._json_bytes is None:
+            self._json_bytes = self.json.encode('utf-8')
+        return self._json_bytes
+
+    @property
+    def msgpack(self):
+        if self._msgpack is None:
+            self._msgpack = msgpack.packb(self.data, use_bin_type=True)
+        return self._msgpack
+
+    def project(self, fields):
+        if fields is None:
+            return self
+        if self._projections is None:
+            self._projections = {}
+        projected = self._projections.get(fields)
+        if projected is None:
+            data = self.data
+            projected = self._projections[fields] = EncodedFrame({key: data[key] for key in fields if key in data})
+        return projected
+
+    def encoded(self, encoding=ENCODING_JSON):
+        if encoding == ENCODING_MSGPACK:
+            return self.msgpack
+        return self
+
+class FrameJSON:
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        if isinstance(obj, EncodedFrame):
+            return obj.json
+        if isinstance(obj, list) and any(isinstance(item, EncodedFrame) for item in obj):
+            return '[' + ','.join(item.json if isinstance(item, EncodedFrame) else dumps_text(item) for item in obj) + ']'
+        return dumps_text(obj)
+
+    @staticmethod
+    def loads(data, *args, **kwargs):
+        return loads(data)
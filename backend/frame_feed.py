@@ -0,0 +1,59 @@
+import os
+import threading
+import zlib
+
+class FrameFeed:
+    def __init__(self):
+        self.seq = 0
+        self.frame = None
+        self.boot_id = os.urandom(4).hex()
+        self.waiting = 0
+        self.streams = 0
+        self.snapshots = 0
+        self.not_modified = 0
+        self._create_event = threading.Event
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    def set_event_factory(self, factory):
+        with self._lock:
+            self._create_event = factory
+            self._event = factory()
+
+    def publish(self, frame):
+        with self._lock:
+            self.seq += 1
+            self.frame = frame
+            event, self._event = self._event, self._create_event()
+        event.set()
+
+    def latest(self):
+        with self._lock:
+            return self.seq, self.frame
+
+    def etag(self, seq, fields=None):
+        tag = f'{self.boot_id}-{seq}'
+        if fields:
+            tag += '-' + format(zlib.crc32(','.join(fields).encode('utf-8')), 'x')
+        return tag
+
+    def wait(self, after_seq, timeout):
+        with self._lock:
+            if self.seq > after_seq:
+                return self.seq, self.frame
+            event = self._event
+        self.waiting += 1
+        try:
+            event.wait(timeout)
+        finally:
+            self.waiting -= 1
+        return self.latest()
+
+    def get_stats(self):
+        return {
+            'seq': self.seq,
+            'waiting': self.waiting,
+            'streams': self.streams,
+            'snapshots': self.snapshots,
+            'not_modified': self.not_modified
+        }
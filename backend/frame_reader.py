@@ -0,0 +1,115 @@
+import time
+from binary_frames import FORMAT_AUTO, FORMAT_JSON, FRAME_DELIMITERS, detect_format
+
+class FrameReader:
+    def __init__(self, conn, frame_format=FORMAT_JSON, chunk_size=8192, max_frame_size=4096):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self._scan_pos = 0
+        self.set_format(frame_format)
+
+        self.bytes_total = 0
+        self.frames_total = 0
+        self.partial_frames = 0
+        self.overflow_frames = 0
+        self.discarded_bytes = 0
+
+        self.bytes_per_sec = 0.0
+        self.frames_per_sec = 0.0
+        self._rate_time = time.monotonic()
+        self._rate_bytes = 0
+        self._rate_frames = 0
+
+    def read_chunk(self):
+        # read(1) bloqueia ate o timeout da porta quando nao ha nada no buffer,
+        # evitando o polling; com dados pendentes lemos tudo de uma vez.
+        waiting = self.conn.in_waiting
+        return self.conn.read(min(waiting, self.chunk_size) if waiting else 1)
+
+    def read_frames(self):
+        chunk = self.read_chunk()
+        frames = self.feed(chunk) if chunk else []
+        self._update_rates()
+        return frames
+
+    def set_format(self, frame_format):
+        if frame_format == FORMAT_AUTO:
+            self.format = None
+            self.delimiter = None
+        else:
+            self.format = frame_format
+            self.delimiter = FRAME_DELIMITERS[frame_format]
+        self._scan_pos = 0
+
+    def feed(self, chunk):
+        buf = self.buffer
+        buf += chunk
+        self.bytes_total += len(chunk)
+
+        if self.format is None:
+            detected = detect_format(buf)
+            if detected is None:
+                if len(buf) > self.max_frame_size:
+                    self.discarded_bytes += len(buf) - self.max_frame_size
+                    del buf[:-self.max_frame_size]
+                return []
+            print(f"Formato de telemetria detectado: {detected}")
+            self.set_format(detected)
+
+        frames = []
+        strip_cr = self.format == FORMAT_JSON
+        delimiter = self.delimiter
+        start = 0
+        idx = buf.find(delimiter, self._scan_pos)
+        while idx != -1:
+            end = idx
+            if strip_cr and end > start and buf[end - 1] == 0x0D:
+                end -= 1
+            if end > start:
+                frames.append(bytes(buf[start:end]))
+            start = idx + len(delimiter)
+            idx = buf.find(delimiter, start)
+
+        if start:
+            del buf[:start]
+        self.frames_total += len(frames)
+
+        if buf:
+            if len(buf) > self.max_frame_size:
+                self.overflow_frames += 1
+                self.discarded_bytes += len(buf)
+                buf.clear()
+        self._scan_pos = len(buf)
+        return frames
+
+    def reset(self):
+        if self.buffer:
+            self.partial_frames += 1
+            self.discarded_bytes += len(self.buffer)
+        self.buffer.clear()
+        self._scan_pos = 0
+
+    def _update_rates(self):
+        now = time.monotonic()
+        elapsed = now - self._rate_time
+        if elapsed >= 1.0:
+            self.bytes_per_sec = (self.bytes_total - self._rate_bytes) / elapsed
+            self.frames_per_sec = (self.frames_total - self._rate_frames) / elapsed
+            self._rate_time = now
+            self._rate_bytes = self.bytes_total
+            self._rate_frames = self.frames_total
+
+    def get_stats(self):
+        return {
+            'format': self.format,
+            'bytes_total': self.bytes_total,
+            'frames_total': self.frames_total,
+            'partial_frames': self.partial_frames,
+            'overflow_frames': self.overflow_frames,
+            'discarded_bytes': self.discarded_bytes,
+            'buffered_bytes': len(self.buffer),
+            'bytes_per_sec': round(self.bytes_per_sec, 1),
+            'frames_per_sec': round(self.frames_per_sec, 1)
+        }
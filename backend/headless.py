@@ -0,0 +1,322 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from telemetry_bus import TelemetryBus, BusReader, MAX_WAITERS
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+RESTART_DELAY = 1.0
+MONITOR_INTERVAL = 0.5
+WORKER_TRANSPORTS = ['websocket']
+READER_CALLS = {
+    'port', 'get_ports_info', 'set_port', 'add_source', 'remove_source', 'set_frame_format',
+    'get_replay_status', 'control_replay', 'get_ingest_stats', 'discovery.refresh', 'merger.get_stats'
+}
+
+def supports_reuse_port():
+    return hasattr(socket, 'SO_REUSEPORT')
+
+class WorkerHandle:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.rpc = None
+        self.events = None
+        self.started_at = None
+        self.dead_at = None
+        self.restarts = 0
+        self.exit_code = None
+        self._send_lock = threading.Lock()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, event, payload=None):
+        try:
+            with self._send_lock:
+                self.events.send((event, payload))
+        except (OSError, EOFError, AttributeError):
+            pass
+
+    def get_stats(self):
+        return {
+            'index': self.index,
+            'pid': self.process.pid if self.process else None,
+            'alive': self.is_alive(),
+            'restarts': self.restarts,
+            'exit_code': self.exit_code,
+            'uptime_s': round(time.monotonic() - self.started_at, 1) if self.started_at else None
+        }
+
+class HeadlessSupervisor:
+    def __init__(self, serial_reader, host='0.0.0.0', port=8080, workers=DEFAULT_WORKERS, server_mode=None):
+        if workers > 1 and not supports_reuse_port():
+            print("SO_REUSEPORT indisponível neste sistema, usando um único worker web")
+            workers = 1
+        if workers > MAX_WAITERS:
+            print(f"Limitando a {MAX_WAITERS} workers web")
+            workers = MAX_WAITERS
+        self.serial_reader = serial_reader
+        self.host = host
+        self.port = port
+        self.server_mode = server_mode
+        self.workers = [WorkerHandle(i) for i in range(workers)]
+        self.reuse_port = supports_reuse_port()
+        self.transports = WORKER_TRANSPORTS if workers > 1 else None
+        self.bus = TelemetryBus()
+        self.admin_token = None
+        self.state = None
+        self.rosters = {}
+        self.running = False
+        self.thread = None
+        self._state_lock = threading.Lock()
+        self._context = multiprocessing.get_context('spawn')
+
+        serial_reader.pipeline.remove_sink('broadcast')
+        serial_reader.pipeline.remove_sink('history')
+        serial_reader.pipeline.add_sink('bus', self.bus.publish, with_origin=True)
+        serial_reader.discovery.on_change = self.notify_serial_ports
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        for worker in self.workers:
+            self._spawn(worker)
+        self.thread = threading.Thread(target=self._monitor_loop, name='headless-monitor', daemon=True)
+        self.thread.start()
+        print(f"Modo headless: {len(self.workers)} workers web na porta {self.port}, barramento {self.bus.name}")
+
+    def stop(self):
+        self.running = False
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=2.0)
+        self.bus.close()
+
+    def wait(self):
+        try:
+            while self.running:
+                time.sleep(MONITOR_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+    def _spawn(self, worker):
+        rpc_parent, rpc_child = self._context.Pipe()
+        events_reader, events_writer = self._context.Pipe(duplex=False)
+        wake_reader, wake_writer = self._context.Pipe(duplex=False)
+        self.bus.set_waiter(worker.index, wake_writer)
+        worker.process = self._context.Process(
+            target=run_web_worker,
+            args=(worker.index, self.bus.name, wake_reader, rpc_child, events_reader, self.host, self.port, self.server_mode, self.reuse_port, self.transports),
+            name=f"spark-web-{worker.index}",
+            daemon=True
+        )
+        worker.process.start()
+        rpc_child.close()
+        events_reader.close()
+        wake_reader.close()
+        worker.rpc = rpc_parent
+        worker.events = events_writer
+        worker.started_at = time.monotonic()
+        worker.exit_code = None
+        with self._state_lock:
+            state = self.state
+            dropped = self.rosters.pop(worker.index, None)
+            rosters = {index: list(entries.values()) for index, entries in self.rosters.items()}
+        if state is not None:
+            worker.send('state', state)
+        if rosters:
+            worker.send('roster_sync', rosters)
+        if dropped:
+            for other in self.workers:
+                if other is not worker:
+                    other.send('roster_reset', worker.index)
+        threading.Thread(target=self._serve_worker, args=(worker, rpc_parent), name=f"headless-rpc-{worker.index}", daemon=True).start()
+
+    def _monitor_loop(self):
+        while self.running:
+            time.sleep(MONITOR_INTERVAL)
+            for worker in self.workers:
+                if not self.running or worker.is_alive():
+                    continue
+                if worker.exit_code is None:
+                    worker.exit_code = worker.process.exitcode
+                    print(f"Worker web {worker.index} terminou (código {worker.exit_code}), reiniciando")
+                    worker.dead_at = time.monotonic()
+                elif time.monotonic() - worker.dead_at >= RESTART_DELAY:
+                    worker.restarts += 1
+                    self._spawn(worker)
+
+    def _serve_worker(self, worker, conn):
+        while True:
+            try:
+                kind, name, args = conn.recv()
+            except (EOFError, OSError):
+                return
+            try:
+                result = ('ok', self._handle(worker, kind, name, args))
+            except Exception as e:
+                result = ('error', e)
+            try:
+                conn.send(result)
+            except (OSError, EOFError):
+                return
+
+    def _handle(self, worker, kind, name, args):
+        if kind == 'call':
+            return self._call_reader(name, args)
+        if kind == 'claim_admin':
+            with self._state_lock:
+                if self.admin_token is None:
+                    self.admin_token = args[0]
+                return self.admin_token
+        if kind == 'state':
+            with self._state_lock:
+                self.state = dict(args[0], admin_token=self.admin_token)
+                for other in self.workers:
+                    if other is not worker:
+                        other.send('state', self.state)
+            return None
+        if kind == 'roster':
+            delta = {key: args[0][key] for key in ('added', 'changed', 'removed')}
+            with self._state_lock:
+                entries = self.rosters.setdefault(worker.index, {})
+                for entry in delta['added'] + delta['changed']:
+                    entries[entry['sid']] = entry
+                for sid in delta['removed']:
+                    entries.pop(sid, None)
+            for other in self.workers:
+                if other is not worker:
+                    other.send('roster', (worker.index, delta))
+            return None
+        if kind == 'publish':
+            self.bus.publish(args[0])
+            return None
+        raise ValueError(f"Requisição desconhecida do worker: {kind}")
+
+    def _call_reader(self, name, args):
+        if name not in READER_CALLS:
+            raise ValueError(f"Chamada não permitida: {name}")
+        target = self.serial_reader
+        for part in name.split('.'):
+            target = getattr(target, part)
+        if name == 'port':
+            return target
+        result = target(*args)
+        if name == 'get_ingest_stats':
+            result['bus'] = self.bus.get_stats()
+            result['workers'] = [w.get_stats() for w in self.workers]
+        return result
+
+    def notify_serial_ports(self):
+        for worker in self.workers:
+            worker.send('serial_ports')
+
+class WorkerLink:
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+
+    def request(self, kind, name=None, *args):
+        with self._lock:
+            self.conn.send((kind, name, args))
+            status, value = self.conn.recv()
+        if status == 'error':
+            raise value
+        return value
+
+    def claim_admin_token(self, secret):
+        return self.request('claim_admin', None, secret)
+
+    def share_state(self, state):
+        self.request('state', None, state)
+
+    def share_roster(self, delta):
+        self.request('roster', None, delta)
+
+    def publish(self, data):
+        self.request('publish', None, data)
+
+class RemoteCall:
+    def __init__(self, link, prefix):
+        self._link = link
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        path = f"{self._prefix}.{name}"
+        return lambda *args: self._link.request('call', path, *args)
+
+class RemoteSerialReader:
+    def __init__(self, link):
+        self._link = link
+        self.discovery = RemoteCall(link, 'discovery')
+        self.merger = RemoteCall(link, 'merger')
+
+    @property
+    def port(self):
+        return self._link.request('call', 'port')
+
+    def __getattr__(self, name):
+        return lambda *args: self._link.request('call', name, *args)
+
+def feed_from_bus(bus_name, index, wake):
+    import flask_server
+    from frame_codec import EncodedFrame
+
+    reader = BusReader(bus_name, index, wake)
+    reader.seek_oldest()
+    frame = None
+    for payload, _ in reader.read():
+        frame = EncodedFrame.from_json(payload)
+        flask_server.TELEMETRY_HISTORY.append(frame.data)
+    if frame is not None:
+        flask_server.broadcast_telemetry(frame)
+
+    while True:
+        for payload, origin in reader.poll():
+            frame = EncodedFrame.from_json(payload)
+            flask_server.TELEMETRY_HISTORY.append(frame.data)
+            flask_server.broadcast_telemetry(frame, origin)
+
+def listen_for_events(events):
+    import flask_server
+
+    while True:
+        try:
+            event, payload = events.recv()
+        except (EOFError, OSError):
+            print("Processo de ingestão encerrado, finalizando worker web")
+            os._exit(0)
+        if event == 'state':
+            flask_server.apply_shared_state(payload)
+        elif event == 'serial_ports':
+            flask_server.broadcast_serial_ports()
+        elif event == 'roster':
+            flask_server.apply_remote_roster(*payload)
+        elif event == 'roster_reset':
+            flask_server.drop_remote_roster(payload)
+        elif event == 'roster_sync':
+            for worker, entries in payload.items():
+                flask_server.apply_remote_roster(worker, {'added': entries, 'changed': [], 'removed': []})
+
+def run_web_worker(index, bus_name, wake, rpc, events, host, port, server_mode=None, reuse_port=True, transports=None):
+    import flask_server
+
+    link = WorkerLink(rpc)
+    flask_server.set_worker_link(link, index)
+    flask_server.set_serial_reader(RemoteSerialReader(link))
+    threading.Thread(target=listen_for_events, args=(events,), name='worker-events', daemon=True).start()
+    threading.Thread(target=feed_from_bus, args=(bus_name, index, wake), name='worker-bus', daemon=True).start()
+    print(f"Worker web {index} iniciado (pid {os.getpid()})")
+    flask_server.run_flask_server(host=host, port=port, server_mode=server_mode, reuse_port=reuse_port, transports=transports)
+
+def run_headless(serial_reader, host='0.0.0.0', port=8080, workers=DEFAULT_WORKERS, server_mode=None):
+    supervisor = HeadlessSupervisor(serial_reader, host=host, port=port, workers=workers, server_mode=server_mode)
+    supervisor.start()
+    supervisor.wait()
+    supervisor.stop()
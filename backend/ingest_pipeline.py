@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+
+DROP_OLDEST = 'drop_oldest'
+LATEST_WINS = 'latest_wins'
+
+class StageQueue:
+    def __init__(self, name, capacity, policy=DROP_OLDEST):
+        if policy not in (DROP_OLDEST, LATEST_WINS):
+            raise ValueError(f"Politica de overflow desconhecida: {policy}")
+        self.name = name
+        self.capacity = 1 if policy == LATEST_WINS else capacity
+        self.policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, payload, origin=None):
+        now = time.monotonic()
+        item = (payload, now, origin if origin is not None else now)
+        with self._cond:
+            if len(self._items) >= self.capacity:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.enqueued += 1
+            if len(self._items) > self.max_depth:
+                self.max_depth = len(self._items)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+                if not self._items:
+                    return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+
+    def wake_all(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_stats(self):
+        return {
+            'policy': self.policy,
+            'capacity': self.capacity,
+            'depth': len(self._items),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped
+        }
+
+class Stage:
+    def __init__(self, name, handler, queue, outputs=None, workers=1, with_origin=False):
+        self.name = name
+        self.handler = handler
+        self.queue = queue
+        self.outputs = outputs or []
+        self.workers = workers
+        self.with_origin = with_origin
+        self.running = False
+        self.threads = []
+        self.processed = 0
+        self.errors = 0
+        self.wait_ms_avg = 0.0
+        self.wait_ms_max = 0.0
+        self.process_ms_avg = 0.0
+        self.process_ms_max = 0.0
+        self.age_ms_avg = 0.0
+        self._stats_lock = threading.Lock()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.threads = []
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run_loop, name=f"ingest-{self.name}-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def stop(self):
+        self.running = False
+        self.queue.wake_all()
+        for t in self.threads:
+            t.join(timeout=1.0)
+        self.threads = []
+
+    def _run_loop(self):
+        while self.running:
+            item = self.queue.get(timeout=0.5)
+            if item is None:
+                continue
+            payload, enqueued_at, origin = item
+            started = time.monotonic()
+            try:
+                if self.with_origin:
+                    result = self.handler(payload, origin)
+                else:
+                    result = self.handler(payload)
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                print(f"Erro no estagio {self.name}: {e}")
+                continue
+            finished = time.monotonic()
+
+            if result is not None:
+                for output in self.outputs:
+                    if isinstance(result, list):
+                        for r in result:
+                            output.put(r, origin)
+                    else:
+                        output.put(result, origin)
+
+            self._record(started - enqueued_at, finished - started, finished - origin)
+
+    def _record(self, wait, process, age):
+        wait_ms = wait * 1000.0
+        process_ms = process * 1000.0
+        age_ms = age * 1000.0
+        with self._stats_lock:
+            self.processed += 1
+            self.wait_ms_avg += (wait_ms - self.wait_ms_avg) * 0.05
+            self.process_ms_avg += (process_ms - self.process_ms_avg) * 0.05
+            self.age_ms_avg += (age_ms - self.age_ms_avg) * 0.05
+            if wait_ms > self.wait_ms_max:
+                self.wait_ms_max = wait_ms
+            if process_ms > self.process_ms_max:
+                self.process_ms_max = process_ms
+
+    def get_stats(self):
+        stats = self.queue.get_stats()
+        with self._stats_lock:
+            stats.update({
+                'workers': self.workers,
+                'processed': self.processed,
+                'errors': self.errors,
+                'wait_ms_avg': round(self.wait_ms_avg, 3),
+                'wait_ms_max': round(self.wait_ms_max, 3),
+                'process_ms_avg': round(self.process_ms_avg, 3),
+                'process_ms_max': round(self.process_ms_max, 3),
+                'age_ms_avg': round(self.age_ms_avg, 3)
+            })
+        return stats
+
+class IngestPipeline:
+    def __init__(self, decode, broadcast, record=None, raw_capacity=8192, record_capacity=65536, parser_workers=1):
+        self.raw_queue = StageQueue('decode', raw_capacity, DROP_OLDEST)
+        self.decode_stage = Stage('decode', decode, self.raw_queue, workers=parser_workers)
+        self.sink_stages = []
+        self.broadcast_stage = self.add_sink('broadcast', broadcast, policy=LATEST_WINS, with_origin=True)
+        self.record_stage = None
+        if record is not None:
+            self.record_stage = self.add_sink('record', record, record_capacity, DROP_OLDEST, with_origin=True)
+
+    def add_sink(self, name, handler, capacity=65536, policy=DROP_OLDEST, with_origin=False):
+        stage = Stage(name, handler, StageQueue(name, capacity, policy), with_origin=with_origin)
+        self.sink_stages.append(stage)
+        self.decode_stage.outputs.append(stage.queue)
+        if self.decode_stage.running:
+            stage.start()
+        return stage
+
+    def remove_sink(self, name):
+        stage = next((s for s in self.sink_stages if s.name == name), None)
+        if stage is None:
+            return False
+        self.sink_stages = [s for s in self.sink_stages if s is not stage]
+        self.decode_stage.outputs = [q for q in self.decode_stage.outputs if q is not stage.queue]
+        if stage is self.broadcast_stage:
+            self.broadcast_stage = None
+        if stage is self.record_stage:
+            self.record_stage = None
+        stage.stop()
+        return True
+
+    def start(self):
+        for stage in self.sink_stages:
+            stage.start()
+        self.decode_stage.start()
+
+    def stop(self):
+        self.decode_stage.stop()
+        for stage in self.sink_stages:
+            stage.stop()
+
+    def submit_raw(self, frame, origin=None):
+        self.raw_queue.put(frame, origin)
+
+    def submit_decoded(self, data, origin=None, record=True):
+        for stage in self.sink_stages:
+            if stage is self.record_stage and not record:
+                continue
+            stage.queue.put(data, origin)
+
+    def get_stats(self):
+        stats = {'decode': self.decode_stage.get_stats()}
+        for stage in self.sink_stages:
+            stats[stage.name] = stage.get_stats()
+        return stats
@@ -0,0 +1,119 @@
+import collections
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SERVER_MODE_THREADING = 'threading'
+SERVER_MODE_EVENTLET = 'eventlet'
+SERVER_MODES = (SERVER_MODE_THREADING, SERVER_MODE_EVENTLET)
+BLOCKING_WORKERS = 4
+
+class GreenEvent:
+    def __init__(self):
+        from eventlet.event import Event
+        self._event = Event()
+
+    def set(self):
+        if not self._event.ready():
+            self._event.send(True)
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+class LoopBridge:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.mode = SERVER_MODE_THREADING
+        self.pending = collections.deque(maxlen=capacity)
+        self.submitted = 0
+        self.executed = 0
+        self.dropped = 0
+        self.blocking_calls = 0
+        self._executor = None
+        self._loop_thread = None
+        self._signalled = False
+        self._signal_lock = threading.Lock()
+        self._reader = None
+        self._writer = None
+
+    def start(self, mode, spawn):
+        self.mode = mode
+        if mode == SERVER_MODE_THREADING:
+            return
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        self._loop_thread = threading.get_ident()
+        self._executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='loop-blocking')
+        spawn(self._drain)
+
+    def call(self, fn, *args):
+        if self._loop_thread is None or threading.get_ident() == self._loop_thread:
+            fn(*args)
+            return
+
+        if len(self.pending) == self.capacity:
+            self.dropped += 1
+        self.pending.append((fn, args))
+        self.submitted += 1
+        with self._signal_lock:
+            if self._signalled:
+                return
+            self._signalled = True
+        try:
+            self._writer.send(b'\x00')
+        except (BlockingIOError, OSError):
+            pass
+
+    def run_blocking(self, fn, *args):
+        if self._loop_thread is None or threading.get_ident() != self._loop_thread:
+            return fn(*args)
+        from eventlet.event import Event
+        done = Event()
+        self.blocking_calls += 1
+        self._executor.submit(self._run_detached, done, fn, args)
+        ok, value = done.wait()
+        if not ok:
+            raise value
+        return value
+
+    def _run_detached(self, done, fn, args):
+        try:
+            result = (True, fn(*args))
+        except Exception as e:
+            result = (False, e)
+        self.call(done.send, result)
+
+    def create_event(self):
+        if self.mode == SERVER_MODE_EVENTLET:
+            return GreenEvent()
+        return threading.Event()
+
+    def _drain(self):
+        from eventlet.hubs import trampoline
+        while True:
+            trampoline(self._reader.fileno(), read=True)
+            with self._signal_lock:
+                self._signalled = False
+                try:
+                    self._reader.recv(4096)
+                except (BlockingIOError, OSError):
+                    pass
+
+            while self.pending:
+                fn, args = self.pending.popleft()
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"Erro ao executar tarefa no loop do servidor: {e}")
+                self.executed += 1
+
+    def get_stats(self):
+        return {
+            'mode': self.mode,
+            'pending': len(self.pending),
+            'submitted': self.submitted,
+            'executed': self.executed,
+            'dropped': self.dropped,
+            'blocking_calls': self.blocking_calls
+        }
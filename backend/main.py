@@ -1,12 +1,10 @@
-import webview 
+import argparse
+import multiprocessing
 import os
 import sys
 import threading
 import subprocess
-from flask_server import run_flask_server, set_serial_reader
-import time
-from window_manager import UIMain
-from serial_reader import SerialReader
+from startup import STARTUP, wait_for_port
 
 if getattr(sys, 'frozen', False):
     DEV = False
@@ -15,6 +13,8 @@ else:
 
 VITE_PORT = 5173
 FLASK_PORT = 8080
+BACKUP_PORTS = []
+READY_TIMEOUT = 10.0
 vite_process = None
 
 def start_vite():
@@ -30,7 +30,6 @@ def start_vite():
             cwd=frontend_dir,
             shell=True
         )
-        time.sleep(3)
     except Exception as e:
         print(f"Erro ao iniciar Vite: {e}")
 
@@ -43,10 +42,52 @@ def stop_vite():
         except:
             pass
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Supervisório SPARK")
+    parser.add_argument('--headless', action='store_true', help="Roda sem janelas, com workers web em processos separados")
+    parser.add_argument('--workers', type=int, default=None, help="Número de workers web no modo headless")
+    parser.add_argument('--no-record', dest='record', action='store_false', default=os.environ.get('SPARK_RECORD', '1') != '0', help="Não grava as amostras recebidas em recordings/")
+    parser.add_argument('--record-segment', type=int, default=None, help="Amostras máximas por segmento de gravação")
+    parser.add_argument('--profile-startup', action='store_true', help="Mostra o tempo de cada fase da inicialização")
+    return parser.parse_known_args()[0]
+
+def start_backend(args):
+    from flask_server import set_serial_reader
+    from serial_reader import SerialReader
+
+    from flight_recorder import FlightRecorder, DEFAULT_SEGMENT_CAPACITY
+
+    recorder = FlightRecorder(segment_capacity=max(1, args.record_segment or DEFAULT_SEGMENT_CAPACITY), enabled=args.record)
+    if not args.record:
+        print("Gravação de voo desativada")
+    serial_reader = SerialReader(port='COM7', baudrate=115200, recorder=recorder, extra_ports=BACKUP_PORTS)
+    set_serial_reader(serial_reader)
+    serial_reader.start()
+    STARTUP.mark('serial_started')
+    return serial_reader
+
 def start_flask_thread():
+    from flask_server import run_flask_server
     run_flask_server(host='0.0.0.0', port=FLASK_PORT, debug=DEV)
 
+def boot_backend(args, ui, backend):
+    backend['serial_reader'] = start_backend(args)
+    from flask_server import SERVER_READY
+
+    flask_thread = threading.Thread(target=start_flask_thread, daemon=True)
+    flask_thread.start()
+    if not SERVER_READY.wait(READY_TIMEOUT):
+        print("Servidor não ficou pronto a tempo.")
+    if DEV and wait_for_port('127.0.0.1', VITE_PORT, READY_TIMEOUT):
+        STARTUP.mark('vite_ready')
+    ui.ready.set()
+    ui.show_when_ready()
+    STARTUP.mark('app_loaded')
+    STARTUP.report()
+
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    args = parse_args()
     if getattr(sys, 'frozen', False):
         try:
             exe_dir = os.path.dirname(sys.executable)
@@ -57,33 +98,35 @@ if __name__ == '__main__':
         except:
             pass
 
-    serial_reader = SerialReader(port='COM7', baudrate=115200)
-    set_serial_reader(serial_reader)
-    serial_reader.start()
+    STARTUP.mark('imports')
+
+    if args.headless:
+        from headless import run_headless, DEFAULT_WORKERS
+        serial_reader = start_backend(args)
+        run_headless(serial_reader, port=FLASK_PORT, workers=max(1, args.workers or DEFAULT_WORKERS))
+        serial_reader.stop()
+        sys.exit(0)
 
     if DEV:
         PORT = VITE_PORT
         print(f"Modo de desenvolvimento - Vite server na porta {VITE_PORT}")
         start_vite()
-        flask_thread = threading.Thread(target=start_flask_thread, daemon=True)
-        flask_thread.start()
     else:
         PORT = FLASK_PORT
-        flask_thread = threading.Thread(target=start_flask_thread, daemon=True)
-        flask_thread.start()
-        time.sleep(2)
-    
-    ui = UIMain(port=PORT)
+
+    from window_manager import UIMain
+    backend = {}
+    ui = UIMain(port=PORT, ready=threading.Event())
     ui.open_user_window()
-    ui.open_admin_window() 
-        
-    print("Janelas abertas.")
+    ui.open_admin_window()
+    STARTUP.mark('windows_created')
+
     print("Aplicação iniciada. Feche a janela de admin para encerrar.")
 
-    ui.wait_for_windows()
-    serial_reader.stop()
-    
+    ui.wait_for_windows(on_start=lambda: boot_backend(args, ui, backend))
+
+    if backend.get('serial_reader'):
+        backend['serial_reader'].stop()
+
     if DEV:
         stop_vite()
-    
-    serial_reader.stop()
@@ -0,0 +1,205 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+LATENCY_BUCKETS = tuple(0.00005 * (2 ** i) for i in range(18))
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return '{' + ','.join(parts) + '}'
+
+class Counter:
+    type_name = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        return [(self.name, (), self.value)]
+
+    def snapshot(self):
+        return self.value
+
+class Gauge:
+    type_name = 'gauge'
+
+    def __init__(self, name, help_text, collect):
+        self.name = name
+        self.help = help_text
+        self.collect = collect
+
+    def samples(self):
+        value = self.collect()
+        if isinstance(value, dict):
+            return [(self.name, labels, v) for labels, v in value.items()]
+        return [(self.name, (), value)]
+
+    def snapshot(self):
+        value = self.collect()
+        if isinstance(value, dict):
+            return {','.join(str(v) for _, v in labels): v for labels, v in value.items()}
+        return value
+
+class RateGauge(Gauge):
+    def __init__(self, name, help_text, counter, window=10.0):
+        super().__init__(name, help_text, self._rate)
+        self.counter = counter
+        self.window = window
+        self._points = deque([(time.monotonic(), counter.value)])
+        self._lock = threading.Lock()
+
+    def _rate(self):
+        now = time.monotonic()
+        value = self.counter.value
+        with self._lock:
+            if not self._points or now - self._points[-1][0] >= 1.0:
+                self._points.append((now, value))
+            while len(self._points) > 1 and now - self._points[0][0] > self.window:
+                self._points.popleft()
+            t0, v0 = self._points[0]
+        if now - t0 <= 0:
+            return 0.0
+        return round((value - v0) / (now - t0), 3)
+
+class Histogram:
+    type_name = 'histogram'
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if seen >= rank:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def samples(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, value_sum = self.count, self.sum
+        lines = []
+        cumulative = 0
+        for bound, c in zip(self.buckets + (float('inf'),), counts):
+            cumulative += c
+            lines.append((self.name + '_bucket', (('le', _format_value(bound)),), cumulative))
+        lines.append((self.name + '_sum', (), value_sum))
+        lines.append((self.name + '_count', (), total))
+        return lines
+
+    def snapshot(self):
+        p50, p90, p99 = self.quantile(0.5), self.quantile(0.9), self.quantile(0.99)
+        with self._lock:
+            count, value_sum, value_max = self.count, self.sum, self.max
+        to_ms = lambda v: round(v * 1000.0, 3) if v is not None else None
+        return {
+            'count': count,
+            'mean_ms': to_ms(value_sum / count) if count else None,
+            'p50_ms': to_ms(p50),
+            'p90_ms': to_ms(p90),
+            'p99_ms': to_ms(p99),
+            'max_ms': to_ms(value_max) if count else None
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text):
+        return self.register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, collect):
+        return self.register(Gauge(name, help_text, collect))
+
+    def rate(self, name, help_text, counter):
+        return self.register(RateGauge(name, help_text, counter))
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, buckets))
+
+    def render_prometheus(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Erro ao coletar metrica {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        result = {}
+        for name, metric in list(self.metrics.items()):
+            try:
+                result[name] = metric.snapshot()
+            except Exception as e:
+                print(f"Erro ao coletar metrica {name}: {e}")
+        return result
+
+METRICS = MetricsRegistry()
+
+READ_TO_EMIT_SECONDS = METRICS.histogram('spark_read_to_emit_seconds', 'Tempo entre a leitura do frame na serial e o envio aos clientes.')
+PARSE_SECONDS = METRICS.histogram('spark_parse_seconds', 'Tempo de decodificacao de um lote de frames.')
+EMIT_SECONDS = METRICS.histogram('spark_emit_seconds', 'Duracao do fan-out de um frame para todas as salas.')
+CLIENT_RTT_SECONDS = METRICS.histogram('spark_client_rtt_seconds', 'Ida e volta servidor-navegador medida pelo eco do cliente.')
+UART_TO_BROWSER_SECONDS = METRICS.histogram('spark_uart_to_browser_seconds', 'Estimativa da leitura na serial ate o navegador (read->emit + rtt/2).')
+FRAMES_TOTAL = METRICS.counter('spark_frames_total', 'Frames lidos da fonte de telemetria.')
+BYTES_TOTAL = METRICS.counter('spark_bytes_total', 'Bytes lidos da porta serial.')
+DECODE_ERRORS_TOTAL = METRICS.counter('spark_decode_errors_total', 'Frames descartados por erro de decodificacao.')
+SERIAL_RECONNECTS_TOTAL = METRICS.counter('spark_serial_reconnects_total', 'Reconexoes da porta serial.')
+SERIAL_RECOVERY_SECONDS = METRICS.histogram('spark_serial_recovery_seconds', 'Tempo entre a falha da serial e o primeiro frame apos reconectar.')
+EMITTED_FRAMES_TOTAL = METRICS.counter('spark_emitted_frames_total', 'Frames entregues ao fan-out do Socket.IO.')
+DUPLICATE_FRAMES_TOTAL = METRICS.counter('spark_duplicate_frames_total', 'Frames descartados na fusao de receptores (duplicados ou atrasados).')
+FRAMES_PER_SECOND = METRICS.rate('spark_frames_per_second', 'Taxa de frames lidos nos ultimos 10 s.', FRAMES_TOTAL)
+BYTES_PER_SECOND = METRICS.rate('spark_bytes_per_second', 'Taxa de bytes lidos nos ultimos 10 s.', BYTES_TOTAL)
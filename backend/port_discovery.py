@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import serial
+import serial.tools.list_ports
+from binary_frames import detect_format
+
+STATUS_PROBING = 'probing'
+STATUS_AVAILABLE = 'available'
+STATUS_WITH_DATA = 'available_with_data'
+STATUS_BUSY = 'busy'
+
+def port_identity(info):
+    if info.vid is not None:
+        return (info.vid, info.pid, info.serial_number or info.device)
+    return (info.device, info.hwid)
+
+class PortDiscovery:
+    def __init__(self, baudrate=115200, in_use=None, on_change=None, on_plug=None, watch=None, ttl=15.0, scan_interval=1.0, probe_timeout=0.3, deadline=1.0, max_workers=8):
+        self.baudrate = baudrate
+        self.in_use = in_use or (lambda device: False)
+        self.on_change = on_change
+        self.on_plug = on_plug
+        self.watch = watch
+        self._watched = None
+        self.ttl = ttl
+        self.scan_interval = scan_interval
+        self.probe_timeout = probe_timeout
+        self.deadline = deadline
+        self.ports = {}
+        self.probed = {}
+        self.scans = 0
+        self.probes = 0
+        self.last_scan_ms = 0.0
+        self.running = False
+        self.thread = None
+        self._pool = None
+        self._pending = set()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='port-probe')
+        self.thread = threading.Thread(target=self._run_loop, name='port-discovery', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        if self._pool:
+            self._pool.shutdown(wait=False)
+
+    def refresh(self):
+        with self._lock:
+            self.probed.clear()
+            for entry in self.ports.values():
+                entry['probed_at'] = 0.0
+        self._wake.set()
+
+    def get_ports(self):
+        with self._lock:
+            return [dict(entry) for entry in sorted(self.ports.values(), key=lambda e: e['port'])]
+
+    def _run_loop(self):
+        while self.running:
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"Erro na descoberta de portas: {e}")
+            self._wake.wait(self.scan_interval)
+            self._wake.clear()
+
+    def scan(self):
+        started = time.monotonic()
+        found = {p.device: (p.description, port_identity(p)) for p in serial.tools.list_ports.comports()}
+        now = time.time()
+        changed = False
+        to_probe = []
+        plugged = []
+
+        with self._lock:
+            for device in list(self.ports):
+                if device not in found:
+                    del self.ports[device]
+                    changed = True
+
+            for device, (description, identity) in found.items():
+                entry = self.ports.get(device)
+                if entry is None or entry['identity'] != identity:
+                    entry = {'port': device, 'description': description, 'identity': identity, 'status': STATUS_PROBING, 'active': False, 'probed_at': 0.0}
+                    self.ports[device] = entry
+                    changed = True
+                    plugged.append(device)
+                    cached = self.probed.get(identity)
+                    if cached is not None:
+                        entry['status'], entry['active'] = cached
+                        entry['probed_at'] = now
+                if device in self._pending or self.in_use(device):
+                    continue
+                if not entry['probed_at'] or now - entry['probed_at'] >= self.ttl:
+                    self._pending.add(device)
+                    to_probe.append(device)
+
+        if plugged and self.on_plug and self.scans:
+            self.on_plug(plugged)
+
+        if to_probe:
+            handled = set()
+            try:
+                futures = {self._pool.submit(self._probe, device): device for device in to_probe}
+                done, _ = wait(futures, timeout=self.deadline)
+                for future, device in futures.items():
+                    if future in done:
+                        changed |= self._apply(device, self._result(future))
+                    else:
+                        future.add_done_callback(lambda f, d=device: self._late_result(d, f))
+                    handled.add(device)
+            finally:
+                with self._lock:
+                    self._pending.difference_update(set(to_probe) - handled)
+
+        if self.watch:
+            watched = self.watch()
+            if watched != self._watched:
+                self._watched = watched
+                changed = True
+
+        self.scans += 1
+        self.last_scan_ms = round((time.monotonic() - started) * 1000.0, 1)
+        if changed:
+            self._notify()
+
+    def _probe(self, device):
+        with self._lock:
+            self.probes += 1
+        try:
+            s = serial.Serial(device, self.baudrate, timeout=self.probe_timeout)
+            try:
+                sample = s.read(1024)
+            finally:
+                s.close()
+        except (OSError, serial.SerialException):
+            return STATUS_BUSY, False
+        if sample and detect_format(sample, min_frames=1):
+            return STATUS_WITH_DATA, True
+        return STATUS_AVAILABLE, False
+
+    def _apply(self, device, result):
+        status, active = result
+        with self._lock:
+            self._pending.discard(device)
+            entry = self.ports.get(device)
+            if entry is None:
+                return False
+            entry['probed_at'] = time.time()
+            if status != STATUS_BUSY:
+                self.probed[entry['identity']] = (status, active)
+            if entry['status'] == status and entry['active'] == active:
+                return False
+            entry['status'] = status
+            entry['active'] = active
+            return True
+
+    def _result(self, future):
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Erro ao sondar porta: {e}")
+            return STATUS_BUSY, False
+
+    def _late_result(self, device, future):
+        if self._apply(device, self._result(future)):
+            self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"Erro ao notificar mudança de portas: {e}")
+
+    def get_stats(self):
+        return {
+            'ports': len(self.ports),
+            'identities': len(self.probed),
+            'pending': len(self._pending),
+            'scans': self.scans,
+            'probes': self.probes,
+            'last_scan_ms': self.last_scan_ms
+        }
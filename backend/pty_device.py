@@ -0,0 +1,111 @@
+import json
+import math
+import os
+import threading
+import time
+import tty
+from binary_frames import FORMAT_BINARY, FORMAT_JSON, encode_frame
+
+def make_sample(i, time_ms):
+    t = i * 0.01
+    return {
+        'time': time_ms,
+        'status': 1,
+        'pressure': round(1013.25 + 2.0 * math.sin(t * 0.05), 4),
+        'temperature': round(25.0 + 5.0 * math.sin(t * 0.1), 2),
+        'bmp_altitude': round(500.0 + 100.0 * math.sin(t * 0.02), 2),
+        'max_altitude': 600.0,
+        'accel_x': round(0.5 * math.sin(t * 5.0), 4),
+        'accel_y': round(0.5 * math.cos(t * 5.0), 4),
+        'accel_z': round(9.81 + 0.2 * math.sin(t * 10.0), 4),
+        'rotation_x': round((t * 10.0) % 360.0, 2),
+        'rotation_y': 0.0,
+        'rotation_z': 0.0,
+        'latitude': round(-23.5505 + 0.001 * math.sin(t * 0.01), 6),
+        'longitude': round(-46.6333 + 0.001 * math.cos(t * 0.01), 6),
+        'gps_altitude': round(505.0 + 100.0 * math.sin(t * 0.02), 2),
+        'voltage': 4.2
+    }
+
+def encode_sample(sample, frame_format):
+    if frame_format == FORMAT_BINARY:
+        return encode_frame(sample)
+    return json.dumps(sample, separators=(',', ':')).encode('utf-8') + b'\n'
+
+class PtyDevice:
+    def __init__(self, rate_hz=100.0, frame_format=FORMAT_JSON, epoch=None):
+        if frame_format not in (FORMAT_JSON, FORMAT_BINARY):
+            raise ValueError(f"Formato de frame desconhecido: {frame_format}")
+        self.rate_hz = rate_hz
+        self.frame_format = frame_format
+        self.epoch = time.time() if epoch is None else epoch
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.sent_times = []
+        self.bytes_sent = 0
+        self.write_errors = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run_loop, name='pty-device', daemon=True)
+        self.thread.start()
+
+    def set_rate(self, rate_hz):
+        self.rate_hz = rate_hz
+
+    def _run_loop(self):
+        i = 0
+        next_due = time.monotonic()
+        while self.running:
+            now = time.monotonic()
+            if now < next_due:
+                time.sleep(next_due - now)
+                continue
+
+            burst = []
+            while next_due <= now and len(burst) < 1000:
+                time_ms = int((time.time() - self.epoch) * 1000.0)
+                burst.append(encode_sample(make_sample(i, time_ms), self.frame_format))
+                self.sent_times.append(time_ms)
+                next_due += 1.0 / self.rate_hz
+                i += 1
+            if next_due < now:
+                next_due = now
+
+            data = b''.join(burst)
+            try:
+                while data:
+                    written = os.write(self.master, data)
+                    data = data[written:]
+                    self.bytes_sent += written
+            except OSError:
+                self.write_errors += 1
+                time.sleep(0.01)
+
+    def count_sent(self, start_ms, stop_ms):
+        return sum(1 for t in self.sent_times if start_ms <= t < stop_ms)
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def get_stats(self):
+        return {
+            'port': self.port,
+            'rate_hz': self.rate_hz,
+            'format': self.frame_format,
+            'frames_sent': len(self.sent_times),
+            'bytes_sent': self.bytes_sent,
+            'write_errors': self.write_errors
+        }
@@ -0,0 +1,184 @@
+import math
+
+AGG_LAST = 'last'
+AGG_MEAN = 'mean'
+AGG_MIN = 'min'
+AGG_MAX = 'max'
+AGGREGATIONS = (AGG_LAST, AGG_MEAN, AGG_MIN, AGG_MAX)
+MAX_RATE_HZ = 500.0
+
+def parse_rate(value):
+    if value is None or value == '':
+        return None
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Taxa inválida: {value}")
+    if rate != rate or rate <= 0:
+        return None
+    return min(rate, MAX_RATE_HZ)
+
+def normalize_rate_limits(config):
+    if not config:
+        return None
+    if not isinstance(config, dict):
+        raise ValueError("Configuração de taxa inválida.")
+
+    aggregation = config.get('aggregation') or AGG_LAST
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Agregação desconhecida: {aggregation}")
+
+    widget_rates = {}
+    for widget, value in (config.get('widget_rates') or {}).items():
+        rate = parse_rate(value)
+        if rate is not None:
+            widget_rates[widget] = rate
+
+    limits = {
+        'max_rate': parse_rate(config.get('max_rate')),
+        'widget_rates': widget_rates,
+        'aggregation': aggregation
+    }
+    if limits['max_rate'] is None and not widget_rates and aggregation == AGG_LAST:
+        return None
+    return limits
+
+def _slowest(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+def merge_rate_limits(base, override):
+    if not base:
+        return override
+    if not override:
+        return base
+    widget_rates = dict(base['widget_rates'])
+    for widget, rate in override['widget_rates'].items():
+        widget_rates[widget] = _slowest(widget_rates.get(widget), rate)
+    return {
+        'max_rate': _slowest(base['max_rate'], override['max_rate']),
+        'widget_rates': widget_rates,
+        'aggregation': override['aggregation'] if override['aggregation'] != AGG_LAST else base['aggregation']
+    }
+
+def _fastest(rates):
+    if not rates or any(rate is None for rate in rates):
+        return None
+    return max(rates)
+
+def build_rate_plan(fields, widgets, limits, widget_fields):
+    if not limits:
+        return None
+
+    max_rate = limits['max_rate']
+    field_rates = {}
+    for widget in widgets or []:
+        rate = _slowest(limits['widget_rates'].get(widget), max_rate)
+        for field in widget_fields.get(widget, ()):
+            field_rates.setdefault(field, []).append(rate)
+
+    rates = {field: _fastest(values) for field, values in field_rates.items()}
+    if fields is not None:
+        rates = {field: rate for field, rate in rates.items() if field in fields}
+    default_rate = max_rate if fields is None else _fastest(list(rates.values()))
+
+    if default_rate is None and all(rate is None for rate in rates.values()):
+        return None
+    periods = tuple(sorted((field, 1.0 / rate if rate else 0.0) for field, rate in rates.items()))
+    return (1.0 / default_rate if default_rate else 0.0, periods, limits['aggregation'])
+
+def rate_plan_name(plan):
+    default_period, periods, aggregation = plan
+    parts = [f"{field}={1.0 / period:g}" for field, period in periods if period]
+    if default_period:
+        parts.append(f"*={1.0 / default_period:g}")
+    return f"{aggregation}@" + ','.join(parts)
+
+class WindowCoalescer:
+    def __init__(self, plan, last_fields=()):
+        self.default_period, periods, self.aggregation = plan
+        self.periods = dict(periods)
+        self.last_fields = set(last_fields)
+        self.state = {}
+        self.windows = {}
+        self._carried = {}
+        self.frames_in = 0
+        self.frames_out = 0
+
+    def _aggregate(self, window):
+        _, vmin, vmax, vsum, count = window
+        if self.aggregation == AGG_MIN:
+            return vmin
+        if self.aggregation == AGG_MAX:
+            return vmax
+        return vsum / count
+
+    def push(self, data, now):
+        self.frames_in += 1
+        if self.aggregation == AGG_LAST:
+            due = self._push_last(data, now)
+        else:
+            due = self._push_aggregated(data, now)
+        if not due:
+            return None
+        self.frames_out += 1
+        return dict(self.state)
+
+    def _push_last(self, data, now):
+        due = False
+        for key, value in data.items():
+            period = self.periods.get(key, self.default_period)
+            if not period:
+                self.state[key] = value
+                due = True
+                continue
+            index = math.floor(now / period)
+            if self.windows.get(key) != index:
+                self.windows[key] = index
+                self.state[key] = value
+                due = True
+        return due
+
+    def _push_aggregated(self, data, now):
+        closed = immediate = False
+        carried = {}
+        for key, value in data.items():
+            period = self.periods.get(key, self.default_period)
+            if not period:
+                self.state[key] = value
+                immediate = True
+                continue
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if key in self.last_fields or not numeric:
+                carried[key] = value
+                continue
+
+            index = math.floor(now / period)
+            window = self.windows.get(key)
+            if window is not None and window[0] == index:
+                window[1] = min(window[1], value)
+                window[2] = max(window[2], value)
+                window[3] += value
+                window[4] += 1
+                continue
+            if window is not None:
+                self.state[key] = self._aggregate(window)
+                closed = True
+            self.windows[key] = [index, value, value, value, 1]
+
+        # Agregados fechados saem com o time/status da ultima amostra da propria janela.
+        if immediate:
+            self.state.update(carried)
+        elif closed:
+            self.state.update(self._carried)
+        self._carried = carried
+        return immediate or closed
+
+    def get_stats(self):
+        return {
+            'frames_in': self.frames_in,
+            'frames_out': self.frames_out
+        }
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+import numpy as np
+from flight_recorder import Recording, get_default_recordings_dir
+
+REPLAY_PREFIX = 'REPLAY:'
+
+def is_replay_port(port):
+    return isinstance(port, str) and port.startswith(REPLAY_PREFIX)
+
+def resolve_recording_path(name, base_dir=None):
+    if os.path.isabs(name):
+        return name
+    return os.path.join(base_dir or get_default_recordings_dir(), name)
+
+def list_recordings(base_dir=None):
+    base_dir = base_dir or get_default_recordings_dir()
+    if not os.path.isdir(base_dir):
+        return []
+    recordings = []
+    for name in sorted(os.listdir(base_dir), reverse=True):
+        path = os.path.join(base_dir, name)
+        if os.path.isdir(path):
+            segments = [f for f in os.listdir(path) if f.endswith('.sparkrec')]
+            if segments:
+                recordings.append({'name': name, 'path': path, 'segments': len(segments)})
+    return recordings
+
+class ReplaySource:
+    def __init__(self, path, speed=1.0, window=1024):
+        self.path = path
+        self.recording = Recording(path)
+        self.fields = self.recording.telemetry_fields
+        self.total = len(self.recording)
+        self.window = window
+        self.speed = speed
+        self.paused = False
+        self.position = 0
+        self.generation = 0
+        self.batch_generation = 0
+        self._window_start = 0
+        self._rows = []
+        self._recv = []
+        self._first_recv = float(self.recording.read(0, 1, ['recv_time'])['recv_time'][0])
+        self._cond = threading.Condition()
+        self._anchor()
+
+    def _recv_time_at(self, index):
+        if index >= self.total:
+            index = self.total - 1
+        return float(self.recording.read(index, index + 1, ['recv_time'])['recv_time'][0])
+
+    def _anchor(self):
+        self._wall_anchor = time.monotonic()
+        self._rec_anchor = self._recv_time_at(self.position)
+
+    def _load_window(self, start):
+        data = self.recording.read(start, start + self.window, self.fields + ['recv_time'])
+        self._recv = data.pop('recv_time').tolist()
+        columns = []
+        for name in self.fields:
+            column = data[name]
+            values = column.tolist()
+            if column.dtype.kind == 'f' and np.isnan(column).any():
+                values = [None if v != v else v for v in values]
+            columns.append(values)
+        self._rows = [dict(zip(self.fields, row)) for row in zip(*columns)]
+        self._window_start = start
+
+    def _in_window(self, index):
+        return self._window_start <= index < self._window_start + len(self._rows)
+
+    def next_batch(self, max_wait=0.1):
+        with self._cond:
+            if self.paused or self.position >= self.total:
+                self._cond.wait(max_wait)
+                return []
+
+            batch = []
+            self.batch_generation = self.generation
+            now = time.monotonic()
+            while self.position < self.total and len(batch) < self.window:
+                if not self._in_window(self.position):
+                    self._load_window(self.position)
+                offset = self.position - self._window_start
+                if self.speed > 0:
+                    due = self._wall_anchor + (self._recv[offset] - self._rec_anchor) / self.speed
+                    if due > now:
+                        if not batch:
+                            self._cond.wait(min(due - now, max_wait))
+                        break
+                batch.append(self._rows[offset])
+                self.position += 1
+
+            if self.position >= self.total and batch:
+                print(f"Replay finalizado: {self.path}")
+            return batch
+
+    def pause(self):
+        with self._cond:
+            self.paused = True
+            self._cond.notify_all()
+
+    def resume(self):
+        with self._cond:
+            if self.position >= self.total:
+                self.position = 0
+                self.generation += 1
+            self.paused = False
+            self._anchor()
+            self._cond.notify_all()
+
+    def set_speed(self, speed):
+        with self._cond:
+            self.speed = float(speed)
+            self._anchor()
+            self._cond.notify_all()
+
+    def seek(self, seconds):
+        with self._cond:
+            target = self._first_recv + max(0.0, float(seconds))
+            position = min(self.recording.search_recv_time(target), self.total)
+            if position < self.position:
+                self.generation += 1
+            self.position = position
+            if self.position < self.total:
+                self._anchor()
+            self._cond.notify_all()
+
+    def get_status(self):
+        with self._cond:
+            position = self.position
+            current = self._recv_time_at(position) if self.total else self._first_recv
+            return {
+                'path': self.path,
+                'position': position,
+                'total': self.total,
+                'elapsed': round(current - self._first_recv, 3),
+                'duration': round(self._recv_time_at(self.total - 1) - self._first_recv, 3),
+                'speed': self.speed,
+                'paused': self.paused,
+                'finished': position >= self.total
+            }
+
+    def close(self):
+        with self._cond:
+            self.paused = True
+            self._cond.notify_all()
+        self.recording.close()
@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+import serial
+from frame_reader import FrameReader
+from binary_frames import FORMAT_AUTO
+from metrics import BYTES_TOTAL, FRAMES_TOTAL, SERIAL_RECONNECTS_TOTAL, SERIAL_RECOVERY_SECONDS
+
+REDETECT_ERRORS = 8
+
+class Backoff:
+    def __init__(self, initial=0.005, maximum=1.0, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self._delay = initial
+
+    def next_delay(self):
+        delay = self._delay
+        self._delay = min(self._delay * self.factor, self.maximum)
+        return random.uniform(delay / 2, delay)
+
+    def reset(self):
+        self._delay = self.initial
+
+class SerialLink:
+    def __init__(self, on_frames, baudrate=115200, frame_format=FORMAT_AUTO, read_timeout=0.1):
+        self.on_frames = on_frames
+        self.baudrate = baudrate
+        self.frame_format = frame_format
+        self.read_timeout = read_timeout
+        self.port = None
+        self.last_port = None
+        self.conn = None
+        self.frame_reader = None
+        self.backoff = Backoff()
+        self.connections = 0
+        self.switches = 0
+        self.failures = 0
+        self.redetections = 0
+        self.decode_failures = 0
+        self.last_recovery_ms = None
+        self._bytes_counted = 0
+        self._glitch_at = None
+        self._next_attempt = 0.0
+        self._pending_format = None
+        self._wake = threading.Event()
+
+    def is_open(self):
+        conn = self.conn
+        return conn is not None and conn.is_open
+
+    def wake(self):
+        self._next_attempt = 0.0
+        self._wake.set()
+
+    def set_frame_format(self, frame_format):
+        self._pending_format = frame_format
+        self._wake.set()
+
+    def report_decode(self, decoded, errors):
+        if decoded:
+            self.decode_failures = 0
+            return
+        self.decode_failures += errors
+        if self.decode_failures >= REDETECT_ERRORS and self.frame_format == FORMAT_AUTO and self._pending_format is None:
+            print(f"{self.decode_failures} frames seguidos invalidos em {self.port}, detectando formato novamente")
+            self.decode_failures = 0
+            self.redetections += 1
+            self.set_frame_format(FORMAT_AUTO)
+
+    def step(self, target):
+        if self._pending_format is not None:
+            self.frame_format, self._pending_format = self._pending_format, None
+            if self.frame_reader:
+                self.frame_reader.reset()
+                self.frame_reader.set_format(self.frame_format)
+
+        if (self.conn is None or self.port != target) and time.monotonic() >= self._next_attempt:
+            self._open(target)
+
+        if self.conn is None:
+            self._wake.wait(max(0.0, self._next_attempt - time.monotonic()))
+            self._wake.clear()
+            return
+
+        try:
+            frames = self.frame_reader.read_frames()
+            read_at = time.monotonic()
+            self._count_bytes()
+            if frames:
+                self._deliver(frames, read_at)
+        except Exception as e:
+            print(f"Erro na conexao serial: {e}")
+            self.failures += 1
+            if self._glitch_at is None:
+                self._glitch_at = time.monotonic()
+            self._release()
+            self._next_attempt = time.monotonic() + self.backoff.next_delay()
+
+    def _open(self, port):
+        try:
+            conn = serial.Serial(port, self.baudrate, timeout=self.read_timeout)
+            if port != self.last_port:
+                conn.reset_input_buffer()
+        except Exception:
+            self._next_attempt = time.monotonic() + self.backoff.next_delay()
+            return
+
+        if self.conn is not None:
+            self._drain()
+            self._release()
+            self.switches += 1
+        self.conn = conn
+        self.port = port
+        self.last_port = port
+        self.frame_reader = FrameReader(conn, frame_format=self.frame_format)
+        self._bytes_counted = 0
+        self.connections += 1
+        if self.connections > 1:
+            SERIAL_RECONNECTS_TOTAL.inc()
+        self.backoff.reset()
+        print(f"Conectado na porta {port}")
+
+    def _drain(self):
+        try:
+            waiting = self.conn.in_waiting
+            frames = self.frame_reader.feed(self.conn.read(waiting)) if waiting else []
+        except Exception:
+            return
+        self._count_bytes()
+        if frames:
+            self._deliver(frames, time.monotonic())
+
+    def _deliver(self, frames, read_at):
+        if self._glitch_at is not None:
+            recovery = read_at - self._glitch_at
+            SERIAL_RECOVERY_SECONDS.observe(recovery)
+            self.last_recovery_ms = round(recovery * 1000.0, 1)
+            self._glitch_at = None
+        FRAMES_TOTAL.inc(len(frames))
+        self.on_frames(self.port, self.frame_reader.format, frames, read_at)
+
+    def _count_bytes(self):
+        BYTES_TOTAL.inc(self.frame_reader.bytes_total - self._bytes_counted)
+        self._bytes_counted = self.frame_reader.bytes_total
+
+    def _release(self):
+        try:
+            if self.conn is not None:
+                self.conn.close()
+        except Exception:
+            pass
+        if self.frame_reader:
+            self.frame_reader.reset()
+        self.conn = None
+        self.port = None
+
+    def close(self):
+        self._release()
+        self._glitch_at = None
+        self.backoff.reset()
+        self._next_attempt = 0.0
+
+    def get_stats(self):
+        return {
+            'port': self.port,
+            'connections': self.connections,
+            'switches': self.switches,
+            'failures': self.failures,
+            'redetections': self.redetections,
+            'last_recovery_ms': self.last_recovery_ms
+        }
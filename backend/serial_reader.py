@@ -1,87 +1,89 @@
 import threading
 import time
 import math
-import serial
-import serial.tools.list_ports
 import json
-from flask_server import socketio
+from flask_server import broadcast_telemetry, broadcast_serial_ports, TELEMETRY_HISTORY
+from serial_link import SerialLink
+from binary_frames import FORMAT_AUTO, FORMAT_BINARY, FORMAT_JSON, decode_frames
+from ingest_pipeline import IngestPipeline
+from replay import ReplaySource, is_replay_port, list_recordings, resolve_recording_path, REPLAY_PREFIX
+from port_discovery import PortDiscovery
+from source_merger import SourceMerger
+from derived_telemetry import DerivedTelemetry
+from metrics import PARSE_SECONDS, FRAMES_TOTAL, DECODE_ERRORS_TOTAL, DUPLICATE_FRAMES_TOTAL
 
-class SerialReader:
-    def __init__(self, port="COM0", baudrate=115200):
+class TelemetrySource:
+    def __init__(self, reader, port):
+        self.reader = reader
         self.port = port
-        self.baudrate = baudrate
         self.running = False
         self.thread = None
-        self.serial_conn = None
+        self.link = SerialLink(self._submit_frames, reader.baudrate, reader.frame_format, reader.read_timeout)
         self.last_valid_data = 0
-        
+        self.replay = None
+        self.replay_generation = None
+
+    @property
+    def frame_reader(self):
+        return self.link.frame_reader
+
     def start(self):
         if self.running:
             return
         self.running = True
-        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread = threading.Thread(target=self._run_loop, name=f"source-{self.port}", daemon=True)
         self.thread.start()
 
+    def stop(self):
+        self.running = False
+        self.link.wake()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
     def set_port(self, new_port):
-        print(f"Alterando porta serial para: {new_port}")
         self.port = new_port
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close() 
-            
-    def get_ports_info(self):
-        ports = serial.tools.list_ports.comports()
-        results = []
+        self.link.wake()
 
-        sim_active = (self.port == "SIMULATOR")
-        results.append({
-            "port": "SIMULATOR",
-            "description": "Simulador de Dados",
-            "status": "connected" if sim_active else "available",
-            "active": sim_active
-        })
+    def set_frame_format(self, frame_format):
+        self.link.set_frame_format(frame_format)
 
-        for p in ports:
-            status = "available"
-            is_active = False
-            
-            if p.device == self.port:
-                if self.serial_conn and self.serial_conn.is_open:
-                    status = "connected"
-                    if time.time() - self.last_valid_data < 2.0:
-                        status = "active_data"
-                        is_active = True
-                else:
-                    status = "error_connecting"
-            
-            else:
-                try:
-                    s = serial.Serial(p.device, self.baudrate, timeout=0.5)
-                    line = s.readline()
-                    s.close()
-                    if line:
-                        try:
-                            json.loads(line.decode('utf-8', errors='ignore'))
-                            status = "available_with_data"
-                            is_active = True
-                        except:
-                            pass
-                except (OSError, serial.SerialException):
-                    status = "busy"
+    def status(self):
+        if self.port == "SIMULATOR" or is_replay_port(self.port):
+            return "connected", True
+        if self.link.is_open() and self.link.port == self.port:
+            if time.time() - self.last_valid_data < 2.0:
+                return "active_data", True
+            return "connected", False
+        return "error_connecting", False
 
-            results.append({
-                "port": p.device,
-                "description": p.description,
-                "status": status,
-                "active": is_active
-            })
-        return results
+    def _close_replay(self):
+        if self.replay:
+            self.replay.close()
+            self.replay = None
 
-    def stop(self):
-        self.running = False
-        if self.thread:
-            self.thread.join(timeout=1.0)
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+    def _run_replay(self):
+        recorder = self.reader.recorder
+        path = resolve_recording_path(self.port[len(REPLAY_PREFIX):], recorder.base_dir if recorder else None)
+        if not self.replay or self.replay.path != path:
+            self._close_replay()
+            try:
+                self.replay = ReplaySource(path)
+                self.replay_generation = None
+                print(f"Reproduzindo gravação {path} ({self.replay.total} amostras)")
+            except Exception as e:
+                print(f"Erro ao abrir gravação: {e}")
+                time.sleep(1)
+                return
+
+        batch = self.replay.next_batch()
+        if batch:
+            if self.replay.batch_generation != self.replay_generation:
+                self.replay_generation = self.replay.batch_generation
+                self.reader.rewind_source(self.port)
+            self.last_valid_data = time.time()
+            origin = time.monotonic()
+            FRAMES_TOTAL.inc(len(batch))
+            self.reader.submit_decoded(self.port, batch, origin, record=False)
 
     def _run_loop(self):
         sim_counter = 0.0
@@ -89,19 +91,29 @@ class SerialReader:
         sim_start_time = time.time()
 
         while self.running:
+            if is_replay_port(self.port) or self.port == "SIMULATOR":
+                if self.link.is_open():
+                    self.link.close()
+
+            if is_replay_port(self.port):
+                self._run_replay()
+                continue
+            elif self.replay:
+                self._close_replay()
+
             if self.port == "SIMULATOR":
                 try:
                     current_millis = int((time.time() - sim_start_time) * 1000)
-                    
+
                     status = 1 if (current_millis % 5000 < 2500) else 0
-                    
+
                     temperature = 25.0 + (5.0 * math.sin(sim_counter * 0.1))
                     pressure = 1013.25 + (2.0 * math.sin(sim_counter * 0.05))
                     bmp_altitude = 500.0 + (100.0 * math.sin(sim_counter * 0.02))
-                    
+
                     if bmp_altitude > sim_max_alt:
                         sim_max_alt = bmp_altitude
-                        
+
                     accel_x = 0.5 * math.sin(sim_counter * 5.0)
                     accel_y = 0.5 * math.cos(sim_counter * 5.0)
                     accel_z = 9.81 + (0.2 * math.sin(sim_counter * 10.0))
@@ -135,8 +147,9 @@ class SerialReader:
                     }
 
                     self.last_valid_data = time.time()
-                    socketio.emit('data_update', data, namespace='/')
-                    
+                    FRAMES_TOTAL.inc()
+                    self.reader.submit_decoded(self.port, [data])
+
                     sim_counter += 0.1
                     time.sleep(0.1)
                     continue
@@ -146,32 +159,255 @@ class SerialReader:
                     time.sleep(1)
                     continue
 
-            if not self.serial_conn or not self.serial_conn.is_open:
+            self.link.step(self.port)
+
+        self.link.close()
+        self._close_replay()
+
+    def _submit_frames(self, port, frame_format, frames, read_at):
+        self.reader.pipeline.submit_raw((port, frame_format, frames), read_at)
+
+class SerialReader:
+    def __init__(self, port="COM0", baudrate=115200, frame_format=FORMAT_AUTO, recorder=None, extra_ports=()):
+        self.baudrate = baudrate
+        self.frame_format = frame_format
+        self.running = False
+        self.read_timeout = 0.1
+        self.decode_errors = 0
+        self.recorder = recorder
+        self.merger = SourceMerger()
+        self.derived = DerivedTelemetry()
+        self._merge_lock = threading.Lock()
+        self.primary = TelemetrySource(self, port)
+        self.sources = {port: self.primary}
+        self.merger.add_source(port)
+        self._sources_lock = threading.Lock()
+        self.pipeline = IngestPipeline(
+            decode=self._decode_frames,
+            broadcast=broadcast_telemetry,
+            record=recorder.append if recorder and recorder.enabled else None
+        )
+        self.pipeline.add_sink('history', TELEMETRY_HISTORY.append)
+        self.discovery = PortDiscovery(
+            baudrate=baudrate,
+            in_use=lambda device: device in self.sources,
+            on_change=broadcast_serial_ports,
+            on_plug=self._on_ports_plugged,
+            watch=lambda: tuple((s.port, s.status()[0]) for s in list(self.sources.values()))
+        )
+        for extra_port in extra_ports:
+            self.add_source(extra_port)
+
+    @property
+    def port(self):
+        return self.primary.port
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.pipeline.start()
+        self.discovery.start()
+        for source in list(self.sources.values()):
+            source.start()
+
+    def set_port(self, new_port):
+        print(f"Alterando porta serial para: {new_port}")
+        with self._sources_lock:
+            previous = self.primary.port
+            if new_port == previous:
+                return
+            secondary = self.sources.get(new_port)
+            if secondary is not None:
+                old_primary = self.sources.pop(previous)
+                self.primary = secondary
+            else:
+                self.sources[new_port] = self.sources.pop(previous)
+        if secondary is not None:
+            old_primary.stop()
+            self.merger.remove_source(previous)
+            return
+        self.merger.remove_source(previous)
+        self.merger.add_source(new_port)
+        self.primary.set_port(new_port)
+
+    def _on_ports_plugged(self, devices):
+        for source in list(self.sources.values()):
+            if source.port in devices:
+                print(f"Porta {source.port} reapareceu, reconectando")
+                source.link.wake()
+
+    def add_source(self, port):
+        if not isinstance(port, str) or not port:
+            raise ValueError(f"Porta inválida: {port}")
+        with self._sources_lock:
+            if port in self.sources:
+                return
+            print(f"Adicionando fonte de telemetria: {port}")
+            source = TelemetrySource(self, port)
+            self.sources[port] = source
+        self.merger.add_source(port)
+        if self.running:
+            source.start()
+
+    def remove_source(self, port):
+        with self._sources_lock:
+            if port == self.primary.port:
+                raise ValueError("Não é possível remover a fonte principal.")
+            source = self.sources.pop(port, None)
+        if source is None:
+            raise ValueError(f"Fonte desconhecida: {port}")
+        print(f"Removendo fonte de telemetria: {port}")
+        source.stop()
+        self.merger.remove_source(port)
+
+    def set_frame_format(self, frame_format):
+        if frame_format not in (FORMAT_AUTO, FORMAT_JSON, FORMAT_BINARY):
+            raise ValueError(f"Formato de frame desconhecido: {frame_format}")
+        print(f"Alterando formato de frame para: {frame_format}")
+        self.frame_format = frame_format
+        for source in list(self.sources.values()):
+            source.set_frame_format(frame_format)
+
+    def _source_role(self, port):
+        if port == self.primary.port:
+            return "primary"
+        if port in self.sources:
+            return "secondary"
+        return None
+
+    def get_ports_info(self):
+        results = []
+        sources = dict(self.sources)
+
+        sim_active = ("SIMULATOR" in sources)
+        results.append({
+            "port": "SIMULATOR",
+            "description": "Simulador de Dados",
+            "status": "connected" if sim_active else "available",
+            "active": sim_active,
+            "role": self._source_role("SIMULATOR")
+        })
+
+        for rec in list_recordings(self.recorder.base_dir if self.recorder else None):
+            port_name = REPLAY_PREFIX + rec['name']
+            replay_active = (port_name in sources)
+            results.append({
+                "port": port_name,
+                "description": f"Gravação ({rec['segments']} segmentos)",
+                "status": "connected" if replay_active else "available",
+                "active": replay_active,
+                "role": self._source_role(port_name)
+            })
+
+        for p in self.discovery.get_ports():
+            status, is_active = p['status'], p['active']
+            if p['port'] in sources:
+                status, is_active = sources[p['port']].status()
+
+            results.append({
+                "port": p['port'],
+                "description": p['description'],
+                "status": status,
+                "active": is_active,
+                "role": self._source_role(p['port'])
+            })
+        return results
+
+    def get_ingest_stats(self):
+        frame_reader = self.primary.frame_reader
+        stats = {
+            'port': self.port,
+            'frame_format': self.frame_format,
+            'capture': frame_reader.get_stats() if frame_reader else None,
+            'decode_errors': self.decode_errors
+        }
+        stats.update(self.pipeline.get_stats())
+        links = self.merger.get_stats()
+        stats['sources'] = [
+            dict(links['sources'].get(port, {}), port=port, role=self._source_role(port), status=source.status()[0], link=source.link.get_stats())
+            for port, source in list(self.sources.items())
+        ]
+        stats['merged'] = links['merged']
+        stats['derived'] = self.derived.get_stats()
+        stats['history_buffer'] = TELEMETRY_HISTORY.get_stats()
+        stats['port_discovery'] = self.discovery.get_stats()
+        if self.recorder:
+            stats['recorder'] = self.recorder.get_stats()
+        return stats
+
+    def get_replay_status(self):
+        replay = self.primary.replay
+        return replay.get_status() if replay else None
+
+    def control_replay(self, action, value=None):
+        replay = self.primary.replay
+        if not replay:
+            raise ValueError("Nenhum replay ativo.")
+        if action == 'pause':
+            replay.pause()
+        elif action == 'resume':
+            replay.resume()
+        elif action == 'speed':
+            replay.set_speed(value)
+        elif action == 'seek':
+            replay.seek(value)
+        else:
+            raise ValueError(f"Ação de replay desconhecida: {action}")
+        return replay.get_status()
+
+    def rewind_source(self, port):
+        with self._merge_lock:
+            self.merger.rewind(port)
+            self.derived.restart()
+
+    def _merge(self, port, samples):
+        with self._merge_lock:
+            accepted, dropped = self.merger.merge(port, samples)
+            self.derived.process(accepted)
+        if dropped:
+            DUPLICATE_FRAMES_TOTAL.inc(dropped)
+        return accepted
+
+    def submit_decoded(self, port, samples, origin=None, record=True):
+        for sample in self._merge(port, samples):
+            self.pipeline.submit_decoded(sample, origin, record=record)
+
+    def _decode_frames(self, batch):
+        started = time.perf_counter()
+        port, frame_format, frames = batch
+        if frame_format == FORMAT_BINARY:
+            samples, errors = decode_frames(frames)
+        else:
+            samples = []
+            errors = 0
+            for frame in frames:
                 try:
-                    self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=1)
-                    print(f"Conectado na porta {self.port}")
-                    self.serial_conn.reset_input_buffer()
-                except Exception as e:
-                    time.sleep(2)
+                    data = json.loads(frame)
+                except (json.JSONDecodeError, ValueError):
+                    errors += 1
                     continue
-
-            try:
-                if self.serial_conn.in_waiting:
-                    line = self.serial_conn.readline()
-                    if line:
-                        try:
-                            decoded = line.decode('utf-8', errors='replace').strip()
-                            if decoded:
-                                data = json.loads(decoded)
-                                self.last_valid_data = time.time()
-                                socketio.emit('data_update', data, namespace='/')
-                        except (json.JSONDecodeError, ValueError):
-                            pass
+                if isinstance(data, dict):
+                    samples.append(data)
                 else:
-                    time.sleep(0.001)
-            except Exception as e:
-                print(f"Erro na conexao serial: {e}")
-                if self.serial_conn:
-                    self.serial_conn.close()
-                time.sleep(1)
+                    errors += 1
+
+        if errors:
+            self.decode_errors += errors
+            DECODE_ERRORS_TOTAL.inc(errors)
+        source = self.sources.get(port)
+        if source is not None:
+            if samples:
+                source.last_valid_data = time.time()
+            source.link.report_decode(len(samples), errors)
+        PARSE_SECONDS.observe(time.perf_counter() - started)
+        return self._merge(port, samples)
 
+    def stop(self):
+        self.running = False
+        self.discovery.stop()
+        for source in list(self.sources.values()):
+            source.stop()
+        self.pipeline.stop()
+        if self.recorder:
+            self.recorder.close()
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+
+SEQUENCE_FIELDS = ('seq', 'sequence')
+TIME_FIELD = 'time'
+RESET_GAPS = {TIME_FIELD: 5000, 'seq': 1000, 'sequence': 1000}
+QUALITY_WINDOW = 200
+SEEN_HISTORY = 4096
+
+def sample_key(sample):
+    for field in SEQUENCE_FIELDS + (TIME_FIELD,):
+        value = sample.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return field, value
+    return None, None
+
+class LinkStats:
+    def __init__(self, name):
+        self.name = name
+        self.received = 0
+        self.accepted = 0
+        self.duplicates = 0
+        self.late = 0
+        self.lost = 0
+        self.last_seen = None
+        self._last = None
+        self._steps = deque(maxlen=32)
+        self._window = deque(maxlen=QUALITY_WINDOW)
+
+    def observe(self, field, key, now):
+        self.received += 1
+        self.last_seen = now
+        if self._last is not None and self._last[0] == field:
+            delta = key - self._last[1]
+            if delta > 0:
+                if field == TIME_FIELD:
+                    step = min(self._steps) if self._steps else delta
+                    missing = max(0, int(round(delta / step)) - 1)
+                    self._steps.append(delta)
+                else:
+                    missing = int(delta) - 1
+                if missing:
+                    self.lost += missing
+                    self._window.extend([0] * min(missing, QUALITY_WINDOW))
+        self._window.append(1)
+        self._last = (field, key)
+
+    def rewind(self):
+        self._last = None
+
+    def get_stats(self, now):
+        expected = self.received + self.lost
+        return {
+            'received': self.received,
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'late': self.late,
+            'lost': self.lost,
+            'loss_pct': round(100.0 * self.lost / expected, 2) if expected else 0.0,
+            'link_quality': round(sum(self._window) / len(self._window), 3) if self._window else None,
+            'last_seen_ms': round((now - self.last_seen) * 1000.0, 1) if self.last_seen is not None else None
+        }
+
+class SourceMerger:
+    def __init__(self):
+        self.sources = {}
+        self.merged = LinkStats('merged')
+        self.last_key = None
+        self.last_source = None
+        self._seen = set()
+        self._seen_order = deque()
+        self._lock = threading.Lock()
+
+    def add_source(self, source):
+        with self._lock:
+            self.sources.setdefault(source, LinkStats(source))
+
+    def remove_source(self, source):
+        with self._lock:
+            self.sources.pop(source, None)
+            if self.last_source == source:
+                self.last_source = None
+
+    def rewind(self, source):
+        with self._lock:
+            self.last_key = None
+            self.last_source = None
+            self._seen.clear()
+            self._seen_order.clear()
+            self.merged.rewind()
+            if source in self.sources:
+                self.sources[source].rewind()
+
+    def merge(self, source, samples, now=None):
+        now = time.monotonic() if now is None else now
+        accepted = []
+        dropped = 0
+        with self._lock:
+            link = self.sources.get(source) or LinkStats(source)
+            for sample in samples:
+                field, key = sample_key(sample)
+                if key is None:
+                    link.received += 1
+                    link.accepted += 1
+                    accepted.append(sample)
+                    continue
+                link.observe(field, key, now)
+                if self._accept(source, field, key):
+                    link.accepted += 1
+                    self.merged.observe(field, key, now)
+                    self.merged.accepted += 1
+                    accepted.append(sample)
+                else:
+                    dropped += 1
+                    if (field, key) in self._seen:
+                        link.duplicates += 1
+                    else:
+                        link.late += 1
+        return accepted, dropped
+
+    def _accept(self, source, field, key):
+        last = self.last_key
+        if last is not None and last[0] == field and key <= last[1]:
+            if last[1] - key > RESET_GAPS.get(field, 0):
+                self._seen.clear()
+                self._seen_order.clear()
+                self.last_key = (field, key)
+            elif (field, key) in self._seen or source != self.last_source:
+                return False
+        else:
+            self.last_key = (field, key)
+        self.last_source = source
+        self._seen.add((field, key))
+        self._seen_order.append((field, key))
+        if len(self._seen_order) > SEEN_HISTORY:
+            self._seen.discard(self._seen_order.popleft())
+        return True
+
+    def get_stats(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return {
+                'sources': {name: link.get_stats(now) for name, link in self.sources.items()},
+                'merged': self.merged.get_stats(now)
+            }
@@ -0,0 +1,65 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+PROFILE_FLAG = '--profile-startup'
+STARTED_AT = time.perf_counter()
+WINDOW_BUDGET_MS = 1000.0
+
+class StartupProfiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []
+        self._last = STARTED_AT
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        with self._lock:
+            if phase in self._seen:
+                return
+            self._seen.add(phase)
+            self.phases.append((phase, now - self._last, now - STARTED_AT))
+            self._last = now
+        if self.enabled:
+            print(f"[startup] {phase}: +{(now - STARTED_AT) * 1000.0:.1f} ms")
+
+    def report(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = list(self.phases)
+        print("=== Tempo de inicialização ===")
+        for phase, delta, total in phases:
+            print(f"{phase:<24} {delta * 1000.0:>9.1f} ms {total * 1000.0:>9.1f} ms")
+
+    def check(self, phase, budget_ms):
+        elapsed = self.get_stats().get(phase)
+        if elapsed is None or elapsed <= budget_ms:
+            return True
+        print(f"[startup] {phase} levou {elapsed:.1f} ms, acima da meta de {budget_ms:.0f} ms")
+        return False
+
+    def get_stats(self):
+        with self._lock:
+            return {phase: round(total * 1000.0, 1) for phase, _, total in self.phases}
+
+def profiling_requested(argv=None):
+    argv = sys.argv if argv is None else argv
+    return PROFILE_FLAG in argv or os.environ.get('SPARK_PROFILE_STARTUP', '') not in ('', '0')
+
+def wait_for_port(host, port, timeout=10.0, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=interval * 4):
+                return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+STARTUP = StartupProfiler(profiling_requested())
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+import threading
+from flask import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('text/css', '.css')
+
+INDEX_FILE = 'index.html'
+ASSETS_DIR = 'assets/'
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.json', '.map', '.svg', '.txt', '.xml', '.wasm', '.ico'}
+MIN_COMPRESS_SIZE = 512
+HASHED_NAME = re.compile(r'[.-][A-Za-z0-9_-]{8,}\.[a-z0-9]+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+def compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+def precompress_dist(dist_dir):
+    written = 0
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if not is_compressible(path) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            for encoding, suffix in ENCODING_SUFFIXES:
+                packed = compress(data, encoding)
+                if packed is None or len(packed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as f:
+                    f.write(packed)
+                written += 1
+    return written
+
+def parse_accept_encoding(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+class StaticAsset:
+    def __init__(self, path, rel_path):
+        self.path = path
+        self.rel_path = rel_path
+        self.mimetype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        self.immutable = rel_path.startswith(ASSETS_DIR) and HASHED_NAME.search(rel_path) is not None
+        self.cache_control = IMMUTABLE_CACHE if self.immutable else REVALIDATE_CACHE
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        self.etag = hashlib.sha1(self.data).hexdigest()[:20]
+        self.variants = {}
+        for encoding, suffix in ENCODING_SUFFIXES:
+            if os.path.isfile(path + suffix):
+                with open(path + suffix, 'rb') as f:
+                    self.variants[encoding] = f.read()
+
+    def variant(self, encoding, lock):
+        if encoding in self.variants:
+            return self.variants[encoding]
+        if not is_compressible(self.rel_path) or len(self.data) < MIN_COMPRESS_SIZE:
+            return None
+        with lock:
+            if encoding not in self.variants:
+                packed = compress(self.data, encoding)
+                self.variants[encoding] = packed if packed is not None and len(packed) < len(self.data) else None
+        return self.variants[encoding]
+
+class StaticManifest:
+    def __init__(self, dist_dir):
+        self.dist_dir = dist_dir
+        self.assets = {}
+        self.hits = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        skip = tuple(suffix for _, suffix in ENCODING_SUFFIXES)
+        if os.path.isdir(dist_dir):
+            for root, _, files in os.walk(dist_dir):
+                for name in files:
+                    if name.endswith(skip):
+                        continue
+                    path = os.path.join(root, name)
+                    rel_path = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+                    self.assets[rel_path] = StaticAsset(path, rel_path)
+        self.index = self.assets.get(INDEX_FILE)
+
+    def lookup(self, path):
+        return self.assets.get(path.lstrip('/')) or self.index
+
+    def serve(self, request, path=INDEX_FILE):
+        asset = self.lookup(path)
+        if asset is None:
+            return Response("Frontend não compilado.", status=404, mimetype='text/plain')
+
+        accepted = parse_accept_encoding(request.headers.get('Accept-Encoding'))
+        encoding = None
+        body = asset.data
+        for candidate, _ in ENCODING_SUFFIXES:
+            if candidate in accepted:
+                packed = asset.variant(candidate, self._lock)
+                if packed is not None:
+                    encoding, body = candidate, packed
+                    break
+
+        etag = asset.etag + ('-' + encoding if encoding else '')
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        self.hits += 1
+        if request.if_none_match.contains_weak(etag):
+            self.not_modified += 1
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, mimetype=asset.mimetype, headers=headers)
+
+    def get_stats(self):
+        return {
+            'assets': len(self.assets),
+            'bytes': sum(len(a.data) for a in self.assets.values()),
+            'precompressed': sum(1 for a in self.assets.values() if any(a.variants.values())),
+            'hits': self.hits,
+            'not_modified': self.not_modified
+        }
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frontend', 'dist')
+    print(f"{precompress_dist(target)} variantes comprimidas geradas em {target}")
@@ -0,0 +1,185 @@
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from frame_codec import dumps_text
+
+MAGIC = b'SPARKBUS'
+BUS_VERSION = 2
+HEADER = struct.Struct('<8sIII')
+HEAD_OFFSET = 32
+WAITERS_OFFSET = 40
+HEADER_SIZE = 64
+MAX_WAITERS = HEADER_SIZE - WAITERS_OFFSET
+WAKE_BYTE = b'\x01'
+SLOT_HEADER = struct.Struct('<QQdI')
+U64 = struct.Struct('<Q')
+DEFAULT_CAPACITY = 4096
+DEFAULT_SLOT_SIZE = 1024
+POLL_INTERVAL = 0.002
+
+class TelemetryBus:
+    def __init__(self, name=None, capacity=DEFAULT_CAPACITY, slot_size=DEFAULT_SLOT_SIZE):
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.shm = shared_memory.SharedMemory(name=name or f"spark_bus_{os.getpid()}", create=True, size=HEADER_SIZE + capacity * slot_size)
+        self.name = self.shm.name
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, BUS_VERSION, capacity, slot_size)
+        U64.pack_into(self.buf, HEAD_OFFSET, 0)
+        self.buf[WAITERS_OFFSET:HEADER_SIZE] = bytes(MAX_WAITERS)
+        self.published = 0
+        self.oversized = 0
+        self.wakeups = 0
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def set_waiter(self, index, conn):
+        if not 0 <= index < MAX_WAITERS:
+            raise ValueError(f"Índice de leitor inválido: {index}")
+        with self._lock:
+            previous = self._waiters.get(index)
+            self._waiters[index] = conn
+            self.buf[WAITERS_OFFSET + index] = 0
+        if previous is not None:
+            previous.close()
+
+    def publish(self, sample, origin=None):
+        payload = dumps_text(sample).encode('utf-8')
+        if len(payload) > self.slot_size - SLOT_HEADER.size:
+            self.oversized += 1
+            return
+        with self._lock:
+            seq = self.published
+            offset = HEADER_SIZE + (seq % self.capacity) * self.slot_size
+            lock = U64.unpack_from(self.buf, offset)[0]
+            U64.pack_into(self.buf, offset, lock + 1)
+            SLOT_HEADER.pack_into(self.buf, offset, lock + 1, seq, origin if origin is not None else time.monotonic(), len(payload))
+            start = offset + SLOT_HEADER.size
+            self.buf[start:start + len(payload)] = payload
+            U64.pack_into(self.buf, offset, lock + 2)
+            self.published = seq + 1
+            U64.pack_into(self.buf, HEAD_OFFSET, self.published)
+            self._wake_waiters()
+
+    def _wake_waiters(self):
+        for index, conn in self._waiters.items():
+            if not self.buf[WAITERS_OFFSET + index]:
+                continue
+            self.buf[WAITERS_OFFSET + index] = 0
+            try:
+                conn.send_bytes(WAKE_BYTE)
+                self.wakeups += 1
+            except (OSError, EOFError):
+                pass
+
+    def close(self):
+        for conn in self._waiters.values():
+            conn.close()
+        self._waiters = {}
+        self.buf = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self):
+        return {
+            'name': self.name,
+            'capacity': self.capacity,
+            'slot_size': self.slot_size,
+            'published': self.published,
+            'oversized': self.oversized,
+            'wakeups': self.wakeups
+        }
+
+class BusReader:
+    def __init__(self, name, index=None, wake=None):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.buf = self.shm.buf
+        magic, version, self.capacity, self.slot_size = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != BUS_VERSION:
+            self.close()
+            raise ValueError(f"Barramento de telemetria inválido: {name}")
+        self.name = name
+        self.index = index
+        self.wake = wake
+        self.next_seq = 0
+        self.received = 0
+        self.lost = 0
+        self.overruns = 0
+
+    def head(self):
+        return U64.unpack_from(self.buf, HEAD_OFFSET)[0]
+
+    def seek_oldest(self):
+        self.next_seq = max(0, self.head() - self.capacity + 1)
+
+    def seek_latest(self):
+        self.next_seq = self.head()
+
+    def read(self):
+        head = self.head()
+        oldest = head - self.capacity + 1
+        if self.next_seq < oldest:
+            self.lost += oldest - self.next_seq
+            self.overruns += 1
+            self.next_seq = oldest
+
+        samples = []
+        while self.next_seq < head:
+            item = self._read_slot(self.next_seq)
+            self.next_seq += 1
+            if item is None:
+                self.lost += 1
+                continue
+            samples.append(item)
+        self.received += len(samples)
+        return samples
+
+    def _read_slot(self, seq):
+        offset = HEADER_SIZE + (seq % self.capacity) * self.slot_size
+        lock, slot_seq, origin, length = SLOT_HEADER.unpack_from(self.buf, offset)
+        if lock & 1 or slot_seq != seq:
+            return None
+        start = offset + SLOT_HEADER.size
+        payload = str(self.buf[start:start + length], 'utf-8')
+        if U64.unpack_from(self.buf, offset)[0] != lock:
+            return None
+        return payload, origin
+
+    def poll(self, timeout=0.5, interval=POLL_INTERVAL):
+        if self.wake is None:
+            deadline = time.monotonic() + timeout
+            while self.head() == self.next_seq and time.monotonic() < deadline:
+                time.sleep(interval)
+            return self.read()
+
+        if self.head() == self.next_seq:
+            flag = WAITERS_OFFSET + self.index
+            self.buf[flag] = 1
+            if self.head() == self.next_seq:
+                self.wake.poll(timeout)
+            self.buf[flag] = 0
+            try:
+                while self.wake.poll(0):
+                    self.wake.recv_bytes()
+            except (EOFError, OSError):
+                self.wake = None
+        return self.read()
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+    def get_stats(self):
+        return {
+            'name': self.name,
+            'next_seq': self.next_seq,
+            'backlog': self.head() - self.next_seq,
+            'received': self.received,
+            'lost': self.lost,
+            'overruns': self.overruns
+        }
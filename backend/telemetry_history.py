@@ -0,0 +1,195 @@
+import threading
+import time
+import numpy as np
+from binary_frames import TELEMETRY_SCHEMA_V1
+from downsampling import DecimationTiers, lttb_indices, minmax_reduce, DEFAULT_TIER_FACTORS, MODE_LTTB, MODE_MINMAX
+
+TELEMETRY_FIELDS = list(TELEMETRY_SCHEMA_V1.names)
+DEFAULT_HISTORY_CAPACITY = 1 << 16
+DEFAULT_HISTORY_SECONDS = 60.0
+TIER_BLOCK_SIZE = 100
+OVERSAMPLING = 4
+INDEX_FIELDS = ('time', 'status')
+
+def column_to_list(column):
+    values = column.tolist()
+    if column.dtype.kind == 'f' and np.isnan(column).any():
+        values = [None if v != v else v for v in values]
+    return values
+
+class TelemetryRing:
+    def __init__(self, capacity=DEFAULT_HISTORY_CAPACITY, fields=None, tier_factors=None):
+        self.capacity = capacity
+        self.fields = list(fields or TELEMETRY_FIELDS)
+        self.field_index = {name: i for i, name in enumerate(self.fields)}
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.full((capacity, len(self.fields)), np.nan, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.total = 0
+        self.tiers = DecimationTiers(len(self.fields), tier_factors or DEFAULT_TIER_FACTORS)
+        self._block_fill = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, sample, recv_time=None):
+        with self._lock:
+            i = self.head
+            row = self.values[i]
+            self.times[i] = time.time() if recv_time is None else recv_time
+            for j, name in enumerate(self.fields):
+                value = sample.get(name)
+                try:
+                    row[j] = np.nan if value is None else value
+                except (TypeError, ValueError, OverflowError):
+                    row[j] = np.nan
+            self.head = (i + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+            self.total += 1
+
+            self._block_fill += 1
+            if self._block_fill == TIER_BLOCK_SIZE:
+                self._block_fill = 0
+                idx = (self.head - TIER_BLOCK_SIZE + np.arange(TIER_BLOCK_SIZE)) % self.capacity
+                self.tiers.add_block(self.times[idx], self.values[idx])
+
+    def _ordered_index(self, start=0):
+        oldest = self.head if self.count == self.capacity else 0
+        return (oldest + np.arange(start, self.count)) % self.capacity
+
+    def _ordered_times(self):
+        if self.count < self.capacity:
+            return self.times[:self.count]
+        return np.concatenate((self.times[self.head:], self.times[:self.head]))
+
+    def _range_start(self, times, seconds, since):
+        if since is not None:
+            return since, int(np.searchsorted(times, since, side='right'))
+        if seconds is not None and len(times):
+            t_start = times[-1] - seconds
+            return t_start, int(np.searchsorted(times, t_start, side='left'))
+        return None, 0
+
+    def snapshot(self, seconds=None, fields=None, since=None):
+        fields = [f for f in (fields or self.fields) if f in self.field_index]
+        field_idx = [self.field_index[f] for f in fields]
+        with self._lock:
+            times = self._ordered_times()
+            _, start = self._range_start(times, seconds, since)
+            idx = self._ordered_index(start)
+            times = self.times[idx]
+            values = self.values[idx][:, field_idx]
+        return times, {name: values[:, j] for j, name in enumerate(fields)}
+
+    def _select_tier(self, t_start, budget, raw_covers=False):
+        chosen = None
+        for tier in self.tiers.tiers:
+            oldest = tier.oldest_time()
+            if oldest is None:
+                break
+            chosen = tier
+            if (t_start is None or raw_covers or oldest <= t_start) and tier.buckets_since(t_start or -np.inf) <= budget:
+                return tier
+        return chosen
+
+    def _lttb_key(self, fields, key, values):
+        if key in fields:
+            return fields.index(key)
+        finite = ~np.isnan(values).all(axis=0)
+        for j, name in enumerate(fields):
+            if name not in INDEX_FIELDS and finite[j]:
+                return j
+        return 0 if fields else None
+
+    def downsample(self, seconds=None, fields=None, since=None, max_points=1000, mode=MODE_LTTB, key=None):
+        fields = [f for f in (fields or self.fields) if f in self.field_index]
+        field_idx = [self.field_index[f] for f in fields]
+        budget = max_points * OVERSAMPLING
+
+        with self._lock:
+            times = self._ordered_times()
+            t_start, start = self._range_start(times, seconds, since)
+            raw_covers = self.count < self.capacity or (t_start is not None and len(times) and times[0] <= t_start)
+            tier = None
+            if not (raw_covers and len(times) - start <= budget):
+                tier = self._select_tier(t_start, budget, raw_covers)
+
+            if tier is None:
+                idx = self._ordered_index(start)
+                t = self.times[idx]
+                vmin = vmax = mean = self.values[idx][:, field_idx]
+            else:
+                t, vmin, vmax, mean, t_last = tier.select(-np.inf if t_start is None else t_start, field_idx)
+                tail_start = start if t_last is None else max(start, int(np.searchsorted(times, t_last, side='right')))
+                idx = self._ordered_index(tail_start)
+                tail = self.values[idx][:, field_idx]
+                t = np.concatenate((t, self.times[idx]))
+                vmin = np.concatenate((vmin, tail))
+                vmax = np.concatenate((vmax, tail))
+                mean = np.concatenate((mean, tail))
+
+        result = {
+            'tier': tier.name if tier else 'raw',
+            'mode': mode,
+            'fields': fields
+        }
+        if mode == MODE_MINMAX:
+            t, vmin, vmax, mean = minmax_reduce(t, vmin, vmax, mean, max(1, max_points // 2))
+            result.update({
+                'count': len(t),
+                't': [round(x, 3) for x in t.tolist()],
+                'values': {name: column_to_list(np.round(mean[:, j], 6)) for j, name in enumerate(fields)},
+                'min': {name: column_to_list(vmin[:, j]) for j, name in enumerate(fields)},
+                'max': {name: column_to_list(vmax[:, j]) for j, name in enumerate(fields)}
+            })
+            return result
+
+        key_index = self._lttb_key(fields, key, mean)
+        selected = lttb_indices(t, mean[:, key_index] if key_index is not None else np.zeros(len(t)), max_points)
+        result.update({
+            'key': fields[key_index] if key_index is not None else None,
+            'count': len(selected),
+            't': [round(x, 3) for x in t[selected].tolist()],
+            'values': {name: column_to_list(np.round(mean[selected, j], 6)) for j, name in enumerate(fields)}
+        })
+        return result
+
+    def query(self, seconds=DEFAULT_HISTORY_SECONDS, fields=None, since=None, binary=False, max_points=None, mode=MODE_LTTB, key=None):
+        if max_points:
+            result = self.downsample(seconds, fields, since, max_points, mode, key)
+        else:
+            times, columns = self.snapshot(seconds, fields, since)
+            if binary:
+                result = {
+                    'count': len(times),
+                    'fields': list(columns.keys()),
+                    'encoding': {'t': 'float64', 'values': 'float32'},
+                    't': times.tobytes(),
+                    'values': {name: column.astype(np.float32).tobytes() for name, column in columns.items()}
+                }
+            else:
+                result = {
+                    'count': len(times),
+                    'fields': list(columns.keys()),
+                    't': [round(t, 3) for t in times.tolist()],
+                    'values': {name: column_to_list(column) for name, column in columns.items()}
+                }
+        result['now'] = round(time.time(), 3)
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            span = 0.0
+            if self.count:
+                oldest = self.times[self.head] if self.count == self.capacity else self.times[0]
+                span = float(self.times[self.head - 1] - oldest)
+            return {
+                'capacity': self.capacity,
+                'count': self.count,
+                'total': self.total,
+                'span_seconds': round(span, 3),
+                'tiers': self.tiers.get_stats()
+            }
@@ -0,0 +1,52 @@
+import glob
+import json
+import os
+import re
+import sys
+
+WIDGET_MANIFEST = 'widgets.json'
+WIDGET_SUFFIX = '.tsx'
+FIELDS_PATTERN = re.compile(r'export\s+const\s+telemetryFields\s*=\s*\[([^\]]*)\]')
+FIELD_PATTERN = re.compile(r'''['"]([A-Za-z0-9_]+)['"]''')
+
+def get_widgets_dir():
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'src', 'components', 'widgets'))
+
+def read_widget_fields(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        match = FIELDS_PATTERN.search(f.read())
+    if match is None:
+        return None
+    return sorted(set(FIELD_PATTERN.findall(match.group(1))))
+
+def scan_widgets(widgets_dir=None):
+    widgets = {}
+    for path in glob.glob(os.path.join(widgets_dir or get_widgets_dir(), '*' + WIDGET_SUFFIX)):
+        name = os.path.basename(path)[:-len(WIDGET_SUFFIX)]
+        try:
+            widgets[name] = read_widget_fields(path)
+        except OSError as e:
+            print(f"erro ao ler widget {name}: {e}")
+            widgets[name] = None
+    return dict(sorted(widgets.items()))
+
+def load_manifest(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        return {name: None for name in sorted(manifest)}
+    return dict(sorted(manifest.items()))
+
+def write_manifest(path, widgets_dir=None):
+    widgets = scan_widgets(widgets_dir)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(widgets, f)
+    return widgets
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), WIDGET_MANIFEST)
+    widgets = write_manifest(target, sys.argv[2] if len(sys.argv) > 2 else None)
+    undeclared = [name for name, fields in widgets.items() if fields is None]
+    print(f"{len(widgets)} widgets encontrados")
+    if undeclared:
+        print(f"Widgets sem telemetryFields (recebem a telemetria completa): {', '.join(undeclared)}")
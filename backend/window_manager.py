@@ -1,14 +1,17 @@
 import sys
-import webview
-import requests
-import time
-from typing import Optional, Dict, List
+import threading
+from typing import TYPE_CHECKING, Optional, Dict, List
 from abc import ABC
+from startup import STARTUP, WINDOW_BUDGET_MS, wait_for_port
+
+if TYPE_CHECKING:
+    import webview
 
 localhost = "127.0.0.1"
+LOADING_HTML = '<html><body style="background:#111;color:#aaa;font-family:sans-serif;display:flex;align-items:center;justify-content:center;height:100vh;margin:0">Carregando...</body></html>'
 
 class BaseWindow(ABC):
-    def __init__(self, title: str, route: str, port: int, width: int = 1200, height: int = 800, host: str = localhost, auto_open: bool = True):
+    def __init__(self, title: str, route: str, port: int, width: int = 1200, height: int = 800, host: str = localhost, auto_open: bool = True, html: Optional[str] = None):
         self.title = title
         self.route = route
         self.port = port
@@ -16,26 +19,40 @@ class BaseWindow(ABC):
         self.width = width
         self.height = height
         self.url = f"http://{self.host}:{self.port}{self.route}"
-        self.window: Optional[webview.Window] = None
+        self.window: Optional['webview.Window'] = None
         self._is_created = False
+        self._loaded = html is None
         
         if auto_open:
-            self.create_window()
+            self.create_window(html)
 
-    def create_window(self) -> webview.Window:
+    def create_window(self, html: Optional[str] = None) -> 'webview.Window':
         if self._is_created:
             raise RuntimeError(f"A janela '{self.title}' já foi criada.")
 
+        import webview
+
         self.window = webview.create_window(
             title=self.title,
-            url=self.url,
+            url=None if html else self.url,
+            html=html,
             width=self.width,
             height=self.height
         )
         self.window.events.closed += self._on_window_closed
+        self.window.events.shown += self._on_window_shown
         self._is_created = True
         return self.window
 
+    def navigate(self):
+        if self.window and self._is_created and not self._loaded:
+            self.window.load_url(self.url)
+            self._loaded = True
+
+    def _on_window_shown(self):
+        STARTUP.mark('window_shown')
+        STARTUP.check('window_shown', WINDOW_BUDGET_MS)
+
     def _on_window_closed(self):
         self._is_created = False
 
@@ -51,13 +68,13 @@ class BaseWindow(ABC):
         return self._is_created
 
 class UserWindow(BaseWindow):
-    def __init__(self, port: int, auto_open: bool = True):
-        super().__init__(title="Supervisório", route="/", port=port, width=1400, height=900, auto_open=auto_open)
+    def __init__(self, port: int, auto_open: bool = True, html: Optional[str] = None):
+        super().__init__(title="Supervisório", route="/", port=port, width=1400, height=900, auto_open=auto_open, html=html)
 
 class AdminWindow(BaseWindow):
-    def __init__(self, port: int, ui_main=None, auto_open: bool = True):
+    def __init__(self, port: int, ui_main=None, auto_open: bool = True, html: Optional[str] = None):
         self.ui_main = ui_main
-        super().__init__(title="Painel de Administrador", route="/admin", port=port, width=1200, height=800, auto_open=auto_open)
+        super().__init__(title="Painel de Administrador", route="/admin", port=port, width=1200, height=800, auto_open=auto_open, html=html)
     
     def _on_window_closed(self):
         super()._on_window_closed()
@@ -67,29 +84,32 @@ class AdminWindow(BaseWindow):
             sys.exit(0)
 
 class UIMain:
-    def __init__(self, port: int, host: str = localhost):
+    def __init__(self, port: int, host: str = localhost, ready: Optional[threading.Event] = None):
         self.port = port
         self.host = host
         self.windows: Dict[str, BaseWindow] = {}
         self._running = True
         self._webview_started = False
-        self._wait_for_server()
-
-    def _wait_for_server(self, timeout=10):
-        url = f"http://{self.host}:{self.port}/"
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                requests.get(url, timeout=1)
-                return True
-            except requests.RequestException:
-                time.sleep(0.5)
-        return False
+        self.ready = ready
+        if ready is None:
+            wait_for_port(self.host, self.port, 10)
+
+    def _initial_html(self) -> Optional[str]:
+        if self.ready is None or self.ready.is_set():
+            return None
+        return LOADING_HTML
+
+    def show_when_ready(self, timeout=10) -> bool:
+        if self.ready is not None and not self.ready.wait(timeout):
+            return False
+        for window in list(self.windows.values()):
+            window.navigate()
+        return True
 
     def open_user_window(self, key: str = "user") -> UserWindow:
         if key in self.windows and self.windows[key].is_created():
             raise RuntimeError(f"A janela '{key}' já está aberta.")
-        window = UserWindow(port=self.port)
+        window = UserWindow(port=self.port, html=self._initial_html())
         self.windows[key] = window
         return window
 
@@ -98,7 +118,7 @@ class UIMain:
             raise RuntimeError(f"A janela '{key}' já está aberta.")
         if any(isinstance(w, AdminWindow) and w.is_created() for w in self.windows.values()):
             raise RuntimeError("A janela de administrador já está aberta.")
-        window = AdminWindow(port=self.port, ui_main=self)
+        window = AdminWindow(port=self.port, ui_main=self, html=self._initial_html())
         self.windows[key] = window
         return window
 
@@ -124,17 +144,18 @@ class UIMain:
     def is_running(self) -> bool:
         return self._running
 
-    def start_webview(self):
+    def start_webview(self, on_start=None):
         if not self._webview_started:
             self._webview_started = True
-            webview.start(debug=False)
+            import webview
+            webview.start(on_start, debug=False)
             self._on_all_windows_closed()
 
     def _on_all_windows_closed(self):
         self._running = False
 
-    def wait_for_windows(self):
+    def wait_for_windows(self, on_start=None):
         try:
-            self.start_webview()
+            self.start_webview(on_start)
         except KeyboardInterrupt:
             self.shutdown()
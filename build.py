@@ -11,6 +11,18 @@ def build_frontend(base_dir):
     subprocess.run([npm, "install"], cwd=frontend_dir, check=True, shell=True)
     subprocess.run([npm, "run", "build"], cwd=frontend_dir, check=True, shell=True)
 
+def compress_frontend(base_dir):
+    print("\n=== COMPRIMINDO FRONTEND (GZIP/BROTLI) ===")
+    frontend_dist = os.path.join(base_dir, 'frontend', 'dist')
+    script = os.path.join(base_dir, 'backend', 'static_assets.py')
+    subprocess.run([sys.executable, script, frontend_dist], check=True)
+
+def generate_widget_manifest(base_dir):
+    print("\n=== GERANDO LISTA DE WIDGETS ===")
+    widgets_dir = os.path.join(base_dir, 'frontend', 'src', 'components', 'widgets')
+    script = os.path.join(base_dir, 'backend', 'widget_registry.py')
+    subprocess.run([sys.executable, script, os.path.join(base_dir, 'backend', 'widgets.json'), widgets_dir], check=True)
+
 def build_backend(base_dir):
     print("\n=== COMPILANDO BACKEND (PYINSTALLER) ===")
     backend_dir = os.path.join(base_dir, 'backend')
@@ -22,6 +34,7 @@ def build_backend(base_dir):
         "--name=Supervisorio",
         f"--paths={backend_dir}",
         f"--add-data={frontend_dist}{path_sep}dist",
+        f"--add-data={os.path.join(backend_dir, 'widgets.json')}{path_sep}.",
         "--hidden-import=engineio.async_drivers.threading",
         "--hidden-import=flask_socketio",
         "--hidden-import=socketio",
@@ -31,6 +44,9 @@ def build_backend(base_dir):
         "--hidden-import=eventlet.hubs.epolls",
         "--hidden-import=eventlet.hubs.kqueue",
         "--hidden-import=eventlet.hubs.selects",
+        "--hidden-import=eventlet.tpool",
+        "--hidden-import=eventlet.wsgi",
+        "--hidden-import=engineio.async_drivers.eventlet",
         "--hidden-import=dns",
         os.path.join(backend_dir, 'main.py')
     ]
@@ -39,7 +55,7 @@ def build_backend(base_dir):
 
 def cleanup(base_dir):
     print("\nLimpando arquivos temporários...")
-    for path in ['build', 'Supervisorio.spec']:
+    for path in ['build', 'Supervisorio.spec', os.path.join('backend', 'widgets.json')]:
         full_path = os.path.join(base_dir, path)
         if os.path.exists(full_path):
             if os.path.isfile(full_path): os.remove(full_path)
@@ -62,6 +78,8 @@ def main():
 
     try:
         build_frontend(base_dir)
+        compress_frontend(base_dir)
+        generate_widget_manifest(base_dir)
         build_backend(base_dir)
         cleanup(base_dir)
     except subprocess.CalledProcessError as e:
@@ -33,8 +33,8 @@ interface Props {
 export const TelemetryDashboard: React.FC<Props> = ({ allowedWidgets }) => {
   const defaultWidgets = useMemo<WidgetInfo[]>(() => {
     return Object.entries(widgetModules).map(([path, module], index) => {
-      const Component = module[Object.keys(module).find(key => key !== 'default') || 'default'] || Object.values(module)[0];
       const name = path.split('/').pop()?.replace('.tsx', '') || 'Widget';
+      const Component = module[name] || module[Object.keys(module).find(key => key !== 'default' && key !== 'telemetryFields') || 'default'];
       const isWide = ['map', 'chart', 'altitude'].some(term => name.toLowerCase().includes(term));
       
       return { 
@@ -2,6 +2,8 @@ import React from 'react';
 import { VectorWidget } from '../BaseWidget';
 import { useTelemetry } from '../../context/TelemetryContext';
 
+export const telemetryFields = ['accel_x', 'accel_y', 'accel_z'];
+
 export const AccelerometerWidget: React.FC = () => {
   const { data } = useTelemetry();
   const accel_x = data?.accel_x;
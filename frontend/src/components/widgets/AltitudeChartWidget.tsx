@@ -4,8 +4,10 @@ import 'uplot/dist/uPlot.min.css';
 import { useTelemetry } from '../../context/TelemetryContext';
 import '../Widgets.css';
 
+export const telemetryFields = ['bmp_altitude'];
+
 export const AltitudeChartWidget: React.FC = () => {
-  const { data } = useTelemetry();
+  const { data, history } = useTelemetry();
   const chartRef = useRef<HTMLDivElement>(null);
   const plotRef = useRef<uPlot | null>(null);
   const startTimeRef = useRef<number>(Date.now());
@@ -49,6 +51,26 @@ export const AltitudeChartWidget: React.FC = () => {
     };
   }, []);
 
+  useEffect(() => {
+    const altitude = history?.values.bmp_altitude;
+    if (!history || !altitude) return;
+    const now = (Date.now() - startTimeRef.current) / 1000;
+    const serverNow = history.now ?? history.t[history.t.length - 1] ?? 0;
+    const time: number[] = [];
+    const values: number[] = [];
+
+    history.t.forEach((t, i) => {
+      const relative = now - (serverNow - t);
+      if (relative >= now - 25) {
+        time.push(relative);
+        values.push(altitude[i] ?? 0);
+      }
+    });
+
+    dataRef.current = { time, altitude: values };
+    plotRef.current?.setData([time, values]);
+  }, [history]);
+
   useEffect(() => {
     if (!plotRef.current || !data) return;
     const now = (Date.now() - startTimeRef.current) / 1000;
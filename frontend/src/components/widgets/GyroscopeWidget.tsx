@@ -2,6 +2,8 @@ import React from 'react';
 import { VectorWidget } from '../BaseWidget';
 import { useTelemetry } from '../../context/TelemetryContext';
 
+export const telemetryFields = ['rotation_x', 'rotation_y', 'rotation_z'];
+
 export const GyroscopeWidget: React.FC = () => {
   const { data } = useTelemetry();
   const rotation_x = data?.rotation_x;
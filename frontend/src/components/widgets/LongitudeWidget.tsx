@@ -2,6 +2,8 @@ import React from 'react';
 import { Widget } from '../BaseWidget';
 import { useTelemetry } from '../../context/TelemetryContext';
 
+export const telemetryFields = ['longitude'];
+
 export const LongitudeWidget: React.FC = () => {
   const { data } = useTelemetry();
   const value = data?.longitude;
@@ -4,6 +4,8 @@ import 'leaflet/dist/leaflet.css';
 import { useTelemetry } from '../../context/TelemetryContext';
 import '../Widgets.css';
 
+export const telemetryFields = ['latitude', 'longitude'];
+
 const customIcon = L.icon({
   iconUrl: "https://unpkg.com/leaflet@1.9.4/dist/images/marker-icon.png",
   iconRetinaUrl: "https://unpkg.com/leaflet@1.9.4/dist/images/marker-icon-2x.png",
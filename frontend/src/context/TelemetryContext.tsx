@@ -2,15 +2,24 @@ import React, { createContext, useContext, type ReactNode } from 'react';
 
 export type TelemetryData = any;
 
+export type TelemetryHistory = {
+  count: number;
+  fields: string[];
+  t: number[];
+  now?: number;
+  values: Record<string, (number | null)[]>;
+};
+
 interface TelemetryContextType {
   data: TelemetryData | null;
+  history: TelemetryHistory | null;
 }
 
 const TelemetryContext = createContext<TelemetryContextType | undefined>(undefined);
 
-export const TelemetryProvider: React.FC<{ data: TelemetryData | null; children: ReactNode }> = ({ data, children }) => {
+export const TelemetryProvider: React.FC<{ data: TelemetryData | null; history?: TelemetryHistory | null; children: ReactNode }> = ({ data, history = null, children }) => {
   return (
-    <TelemetryContext.Provider value={{ data }}>
+    <TelemetryContext.Provider value={{ data, history }}>
       {children}
     </TelemetryContext.Provider>
   );
@@ -1,4 +1,4 @@
-import { useEffect, useRef, useState } from 'react';
+import { useEffect, useRef, useState, type MouseEvent } from 'react';
 import { io, Socket } from 'socket.io-client';
 
 const widgetModules = import.meta.glob('../components/widgets/*.tsx');
@@ -11,12 +11,43 @@ type Props = {
   socketUrl: string;
 };
 
+type ClientQueueStats = {
+  queue_depth: number;
+  pending: boolean;
+  sent: number;
+  held: number;
+  coalesced: number;
+  lag_ms: number;
+};
+
+type RateLimits = {
+  max_rate: number | null;
+  widget_rates: Record<string, number>;
+  aggregation: string;
+};
+
+const AGGREGATIONS = ['last', 'mean', 'min', 'max'];
+
 type Client = {
   id: string;
   sid: string;
   type: string;
   ip: string;
   widgets?: string[];
+  queue?: ClientQueueStats | null;
+  rate_limits?: RateLimits | null;
+};
+
+type ClientsSnapshot = {
+  version: number;
+  clients: Client[];
+};
+
+type ClientsDelta = {
+  version: number;
+  added: Client[];
+  changed: Client[];
+  removed: string[];
 };
 
 type SerialPortInfo = {
@@ -24,8 +55,83 @@ type SerialPortInfo = {
   description: string;
   status: string;
   active: boolean;
+  role?: 'primary' | 'secondary' | null;
 };
 
+type LinkStats = {
+  received: number;
+  accepted: number;
+  duplicates: number;
+  late: number;
+  lost: number;
+  loss_pct: number;
+  link_quality: number | null;
+  last_seen_ms: number | null;
+};
+
+type SourceStats = LinkStats & {
+  port: string;
+  role: string;
+  status: string;
+};
+
+type StageStats = {
+  policy: string;
+  capacity: number;
+  depth: number;
+  max_depth: number;
+  enqueued: number;
+  dropped: number;
+  processed: number;
+  errors: number;
+  wait_ms_avg: number;
+  process_ms_avg: number;
+  age_ms_avg: number;
+};
+
+type IngestStats = {
+  port: string;
+  capture: { bytes_per_sec: number; frames_per_sec: number; partial_frames: number; overflow_frames: number } | null;
+  decode_errors: number;
+  decode: StageStats;
+  broadcast: StageStats;
+  sources?: SourceStats[];
+  merged?: LinkStats;
+};
+
+type HistogramSnapshot = {
+  count: number;
+  mean_ms: number | null;
+  p50_ms: number | null;
+  p90_ms: number | null;
+  p99_ms: number | null;
+  max_ms: number | null;
+};
+
+type MetricsSnapshot = Record<string, HistogramSnapshot | number | Record<string, number>>;
+
+const LATENCY_METRICS: [string, string][] = [
+  ['spark_read_to_emit_seconds', 'Leitura → envio'],
+  ['spark_parse_seconds', 'Decodificação'],
+  ['spark_emit_seconds', 'Fan-out'],
+  ['spark_client_rtt_seconds', 'RTT cliente'],
+  ['spark_uart_to_browser_seconds', 'UART → navegador'],
+  ['spark_serial_recovery_seconds', 'Recuperação da serial']
+];
+
+type ReplayStatus = {
+  path: string;
+  position: number;
+  total: number;
+  elapsed: number;
+  duration: number;
+  speed: number;
+  paused: boolean;
+  finished: boolean;
+};
+
+const REPLAY_SPEEDS = [1, 2, 5, 10, 0];
+
 function getSessionToken() {
   const STORAGE_KEY = 'admin_token';
   const existing = sessionStorage.getItem(STORAGE_KEY);
@@ -42,12 +148,17 @@ export function AdminPage({ socketUrl }: Props) {
   const [clients, setClients] = useState<Client[]>([]);
   const [globalWidgets, setGlobalWidgets] = useState<string[]>([]);
   const [editingClient, setEditingClient] = useState<Client | null>(null);
+  const [editingRates, setEditingRates] = useState<RateLimits | null>(null);
   
   const [serialPorts, setSerialPorts] = useState<SerialPortInfo[]>([]);
   const [currentPort, setCurrentPort] = useState<string>('');
   const [scanning, setScanning] = useState(false);
+  const [ingestStats, setIngestStats] = useState<IngestStats | null>(null);
+  const [metrics, setMetrics] = useState<MetricsSnapshot | null>(null);
+  const [replayStatus, setReplayStatus] = useState<ReplayStatus | null>(null);
 
   const socketRef = useRef<Socket | null>(null);
+  const rosterVersionRef = useRef<number | null>(null);
 
   useEffect(() => {
     if (!socketRef.current) {
@@ -56,6 +167,7 @@ export function AdminPage({ socketUrl }: Props) {
           id: 'ADMIN_' + SESSION_TOKEN.substring(0, 5),
           admin_secret: SESSION_TOKEN 
         },
+        transports: ['websocket', 'polling'],
         autoConnect: false,
         reconnection: true
       });
@@ -65,10 +177,43 @@ export function AdminPage({ socketUrl }: Props) {
       socket.on('admin_auth_success', () => {
         socket.emit('get_global_widgets');
         socket.emit('get_serial_ports');
+        socket.emit('get_ingest_stats');
+      });
+
+      socket.on('ingest_stats', (data: IngestStats) => {
+        setIngestStats(data);
+      });
+
+      socket.on('metrics', (data: MetricsSnapshot) => {
+        setMetrics(data);
+      });
+
+      socket.on('replay_status', (data: ReplayStatus | null) => {
+        setReplayStatus(data);
       });
       
-      socket.on('clients_update', (data: Client[]) => {
-        setClients(data);
+      socket.on('clients_snapshot', (data: ClientsSnapshot) => {
+        rosterVersionRef.current = data.version;
+        setClients(data.clients);
+      });
+
+      socket.on('clients_delta', (delta: ClientsDelta) => {
+        const version = rosterVersionRef.current;
+        if (version === null || delta.version <= version) return;
+        if (delta.version !== version + 1) {
+          rosterVersionRef.current = null;
+          socket.emit('clients_resync');
+          return;
+        }
+        rosterVersionRef.current = delta.version;
+        setClients(prev => {
+          const removed = new Set(delta.removed);
+          const changed = new Map(delta.changed.map(c => [c.sid, c]));
+          const next = prev
+            .filter(c => !removed.has(c.sid))
+            .map(c => changed.get(c.sid) ?? c);
+          return next.concat(delta.added.filter(c => !next.some(n => n.sid === c.sid)));
+        });
       });
 
       socket.on('serial_ports_list', (data: { current: string, ports: SerialPortInfo[] }) => {
@@ -83,6 +228,14 @@ export function AdminPage({ socketUrl }: Props) {
 
       socket.connect();
     }
+
+    const statsTimer = setInterval(() => {
+      socketRef.current?.emit('get_ingest_stats');
+      socketRef.current?.emit('get_replay_status');
+      socketRef.current?.emit('get_metrics');
+    }, 2000);
+
+    return () => clearInterval(statsTimer);
   }, [socketUrl]);
 
   const handleGlobalToggle = (widget: string) => {
@@ -115,23 +268,58 @@ export function AdminPage({ socketUrl }: Props) {
     };
 
     socketRef.current?.emit('update_client_widgets', payload);
+    socketRef.current?.emit('update_client_rate_limits', {
+      client_id: editingClient.id,
+      limits: editingRates ?? 'GLOBAL'
+    });
     setEditingClient(null);
   };
 
   const resetClientWidgets = () => {
     if (!editingClient) return;
     setEditingClient({ ...editingClient, widgets: undefined });
+    setEditingRates(null);
+  };
+
+  const openClientEditor = (client: Client) => {
+    setEditingClient(client);
+    setEditingRates(client.rate_limits ?? null);
+  };
+
+  const updateEditingRates = (changes: Partial<RateLimits>) => {
+    const current = editingRates ?? { max_rate: null, widget_rates: {}, aggregation: 'last' };
+    setEditingRates({ ...current, ...changes });
+  };
+
+  const setWidgetRate = (widget: string, value: string) => {
+    const widgetRates = { ...(editingRates?.widget_rates ?? {}) };
+    const rate = parseFloat(value);
+    if (rate > 0) {
+      widgetRates[widget] = rate;
+    } else {
+      delete widgetRates[widget];
+    }
+    updateEditingRates({ widget_rates: widgetRates });
   };
 
   const refreshPorts = () => {
     setScanning(true);
-    socketRef.current?.emit('get_serial_ports');
+    socketRef.current?.emit('get_serial_ports', { refresh: true });
   };
 
   const changePort = (port: string) => {
     socketRef.current?.emit('set_serial_port', port);
   };
 
+  const toggleSource = (e: MouseEvent, sp: SerialPortInfo) => {
+    e.stopPropagation();
+    socketRef.current?.emit(sp.role === 'secondary' ? 'remove_serial_source' : 'add_serial_source', sp.port);
+  };
+
+  const controlReplay = (action: string, value?: number) => {
+    socketRef.current?.emit('replay_control', { action, value });
+  };
+
   return (
     <div className="admin-scroll">
       <div style={{ backgroundColor: '#2a2a2a', padding: '15px', borderRadius: '8px', marginBottom: '20px', border: '1px solid #444' }}>
@@ -193,13 +381,158 @@ export function AdminPage({ socketUrl }: Props) {
                   <span style={{ fontSize: '0.8em', color: statusColor, marginTop: '5px' }}>
                     {isSelected ? 'CONECTADO' : sp.status}
                   </span>
+                  {!isSelected && (
+                    <button
+                      onClick={e => toggleSource(e, sp)}
+                      style={{ marginTop: '8px', padding: '3px 8px', background: sp.role === 'secondary' ? '#f57c00' : '#555', color: '#fff', border: 'none', borderRadius: '4px', cursor: 'pointer', alignSelf: 'flex-start' }}
+                    >
+                      {sp.role === 'secondary' ? 'Remover receptor reserva' : 'Usar como reserva'}
+                    </button>
+                  )}
                 </div>
               );
             })}
           </div>
         )}
+
+        {currentPort.startsWith('REPLAY:') && replayStatus && (
+          <div style={{ display: 'flex', alignItems: 'center', gap: '10px', marginTop: '15px', flexWrap: 'wrap' }}>
+            <button
+              onClick={() => controlReplay(replayStatus.paused || replayStatus.finished ? 'resume' : 'pause')}
+              style={{ padding: '5px 15px', background: '#1976d2', color: '#fff', border: 'none', borderRadius: '4px', cursor: 'pointer' }}
+            >
+              {replayStatus.paused || replayStatus.finished ? 'Reproduzir' : 'Pausar'}
+            </button>
+            {REPLAY_SPEEDS.map(speed => (
+              <button
+                key={speed}
+                onClick={() => controlReplay('speed', speed)}
+                style={{ padding: '5px 10px', background: replayStatus.speed === speed ? '#4caf50' : '#555', color: '#fff', border: 'none', borderRadius: '4px', cursor: 'pointer' }}
+              >
+                {speed === 0 ? 'Máx' : `${speed}x`}
+              </button>
+            ))}
+            <input
+              type="range"
+              min={0}
+              max={replayStatus.duration}
+              step={0.1}
+              value={replayStatus.elapsed}
+              onChange={e => controlReplay('seek', Number(e.target.value))}
+              style={{ flex: 1, minWidth: '150px' }}
+            />
+            <span style={{ fontFamily: 'monospace', color: '#aaa' }}>
+              {replayStatus.elapsed.toFixed(1)}s / {replayStatus.duration.toFixed(1)}s
+            </span>
+          </div>
+        )}
       </div>
 
+      {ingestStats && (
+        <div style={{ backgroundColor: '#2a2a2a', padding: '15px', borderRadius: '8px', marginBottom: '20px', border: '1px solid #444' }}>
+          <h3>Ingestão ({ingestStats.port})</h3>
+          {ingestStats.capture && (
+            <p style={{ color: '#aaa', fontSize: '0.9em', fontFamily: 'monospace' }}>
+              {ingestStats.capture.bytes_per_sec} B/s · {ingestStats.capture.frames_per_sec} frames/s · parciais {ingestStats.capture.partial_frames} · descartados {ingestStats.capture.overflow_frames} · erros {ingestStats.decode_errors}
+            </p>
+          )}
+          <table style={{ width: '100%', borderCollapse: 'collapse', color: '#ccc', fontSize: '0.9em', fontFamily: 'monospace' }}>
+            <thead>
+              <tr style={{ borderBottom: '1px solid #444', textAlign: 'left' }}>
+                <th style={{ padding: '5px' }}>Estágio</th>
+                <th style={{ padding: '5px' }}>Política</th>
+                <th style={{ padding: '5px' }}>Fila</th>
+                <th style={{ padding: '5px' }}>Descartes</th>
+                <th style={{ padding: '5px' }}>Espera (ms)</th>
+                <th style={{ padding: '5px' }}>Proc. (ms)</th>
+                <th style={{ padding: '5px' }}>Idade (ms)</th>
+              </tr>
+            </thead>
+            <tbody>
+              {(['decode', 'broadcast'] as const).map(name => {
+                const stage = ingestStats[name];
+                return (
+                  <tr key={name} style={{ borderBottom: '1px solid #333' }}>
+                    <td style={{ padding: '5px' }}>{name}</td>
+                    <td style={{ padding: '5px' }}>{stage.policy}</td>
+                    <td style={{ padding: '5px' }}>{stage.depth}/{stage.capacity} (máx {stage.max_depth})</td>
+                    <td style={{ padding: '5px', color: stage.dropped ? '#f44336' : undefined }}>{stage.dropped}</td>
+                    <td style={{ padding: '5px' }}>{stage.wait_ms_avg}</td>
+                    <td style={{ padding: '5px' }}>{stage.process_ms_avg}</td>
+                    <td style={{ padding: '5px' }}>{stage.age_ms_avg}</td>
+                  </tr>
+                );
+              })}
+            </tbody>
+          </table>
+          {ingestStats.sources && ingestStats.sources.length > 1 && (
+            <table style={{ width: '100%', borderCollapse: 'collapse', color: '#ccc', fontSize: '0.9em', fontFamily: 'monospace', marginTop: '15px' }}>
+              <thead>
+                <tr style={{ borderBottom: '1px solid #444', textAlign: 'left' }}>
+                  <th style={{ padding: '5px' }}>Receptor</th>
+                  <th style={{ padding: '5px' }}>Estado</th>
+                  <th style={{ padding: '5px' }}>Recebidos</th>
+                  <th style={{ padding: '5px' }}>Primeiro</th>
+                  <th style={{ padding: '5px' }}>Duplicados</th>
+                  <th style={{ padding: '5px' }}>Perda (%)</th>
+                  <th style={{ padding: '5px' }}>Qualidade</th>
+                </tr>
+              </thead>
+              <tbody>
+                {[...ingestStats.sources, ...(ingestStats.merged ? [{ ...ingestStats.merged, port: 'combinado', role: '', status: '' }] : [])].map(src => (
+                  <tr key={src.port} style={{ borderBottom: '1px solid #333' }}>
+                    <td style={{ padding: '5px' }}>{src.port}{src.role === 'primary' ? ' (principal)' : ''}</td>
+                    <td style={{ padding: '5px' }}>{src.status}</td>
+                    <td style={{ padding: '5px' }}>{src.received ?? 0}</td>
+                    <td style={{ padding: '5px' }}>{src.accepted ?? 0}</td>
+                    <td style={{ padding: '5px' }}>{(src.duplicates ?? 0) + (src.late ?? 0)}</td>
+                    <td style={{ padding: '5px', color: src.loss_pct > 5 ? '#f44336' : undefined }}>{src.loss_pct ?? 0}</td>
+                    <td style={{ padding: '5px' }}>{src.link_quality ?? '-'}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          )}
+        </div>
+      )}
+
+      {metrics && (
+        <div style={{ backgroundColor: '#2a2a2a', padding: '15px', borderRadius: '8px', marginBottom: '20px', border: '1px solid #444' }}>
+          <h3>Latência</h3>
+          <p style={{ color: '#aaa', fontSize: '0.9em', fontFamily: 'monospace' }}>
+            {String(metrics.spark_frames_per_second)} frames/s · {String(metrics.spark_bytes_per_second)} B/s · reconexões {String(metrics.spark_serial_reconnects_total)} · erros {String(metrics.spark_decode_errors_total)}
+          </p>
+          <table style={{ width: '100%', borderCollapse: 'collapse', color: '#ccc', fontSize: '0.9em', fontFamily: 'monospace' }}>
+            <thead>
+              <tr style={{ borderBottom: '1px solid #444', textAlign: 'left' }}>
+                <th style={{ padding: '5px' }}>Medida</th>
+                <th style={{ padding: '5px' }}>Amostras</th>
+                <th style={{ padding: '5px' }}>p50 (ms)</th>
+                <th style={{ padding: '5px' }}>p90 (ms)</th>
+                <th style={{ padding: '5px' }}>p99 (ms)</th>
+                <th style={{ padding: '5px' }}>Máx (ms)</th>
+              </tr>
+            </thead>
+            <tbody>
+              {LATENCY_METRICS.map(([name, label]) => {
+                const h = metrics[name] as HistogramSnapshot | undefined;
+                if (!h) return null;
+                return (
+                  <tr key={name} style={{ borderBottom: '1px solid #333' }}>
+                    <td style={{ padding: '5px' }}>{label}</td>
+                    <td style={{ padding: '5px' }}>{h.count}</td>
+                    <td style={{ padding: '5px' }}>{h.p50_ms ?? '-'}</td>
+                    <td style={{ padding: '5px' }}>{h.p90_ms ?? '-'}</td>
+                    <td style={{ padding: '5px' }}>{h.p99_ms ?? '-'}</td>
+                    <td style={{ padding: '5px' }}>{h.max_ms ?? '-'}</td>
+                  </tr>
+                );
+              })}
+            </tbody>
+          </table>
+        </div>
+      )}
+
       <div style={{ backgroundColor: '#2a2a2a', padding: '15px', borderRadius: '8px', marginBottom: '20px', border: '1px solid #444' }}>
         <h3>Padrões Globais</h3>
         <div style={{ display: 'flex', flexWrap: 'wrap', gap: '10px' }}>
@@ -229,6 +562,9 @@ export function AdminPage({ socketUrl }: Props) {
             <tr style={{ borderBottom: '1px solid #444', textAlign: 'left' }}>
               <th style={{ padding: '10px' }}>ID</th>
               <th style={{ padding: '10px' }}>IP</th>
+              <th style={{ padding: '10px' }}>Fila</th>
+              <th style={{ padding: '10px' }}>Atraso (ms)</th>
+              <th style={{ padding: '10px' }}>Coalescidos</th>
               <th style={{ padding: '10px' }}>Widgets</th>
               <th style={{ padding: '10px' }}>Ações</th>
             </tr>
@@ -240,6 +576,9 @@ export function AdminPage({ socketUrl }: Props) {
               <tr key={client.sid} style={{ borderBottom: '1px solid #333' }}>
                 <td style={{ padding: '10px', fontFamily: 'monospace', fontWeight: 'bold' }}>{client.id}</td>
                 <td style={{ padding: '10px' }}>{client.ip}</td>
+                <td style={{ padding: '10px', color: client.queue?.pending ? '#ff8a65' : '#ccc' }}>{client.queue ? client.queue.queue_depth : '-'}</td>
+                <td style={{ padding: '10px', color: client.queue && client.queue.lag_ms > 1000 ? '#ff8a65' : '#ccc' }}>{client.queue ? client.queue.lag_ms : '-'}</td>
+                <td style={{ padding: '10px' }}>{client.queue ? client.queue.coalesced : '-'}</td>
                 <td style={{ padding: '10px', fontSize: '0.9em' }}>
                   {client.widgets ? (
                     <span style={{ color: '#4fc3f7' }}>Personalizado ({client.widgets.length})</span>
@@ -249,7 +588,7 @@ export function AdminPage({ socketUrl }: Props) {
                 </td>
                 <td style={{ padding: '10px' }}>
                   <button 
-                    onClick={() => setEditingClient(client)}
+                    onClick={() => openClientEditor(client)}
                     style={{ padding: '5px 10px', cursor: 'pointer', background: '#555', color: '#fff', border: 'none', borderRadius: '4px' }}
                   >
                     Editar
@@ -275,6 +614,29 @@ export function AdminPage({ socketUrl }: Props) {
                 : "Este usuário tem permissões personalizadas."}
             </p>
             
+            <div style={{ display: 'flex', alignItems: 'center', gap: '10px', flexWrap: 'wrap' }}>
+              <label style={{ display: 'flex', alignItems: 'center', gap: '5px' }}>
+                Taxa máx. (Hz)
+                <input
+                  type="number"
+                  min={0}
+                  value={editingRates?.max_rate ?? ''}
+                  onChange={(e) => updateEditingRates({ max_rate: parseFloat(e.target.value) > 0 ? parseFloat(e.target.value) : null })}
+                  style={{ width: '70px', background: '#333', color: '#fff', border: '1px solid #555', padding: '3px' }}
+                />
+              </label>
+              <label style={{ display: 'flex', alignItems: 'center', gap: '5px' }}>
+                Janela
+                <select
+                  value={editingRates?.aggregation ?? 'last'}
+                  onChange={(e) => updateEditingRates({ aggregation: e.target.value })}
+                  style={{ background: '#333', color: '#fff', border: '1px solid #555', padding: '3px' }}
+                >
+                  {AGGREGATIONS.map(a => <option key={a} value={a}>{a}</option>)}
+                </select>
+              </label>
+            </div>
+
             <div style={{ display: 'flex', flexWrap: 'wrap', gap: '10px', margin: '20px 0', maxHeight: '300px', overflowY: 'auto' }}>
               {AVAILABLE_WIDGETS.map(widget => {
                 const isChecked = (editingClient.widgets || globalWidgets).includes(widget);
@@ -286,7 +648,15 @@ export function AdminPage({ socketUrl }: Props) {
                       checked={isChecked} 
                       onChange={() => handleClientToggle(widget)}
                     />
-                    {widget.replace('Widget', '')}
+                    <span style={{ flex: 1 }}>{widget.replace('Widget', '')}</span>
+                    <input
+                      type="number"
+                      min={0}
+                      placeholder="Hz"
+                      value={editingRates?.widget_rates[widget] ?? ''}
+                      onChange={(e) => setWidgetRate(widget, e.target.value)}
+                      style={{ width: '60px', background: '#222', color: '#fff', border: '1px solid #555', padding: '2px' }}
+                    />
                   </label>
                 );
               })}
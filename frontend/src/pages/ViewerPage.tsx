@@ -1,7 +1,18 @@
 import { useEffect, useRef, useState } from 'react';
 import { io, Socket } from 'socket.io-client';
 import { TelemetryDashboard } from '../components/TelemetryDashboard';
-import { TelemetryProvider, type TelemetryData } from '../context/TelemetryContext';
+import { TelemetryProvider, type TelemetryData, type TelemetryHistory } from '../context/TelemetryContext';
+
+const HISTORY_SECONDS = 30;
+const HISTORY_MAX_POINTS = 1500;
+const LATENCY_ECHO = new URLSearchParams(window.location.search).has('echo');
+
+type DeltaMessage = {
+  stream: number;
+  seq: number;
+  key: boolean;
+  data: Record<string, unknown>;
+};
 
 type Props = {
   socketUrl: string;
@@ -19,17 +30,22 @@ function getClientId() {
 
 export function ViewerPage({ socketUrl }: Props) {
   const [telemetry, setTelemetry] = useState<TelemetryData | null>(null);
+  const [history, setHistory] = useState<TelemetryHistory | null>(null);
   const [allowedWidgets, setAllowedWidgets] = useState<string[] | undefined>(undefined);
 
   const socketRef = useRef<Socket | null>(null);
+  const deltaStateRef = useRef<{ stream: number | null; seq: number | null; data: Record<string, unknown> }>({ stream: null, seq: null, data: {} });
 
   useEffect(() => {
     if (!socketRef.current) {
       const clientId = getClientId();
       socketRef.current = io(socketUrl, {
         auth: {
-          id: clientId
+          id: clientId,
+          stream: 'delta',
+          echo: LATENCY_ECHO
         },
+        transports: ['websocket', 'polling'],
         autoConnect: false,
         reconnection: true
       });
@@ -40,6 +56,45 @@ export function ViewerPage({ socketUrl }: Props) {
         if (data) setTelemetry(data as TelemetryData);
       });
 
+      socket.on('connect', () => {
+        deltaStateRef.current = { stream: null, seq: null, data: {} };
+        socket.emit('history_request', { seconds: HISTORY_SECONDS, max_points: HISTORY_MAX_POINTS, key: 'bmp_altitude' });
+      });
+
+      socket.on('data_delta', (message: DeltaMessage) => {
+        const state = deltaStateRef.current;
+        if (message.key) {
+          if (state.stream === message.stream && state.seq !== null && message.seq <= state.seq) return;
+          state.stream = message.stream;
+          state.data = { ...message.data };
+        } else {
+          if (state.stream !== message.stream) {
+            if (state.seq !== null) {
+              state.seq = null;
+              socket.emit('delta_resync');
+            }
+            return;
+          }
+          if (state.seq === null || message.seq <= state.seq) return;
+          if (message.seq !== state.seq + 1) {
+            state.seq = null;
+            socket.emit('delta_resync');
+            return;
+          }
+          state.data = { ...state.data, ...message.data };
+        }
+        state.seq = message.seq;
+        setTelemetry(state.data as TelemetryData);
+      });
+
+      socket.on('latency_probe', (probe: { t: number }) => {
+        socket.emit('latency_echo', probe);
+      });
+
+      socket.on('history_data', (data: TelemetryHistory) => {
+        if (data) setHistory(data);
+      });
+
       socket.on('widget_permissions', (widgets: string[]) => {
         setAllowedWidgets(widgets);
       });
@@ -51,7 +106,7 @@ export function ViewerPage({ socketUrl }: Props) {
   }, [socketUrl]);
 
   return (
-    <TelemetryProvider data={telemetry}>
+    <TelemetryProvider data={telemetry} history={history}>
       <div style={{ height: '100vh', width: '100vw', overflow: 'hidden' }}>
         <TelemetryDashboard allowedWidgets={allowedWidgets} />
       </div>
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def wait_until(predicate, timeout=5.0, interval=0.01):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+    return predicate()
+
+@pytest.fixture
+def pty_device():
+    pytest.importorskip('tty')
+    from pty_device import PtyDevice
+
+    devices = []
+
+    def start(frame_format='json', rate_hz=200.0):
+        device = PtyDevice(rate_hz=rate_hz, frame_format=frame_format)
+        devices.append(device)
+        return device
+
+    yield start
+    for device in devices:
+        device.stop()
+
+@pytest.fixture(scope='session')
+def server_app():
+    import flask_server
+
+    app = flask_server.create_server(is_dev=True)
+    flask_server.socketio.init_app(app, async_mode='threading')
+    flask_server.LOOP_BRIDGE.start('threading', flask_server.socketio.start_background_task)
+    return app
+
+@pytest.fixture
+def server(server_app):
+    import flask_server
+
+    yield flask_server
+    flask_server.SERVER_ADMIN_TOKEN = None
+    flask_server.GLOBAL_WIDGETS = list(flask_server.AVAILABLE_WIDGETS)
+    flask_server.GLOBAL_RATE_LIMITS = None
+    flask_server.USER_WIDGET_CONFIG.clear()
+    flask_server.USER_RATE_LIMITS.clear()
+    flask_server.LATEST_FRAME = None
+
+@pytest.fixture
+def connect(server, server_app):
+    clients = []
+
+    def start(**auth):
+        client = server.socketio.test_client(server_app, auth=auth or None)
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        if client.is_connected():
+            client.disconnect()
+
+def received(client, event):
+    return [packet['args'][0] if packet['args'] else None for packet in client.get_received() if packet['name'] == event]
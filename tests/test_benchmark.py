@@ -0,0 +1,19 @@
+import json
+from benchmark import BASELINE_PATH, PARAM_KEYS, find_param_mismatches, main
+
+def test_run_defaults_match_baseline(monkeypatch, tmp_path):
+    import benchmark
+    captured = {}
+    monkeypatch.setattr(benchmark, 'run_benchmark', lambda args: captured.update(vars(args)))
+    monkeypatch.setattr('sys.argv', ['benchmark.py', 'run'])
+    main()
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    candidate = {'cpu_count': baseline['cpu_count'], 'params': {key: captured[key] for key in PARAM_KEYS}}
+    candidate['params']['client_procs'] = baseline['params']['client_procs']
+    assert find_param_mismatches(baseline, candidate) == []
+
+def test_mismatched_params_are_reported():
+    baseline = {'cpu_count': 1, 'scenarios': [{'clients': 20, 'rate_hz': 100.0, 'format': 'json', 'duration_s': 8.0}]}
+    candidate = {'cpu_count': 4, 'params': {'clients': 50, 'rate': 100.0, 'format': 'json', 'duration': 10.0}}
+    assert find_param_mismatches(baseline, candidate) == [('clients', 20, 50), ('cpu_count', 1, 4), ('duration', 8.0, 10.0)]
@@ -0,0 +1,80 @@
+import pytest
+from binary_frames import (
+    FORMAT_AUTO, FORMAT_BINARY, FORMAT_JSON, FrameError, TELEMETRY_SCHEMA_V1,
+    cobs_decode, cobs_encode, decode_frame, decode_frames, detect_format, encode_frame
+)
+from pty_device import encode_sample, make_sample
+from serial_link import REDETECT_ERRORS, SerialLink
+
+def stream(frame_format, count, start=0):
+    return b''.join(encode_sample(make_sample(i, i * 10), frame_format) for i in range(start, start + count))
+
+def assert_sample(decoded, expected):
+    assert decoded.keys() == expected.keys()
+    for name in TELEMETRY_SCHEMA_V1.names:
+        assert decoded[name] == pytest.approx(expected[name], abs=1e-3)
+
+@pytest.mark.parametrize('payload', [
+    b'', b'\x00', b'\x00\x00', b'abc', b'a\x00b\x00', bytes(range(1, 255)),
+    bytes(range(1, 256)), bytes(600), bytes(i % 256 for i in range(1000))
+])
+def test_cobs_round_trip(payload):
+    encoded = cobs_encode(payload)
+    assert b'\x00' not in encoded
+    assert cobs_decode(encoded) == payload
+
+def test_cobs_rejects_truncated_block():
+    with pytest.raises(FrameError):
+        cobs_decode(b'\x05ab')
+    with pytest.raises(FrameError):
+        cobs_decode(b'\x00')
+
+def test_binary_frame_round_trip():
+    sample = make_sample(123, 45678)
+    frame = encode_frame(sample)
+    assert frame.endswith(b'\x00')
+    assert_sample(decode_frame(frame[:-1]), sample)
+
+def test_decode_frames_batches_and_counts_errors():
+    samples = [make_sample(i, i * 10) for i in range(8)]
+    frames = [encode_frame(s)[:-1] for s in samples]
+    corrupt = bytearray(frames[3])
+    corrupt[5] ^= 0xFF
+    decoded, errors = decode_frames(frames[:3] + [bytes(corrupt)] + frames[4:])
+    assert errors == 1
+    assert len(decoded) == 7
+    for got, expected in zip(decoded, samples[:3] + samples[4:]):
+        assert_sample(got, expected)
+
+@pytest.mark.parametrize('frame_format', [FORMAT_JSON, FORMAT_BINARY])
+def test_detect_format(frame_format):
+    assert detect_format(stream(frame_format, 10)) == frame_format
+
+@pytest.mark.parametrize('frame_format', [FORMAT_JSON, FORMAT_BINARY])
+def test_detect_format_waits_for_complete_frames(frame_format):
+    data = stream(frame_format, 3)
+    assert detect_format(data[7:]) is None
+    assert detect_format(b'') is None
+
+def test_detect_format_prefers_binary_with_json_like_bytes():
+    # time = 0x7B0A codifica "\n{" no inicio de cada frame COBS
+    data = b''.join(encode_frame(make_sample(i, 0x7B0A)) for i in range(6))
+    assert b'\n{' in data
+    assert detect_format(data) == FORMAT_BINARY
+
+def test_link_redetects_format_after_decode_failures():
+    link = SerialLink(None)
+    for _ in range(REDETECT_ERRORS - 1):
+        link.report_decode(0, 1)
+    link.report_decode(3, 0)
+    assert link.get_stats()['redetections'] == 0
+    for _ in range(REDETECT_ERRORS):
+        link.report_decode(0, 1)
+    assert link.get_stats()['redetections'] == 1
+    assert link._pending_format == FORMAT_AUTO
+
+def test_link_keeps_forced_format():
+    link = SerialLink(None, frame_format=FORMAT_JSON)
+    for _ in range(REDETECT_ERRORS * 2):
+        link.report_decode(0, 1)
+    assert link.get_stats()['redetections'] == 0
@@ -0,0 +1,50 @@
+from conftest import received
+from client_outbox import ClientOutbox
+from pty_device import make_sample
+
+class FakeQueue:
+    def __init__(self):
+        self.size = 0
+
+    def qsize(self):
+        return self.size
+
+class FakeSocket:
+    def __init__(self):
+        self.queue = FakeQueue()
+
+def test_outbox_keeps_only_latest_item():
+    socket = FakeSocket()
+    outbox = ClientOutbox('sid', socket, max_pending=4)
+    assert not outbox.congested()
+    socket.queue.size = 4
+    assert outbox.congested()
+
+    outbox.hold('a')
+    outbox.hold('b')
+    assert outbox.get_stats()['coalesced'] == 1
+    assert outbox.get_lag(outbox.last_delivery + 0.5) == 0.5
+    assert outbox.take() == 'b'
+    assert outbox.take() is None
+    assert outbox.get_lag() == 0.0
+
+def test_slow_viewer_gets_latest_frame_after_congestion(server, connect):
+    slow = connect(id='slow')
+    fast = connect(id='fast')
+    sid = next(sid for sid, info in server.CLIENT_REGISTRY.items() if info['id'] == 'slow')
+    outbox = server.get_client_outboxes()[sid]
+    outbox.eio_socket = FakeSocket()
+    outbox.eio_socket.queue.size = outbox.max_pending
+    slow.get_received()
+    fast.get_received()
+
+    for i in range(5):
+        server.fan_out_telemetry(server.EncodedFrame(make_sample(i, 1000 + i * 10)))
+    assert len(received(fast, 'data_update')) == 5
+    assert received(slow, 'data_update') == []
+    assert outbox.get_stats()['held'] == 5
+
+    outbox.eio_socket.queue.size = 0
+    server.flush_outbox(outbox)
+    assert [u['time'] for u in received(slow, 'data_update')] == [1040]
+    assert outbox.pending is None
@@ -0,0 +1,72 @@
+import threading
+from client_registry import ClientRegistry
+from conftest import received
+
+def test_registry_indexes_follow_membership():
+    registry = ClientRegistry()
+    registry.add('a', {'id': 'ground', 'type': 'Viewer'})
+    registry.add('b', {'id': 'ground', 'type': 'Admin'})
+    registry.set_group('a', 'widgets:global')
+    assert sorted(registry.sids_for_id('ground')) == ['a', 'b']
+    assert registry.sids_in_group('widgets:global') == ['a']
+
+    assert registry.update('a', rtt_ms=12.5)['rtt_ms'] == 12.5
+    assert registry.update('missing', rtt_ms=1.0) is None
+
+    registry.remove('a')
+    assert registry.sids_for_id('ground') == ['b']
+    assert registry.sids_in_group('widgets:global') == []
+    assert registry.get_stats() == {'clients': 1, 'ids': 1, 'types': {'Admin': 1}, 'groups': {}}
+
+def test_registry_survives_concurrent_churn():
+    registry = ClientRegistry()
+    errors = []
+    stop = threading.Event()
+
+    def churn(prefix):
+        try:
+            for i in range(2000):
+                sid = f'{prefix}{i % 50}'
+                registry.add(sid, {'id': sid, 'type': 'Viewer'})
+                registry.set_group(sid, f'group{i % 3}')
+                registry.update(sid, rtt_ms=float(i))
+                registry.remove(sid)
+        except Exception as e:
+            errors.append(e)
+
+    def read():
+        try:
+            while not stop.is_set():
+                registry.items()
+                registry.get_stats()
+        except Exception as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    workers = [threading.Thread(target=churn, args=(p,)) for p in 'xy']
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stop.set()
+    reader.join()
+    assert errors == []
+    assert len(registry) == 0
+
+def test_disconnect_clears_admin_session_and_outbox(server, connect):
+    admin = connect(id='ops', admin_secret='s3cret')
+    assert received(admin, 'admin_auth_success') == [None]
+    sid = next(sid for sid, info in server.CLIENT_REGISTRY.items() if info['id'] == 'ops')
+    assert sid in server.ADMIN_SESSIONS
+    assert sid in server.get_client_outboxes()
+
+    admin.emit('update_client_rate_limits', {'client_id': 'viewer', 'limits': {'max_rate': 5}})
+    admin.emit('update_client_widgets', {'client_id': 'viewer', 'widgets': ['AltitudeWidget']})
+    state = server.get_shared_state()
+    assert state['user_rate_limits']['viewer'] is not None
+    assert state['user_widgets'] == {'viewer': ['AltitudeWidget']}
+
+    admin.disconnect()
+    assert sid not in server.ADMIN_SESSIONS
+    assert sid not in server.get_client_outboxes()
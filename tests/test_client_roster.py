@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+from conftest import received
+from client_roster import ClientRoster
+from headless import HeadlessSupervisor
+
+def entry(sid, **extra):
+    return dict({'sid': sid, 'id': sid, 'type': 'Viewer'}, **extra)
+
+def test_collect_emits_versioned_deltas():
+    roster = ClientRoster()
+    clients = {'a': entry('a'), 'b': entry('b')}
+    roster.mark('a', 'b')
+    delta = roster.collect(clients.get)
+    assert delta['version'] == 1 and len(delta['added']) == 2
+
+    roster.mark('a')
+    assert roster.collect(clients.get) is None
+
+    clients['a'] = entry('a', rtt_ms=10.0)
+    del clients['b']
+    roster.mark_all(['a'])
+    delta = roster.collect(clients.get)
+    assert delta == {'version': 2, 'added': [], 'changed': [clients['a']], 'removed': ['b']}
+    assert roster.snapshot() == {'version': 2, 'clients': [clients['a']]}
+
+def test_remote_entries_merge_into_snapshot():
+    roster = ClientRoster()
+    roster.mark('a')
+    roster.collect({'a': entry('a')}.get)
+
+    delta = roster.apply_remote(1, added=[entry('x')])
+    assert delta['version'] == 2 and delta['added'] == [entry('x', worker=1)]
+    assert roster.apply_remote(1, changed=[entry('x')]) is None
+    delta = roster.apply_remote(1, changed=[entry('y')])
+    assert delta['added'] == [entry('y', worker=1)] and delta['changed'] == []
+
+    roster.mark_all([])
+    assert roster.collect({}.get)['removed'] == ['a']
+    assert {c['sid'] for c in roster.snapshot()['clients']} == {'x', 'y'}
+    assert roster.count_by_worker(0) == {0: 0, 1: 2}
+
+    assert sorted(roster.drop_remote(1)['removed']) == ['x', 'y']
+    assert roster.snapshot()['clients'] == []
+
+def test_admin_receives_roster_snapshot_and_deltas(server, connect):
+    admin = connect(id='ops', admin_secret='s3cret')
+    [snapshot] = received(admin, 'clients_snapshot')
+    server.publish_client_roster()
+    [delta] = received(admin, 'clients_delta')
+    assert delta['version'] == snapshot['version'] + 1
+    assert [entry['id'] for entry in delta['added']] == ['ops']
+    version = delta['version']
+
+    viewer = connect(id='viewer')
+    server.publish_client_roster()
+    [delta] = received(admin, 'clients_delta')
+    assert delta['version'] == version + 1
+    assert [entry['id'] for entry in delta['added']] == ['viewer']
+    sid = delta['added'][0]['sid']
+
+    viewer.disconnect()
+    server.publish_client_roster()
+    [delta] = received(admin, 'clients_delta')
+    assert delta['version'] == version + 2 and delta['removed'] == [sid]
+
+    admin.emit('clients_resync')
+    [snapshot] = received(admin, 'clients_snapshot')
+    assert snapshot['version'] == version + 2
+    assert [entry['id'] for entry in snapshot['clients']] == ['ops']
+
+def test_supervisor_forwards_roster_between_workers():
+    pipeline = SimpleNamespace(remove_sink=lambda name: None, add_sink=lambda *args, **kwargs: None)
+    reader = SimpleNamespace(pipeline=pipeline, discovery=SimpleNamespace())
+    supervisor = HeadlessSupervisor(reader, workers=2)
+    try:
+        sent = {0: [], 1: []}
+        for worker in supervisor.workers:
+            worker.send = lambda event, payload=None, i=worker.index: sent[i].append((event, payload))
+        delta = {'version': 3, 'added': [entry('x')], 'changed': [], 'removed': []}
+        supervisor._handle(supervisor.workers[0], 'roster', None, (delta,))
+        assert sent == {0: [], 1: [('roster', (0, {'added': [entry('x')], 'changed': [], 'removed': []}))]}
+        assert supervisor.rosters == {0: {'x': entry('x')}}
+    finally:
+        supervisor.bus.close()
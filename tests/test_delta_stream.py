@@ -0,0 +1,43 @@
+from conftest import received
+from delta_stream import DeltaEncoder
+from pty_device import make_sample
+
+def test_deltas_carry_only_changed_fields():
+    encoder = DeltaEncoder(keyframe_interval=100, keyframe_seconds=60.0)
+    first = encoder.encode({'time': 0, 'pressure': 1013.25, 'status': 'ok'})
+    assert first['key'] and first['data'] == {'time': 0, 'pressure': 1013.25, 'status': 'ok'}
+
+    delta = encoder.encode({'time': 10, 'pressure': 1013.2504, 'status': 'ok'})
+    assert delta == {'stream': encoder.stream_id, 'seq': 2, 'key': False, 'data': {'time': 10}}
+    assert encoder.encode({'time': 10, 'pressure': 1013.2504, 'status': 'ok'}) is None
+
+    delta = encoder.encode({'time': 20, 'pressure': 1013.3, 'status': 'ok'})
+    assert delta['data'] == {'time': 20, 'pressure': 1013.3}
+    assert encoder.snapshot()['data'] == {'time': 20, 'pressure': 1013.3, 'status': 'ok'}
+
+def test_keyframes_are_periodic():
+    encoder = DeltaEncoder(keyframe_interval=3, keyframe_seconds=60.0)
+    frames = [encoder.encode({'time': i}) for i in range(8)]
+    assert [f['key'] for f in frames] == [True, False, False, False, True, False, False, False]
+    assert [f['seq'] for f in frames] == list(range(1, 9))
+
+def test_delta_clients_get_keyframe_deltas_and_snapshots(server, connect):
+    full = connect(id='full')
+    delta_client = connect(id='delta', stream='delta')
+    server.fan_out_telemetry(server.EncodedFrame(make_sample(0, 1000)))
+    [keyframe] = received(delta_client, 'data_delta')
+    assert keyframe['key'] and keyframe['data']['time'] == 1000
+
+    server.fan_out_telemetry(server.EncodedFrame(dict(make_sample(0, 1000), time=1010)))
+    [update] = received(delta_client, 'data_delta')
+    assert not update['key'] and update['seq'] == keyframe['seq'] + 1
+    assert update['data'] == {'time': 1010}
+    assert [u['time'] for u in received(full, 'data_update')] == [1000, 1010]
+
+    late = connect(id='late', stream='delta')
+    [snapshot] = received(late, 'data_delta')
+    assert snapshot['key'] and snapshot['seq'] == update['seq'] and snapshot['data']['time'] == 1010
+
+    delta_client.emit('delta_resync')
+    [resync] = received(delta_client, 'data_delta')
+    assert resync == snapshot
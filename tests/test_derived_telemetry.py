@@ -0,0 +1,77 @@
+import pytest
+from derived_telemetry import DerivedTelemetry, PHASE_COAST, PHASE_DESCENT, PHASE_GROUND, PHASE_POWERED, haversine
+
+def flight(start_ms=0, step_ms=50, duration_ms=30000):
+    samples = []
+    for t_ms in range(start_ms, start_ms + duration_ms, step_ms):
+        t = (t_ms - start_ms) / 1000.0
+        if t < 1.0:
+            altitude = 0.0
+        elif t < 4.0:
+            altitude = 0.5 * 60.0 * (t - 1.0) ** 2
+        else:
+            burn_v = 180.0
+            coast = t - 4.0
+            altitude = 270.0 + burn_v * coast - 0.5 * 9.81 * coast ** 2
+        samples.append({'time': t_ms, 'bmp_altitude': altitude, 'voltage': 4.2 - t / 600.0, 'latitude': -23.55, 'longitude': -46.63 + t * 1e-5})
+    return samples
+
+def test_flight_phases_and_apogee():
+    derived = DerivedTelemetry()
+    samples = derived.process(flight())
+    phases = [s['flight_phase'] for s in samples]
+    assert phases[0] == PHASE_GROUND
+    assert phases.index(PHASE_POWERED) < phases.index(PHASE_COAST) < phases.index(PHASE_DESCENT)
+    stats = derived.get_stats()
+    assert stats['phase'] == PHASE_DESCENT
+    assert stats['apogee_altitude'] == pytest.approx(270.0 + 180.0 ** 2 / (2 * 9.81), rel=0.02)
+    assert stats['apogee_time'] == pytest.approx(4000 + 180.0 / 9.81 * 1000, abs=500)
+    assert stats['burnout_time'] == pytest.approx(4000, abs=1000)
+    assert samples[-1]['battery_rate'] == pytest.approx(-0.1, abs=0.01)
+    assert samples[-1]['track_distance'] == pytest.approx(samples[-1]['ground_range'], rel=1e-3)
+
+def test_late_sample_keeps_flight_state():
+    derived = DerivedTelemetry()
+    samples = flight()
+    derived.process(samples[:500])
+    before = derived.get_stats()
+    assert before['phase'] == PHASE_DESCENT
+
+    late = dict(samples[480])
+    for key in list(late):
+        if key not in ('time', 'bmp_altitude', 'voltage', 'latitude', 'longitude'):
+            del late[key]
+    derived.process([late])
+    assert 'flight_phase' not in late
+    after = derived.process(samples[500:510])
+    stats = derived.get_stats()
+    assert stats['resets'] == 0 and stats['stale'] == 1
+    assert stats['apogee_altitude'] == before['apogee_altitude']
+    assert stats['burnout_time'] == before['burnout_time']
+    assert {s['flight_phase'] for s in after} == {PHASE_DESCENT}
+
+def test_blackout_keeps_flight_state():
+    derived = DerivedTelemetry()
+    samples = flight(duration_ms=40000)
+    derived.process(samples[:480])
+    apogee = derived.get_stats()['apogee_altitude']
+    assert apogee is not None
+    after = derived.process(samples[600:])
+    stats = derived.get_stats()
+    assert stats['resets'] == 0
+    assert stats['apogee_altitude'] == apogee
+    assert after[-1]['flight_phase'] == PHASE_DESCENT
+
+def test_board_restart_resets_state():
+    derived = DerivedTelemetry()
+    derived.process(flight(start_ms=60000))
+    assert derived.get_stats()['phase'] == PHASE_DESCENT
+    samples = derived.process(flight(duration_ms=500))
+    stats = derived.get_stats()
+    assert stats['resets'] == 1
+    assert stats['phase'] == PHASE_GROUND
+    assert stats['apogee_altitude'] is None
+    assert samples[0]['flight_phase'] == PHASE_GROUND
+
+def test_haversine():
+    assert haversine(0.0, 0.0, 0.0, 1.0) == pytest.approx(111195, rel=1e-3)
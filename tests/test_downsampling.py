@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from downsampling import DecimationTiers, lttb_indices, minmax_reduce
+from pty_device import make_sample
+from telemetry_history import TelemetryRing
+
+FIELDS = ['time', 'status', 'pressure', 'bmp_altitude', 'voltage']
+
+def fill(ring, count, start=1000.0, step=0.01, gaps=None):
+    for i in range(count):
+        sample = make_sample(i, i * 10)
+        if gaps is not None:
+            sample.update({name: None for name in gaps(i)})
+        ring.append(sample, start + i * step)
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    y[812] = -20.0
+    selected = lttb_indices(x, y, 20)
+    assert len(selected) == 20
+    assert selected[0] == 0 and selected[-1] == 999
+    assert 437 in selected and 812 in selected
+    assert list(selected) == sorted(selected)
+
+def test_lttb_returns_everything_under_threshold():
+    assert list(lttb_indices(np.arange(5.0), np.arange(5.0), 10)) == [0, 1, 2, 3, 4]
+
+def test_minmax_reduce_bins():
+    t = np.arange(8, dtype=np.float64)
+    values = np.array([[1.0], [5.0], [2.0], [np.nan], [7.0], [3.0], [0.0], [4.0]])
+    t, vmin, vmax, mean = minmax_reduce(t, values, values, values, 2)
+    assert list(t) == [0.0, 4.0]
+    assert vmin[:, 0].tolist() == [1.0, 0.0]
+    assert vmax[:, 0].tolist() == [5.0, 7.0]
+    assert mean[:, 0].tolist() == pytest.approx([8.0 / 3, 3.5])
+
+def test_tiers_cascade_complete_groups():
+    tiers = DecimationTiers(1, factors=(10, 100))
+    for block in range(25):
+        times = np.arange(block * 10, block * 10 + 10, dtype=np.float64)
+        tiers.add_block(times, times.reshape(-1, 1))
+    x10, x100 = tiers.tiers
+    assert x10.count == 25 and x100.count == 2
+    t, vmin, vmax, mean, t_last = x100.select(-np.inf, 0)
+    assert vmin.tolist() == [0.0, 100.0]
+    assert vmax.tolist() == [99.0, 199.0]
+    assert mean.tolist() == [49.5, 149.5]
+    assert t_last == 199.0
+
+def test_lttb_uses_requested_key():
+    ring = TelemetryRing(capacity=4096, fields=FIELDS)
+    fill(ring, 3000)
+    result = ring.query(seconds=None, max_points=100, key='bmp_altitude')
+    assert result['key'] == 'bmp_altitude'
+    assert result['count'] == 100
+    assert result['tier'] == 'x10'
+    assert result['t'][0] == pytest.approx(1000.045)
+    assert result['t'][-1] == pytest.approx(1029.945)
+
+def test_lttb_default_key_skips_index_and_empty_fields():
+    ring = TelemetryRing(capacity=4096, fields=FIELDS)
+    fill(ring, 2000, gaps=lambda i: ('pressure',))
+    result = ring.query(seconds=None, max_points=50)
+    assert result['key'] == 'bmp_altitude'
+    assert result['values']['pressure'] == [None] * 50
+
+def test_lttb_interpolates_over_gaps():
+    ring = TelemetryRing(capacity=4096, fields=FIELDS)
+    fill(ring, 2000, gaps=lambda i: ('bmp_altitude',) if 500 <= i < 1500 else ())
+    result = ring.query(seconds=None, max_points=50, key='bmp_altitude')
+    assert result['count'] == 50
+    finite = [v for v in result['values']['bmp_altitude'] if v is not None]
+    assert len(finite) > 10
+
+def test_minmax_mean_ignores_gaps():
+    ring = TelemetryRing(capacity=4096, fields=['time', 'voltage'])
+    for i in range(1000):
+        ring.append({'time': i, 'voltage': None if i % 2 else 4.0 + (i % 4) / 10}, 1000.0 + i * 0.01)
+    result = ring.query(seconds=None, max_points=20, mode='minmax')
+    assert result['count'] == 10
+    assert result['values']['voltage'] == [pytest.approx(4.1)] * 10
+    assert result['min']['voltage'] == [4.0] * 10
+    assert result['max']['voltage'] == [pytest.approx(4.2)] * 10
+
+def test_long_windows_use_decimated_tiers():
+    ring = TelemetryRing(capacity=1000, fields=FIELDS, tier_factors=(10, 100))
+    fill(ring, 20000)
+    wide = ring.query(seconds=150.0, max_points=400, mode='minmax')
+    assert wide['tier'] == 'x10'
+    assert wide['t'][0] <= 1200.0 - 150.0 + 1.0
+    assert ring.query(seconds=150.0, max_points=100)['tier'] == 'x100'
+    assert ring.query(seconds=1.0, max_points=200)['tier'] == 'raw'
+    stats = ring.get_stats()
+    assert stats['count'] == 1000 and stats['total'] == 20000
+    assert [t['buckets'] for t in stats['tiers']] == [2000, 200]
+
@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+from flight_recorder import FIRST_SEGMENT_CAPACITY, FlightRecorder, Recording
+from pty_device import make_sample
+
+def test_recording_round_trip_with_growing_segments(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), segment_capacity=FIRST_SEGMENT_CAPACITY * 4, flush_interval=0)
+    total = FIRST_SEGMENT_CAPACITY * 10
+    for i in range(total):
+        recorder.append(make_sample(i, 1000 + i * 10), recv_time=100.0 + i * 0.001)
+    session = recorder.session_dir
+    recorder.close()
+
+    recording = Recording(session)
+    try:
+        assert len(recording) == total
+        assert [seg.header['capacity'] for seg in recording.segments] == [
+            FIRST_SEGMENT_CAPACITY, FIRST_SEGMENT_CAPACITY * 2, FIRST_SEGMENT_CAPACITY * 4, FIRST_SEGMENT_CAPACITY * 4
+        ]
+        columns = recording.read(0, total, ['seq', 'time'])
+        assert np.array_equal(columns['seq'], np.arange(total))
+        assert columns['time'][-1] == 1000 + (total - 1) * 10
+        assert all(seg.index['closed'] for seg in recording.segments)
+    finally:
+        recording.close()
+
+def test_first_segment_is_small(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), flush_interval=0)
+    recorder.append(make_sample(0, 1000))
+    assert recorder.get_stats()['segment_capacity'] == FIRST_SEGMENT_CAPACITY
+    size = os.path.getsize(recorder.writer.path)
+    recorder.close()
+    assert size < 2 * 1024 * 1024
+
+def test_disabled_recorder_writes_nothing(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), flush_interval=0, enabled=False)
+    recorder.append(make_sample(0, 1000))
+    recorder.close()
+    assert recorder.samples_written == 0
+    assert os.listdir(tmp_path) == []
+
+def test_recording_is_on_by_default(monkeypatch):
+    import main
+    monkeypatch.delenv('SPARK_RECORD', raising=False)
+    monkeypatch.setattr(sys, 'argv', ['main.py'])
+    assert main.parse_args().record
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--no-record'])
+    assert not main.parse_args().record
+    monkeypatch.setenv('SPARK_RECORD', '0')
+    monkeypatch.setattr(sys, 'argv', ['main.py'])
+    assert not main.parse_args().record
@@ -0,0 +1,64 @@
+import json
+import time
+import pytest
+import serial
+from conftest import wait_until
+from binary_frames import FORMAT_AUTO, FORMAT_BINARY, FORMAT_JSON, TELEMETRY_SCHEMA_V1, decode_frames
+from frame_reader import FrameReader
+from pty_device import encode_sample, make_sample
+from serial_link import SerialLink
+
+def stream(frame_format, count, start=0):
+    return b''.join(encode_sample(make_sample(i, i * 10), frame_format) for i in range(start, start + count))
+
+
+def test_frame_reader_keeps_partial_frames():
+    reader = FrameReader(None, frame_format=FORMAT_JSON)
+    data = stream(FORMAT_JSON, 2)
+    assert len(reader.feed(data[:-5])) == 1
+    assert len(reader.feed(data[-5:])) == 1
+    reader.reset()
+    assert reader.get_stats()['partial_frames'] == 0
+    reader.feed(data[:5])
+    reader.reset()
+    stats = reader.get_stats()
+    assert stats['partial_frames'] == 1
+    assert stats['discarded_bytes'] == 5
+    assert stats['buffered_bytes'] == 0
+
+@pytest.mark.parametrize('frame_format', [FORMAT_JSON, FORMAT_BINARY])
+def test_frame_reader_over_pty(pty_device, frame_format):
+    device = pty_device(frame_format)
+    conn = serial.Serial(device.port, 115200, timeout=0.1)
+    reader = FrameReader(conn, frame_format=FORMAT_AUTO)
+    device.start()
+    frames = []
+    try:
+        deadline = time.monotonic() + 5.0
+        while len(frames) < 50 and time.monotonic() < deadline:
+            frames.extend(reader.read_frames())
+    finally:
+        conn.close()
+
+    assert reader.format == frame_format
+    assert len(frames) >= 50
+    if frame_format == FORMAT_BINARY:
+        samples, errors = decode_frames(frames[1:])
+    else:
+        samples, errors = [json.loads(f) for f in frames[1:]], 0
+    assert errors == 0
+    times = [s['time'] for s in samples]
+    assert times == sorted(times)
+    assert set(samples[0]) == set(TELEMETRY_SCHEMA_V1.names)
+
+def test_serial_link_delivers_from_pty(pty_device):
+    device = pty_device(FORMAT_BINARY)
+    delivered = []
+    link = SerialLink(lambda port, fmt, frames, read_at: delivered.append((port, fmt, len(frames))))
+    device.start()
+    try:
+        assert wait_until(lambda: link.step(device.port) or sum(n for _, _, n in delivered) >= 20, interval=0)
+    finally:
+        link.close()
+    assert {(port, fmt) for port, fmt, _ in delivered} == {(device.port, FORMAT_BINARY)}
+    assert link.get_stats()['connections'] == 1
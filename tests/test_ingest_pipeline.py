@@ -0,0 +1,50 @@
+from conftest import wait_until
+from ingest_pipeline import DROP_OLDEST, LATEST_WINS, IngestPipeline, StageQueue
+
+def drain(queue):
+    items = []
+    while len(queue):
+        items.append(queue.get(0)[0])
+    return items
+
+def test_latest_wins_keeps_only_newest():
+    queue = StageQueue('broadcast', 256, LATEST_WINS)
+    for i in range(5):
+        queue.put(i)
+    assert drain(queue) == [4]
+    stats = queue.get_stats()
+    assert stats['capacity'] == 1
+    assert stats['dropped'] == 4
+
+def test_drop_oldest_keeps_capacity_newest():
+    queue = StageQueue('record', 3, DROP_OLDEST)
+    for i in range(5):
+        queue.put(i)
+    assert drain(queue) == [2, 3, 4]
+    assert queue.get_stats()['dropped'] == 2
+
+def test_pipeline_fans_out_decoded_samples():
+    broadcast, recorded, history = [], [], []
+    pipeline = IngestPipeline(
+        decode=lambda batch: [{'time': t} for t in batch],
+        broadcast=lambda data, origin: broadcast.append(data['time']),
+        record=lambda data, origin: recorded.append(data['time'])
+    )
+    pipeline.add_sink('history', lambda data: history.append(data['time']))
+    pipeline.start()
+    try:
+        pipeline.submit_raw([1, 2, 3])
+        assert wait_until(lambda: len(recorded) == 3 and len(history) == 3)
+        pipeline.submit_decoded({'time': 4}, record=False)
+        assert wait_until(lambda: history[-1:] == [4])
+        assert pipeline.remove_sink('history')
+        assert not pipeline.remove_sink('history')
+        pipeline.submit_raw([5])
+        assert wait_until(lambda: recorded[-1:] == [5])
+    finally:
+        pipeline.stop()
+
+    assert recorded == [1, 2, 3, 5]
+    assert history == [1, 2, 3, 4]
+    assert broadcast[-1] == 5
+    assert set(pipeline.get_stats()) == {'decode', 'broadcast', 'record'}
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+import serial.tools.list_ports
+from port_discovery import STATUS_AVAILABLE, STATUS_BUSY, STATUS_WITH_DATA, PortDiscovery
+
+@pytest.fixture
+def discovery(monkeypatch):
+    ports = [SimpleNamespace(device='/dev/ttyUSB0', description='usb', vid=None, pid=None, serial_number=None, hwid='h0')]
+    monkeypatch.setattr(serial.tools.list_ports, 'comports', lambda: ports)
+    d = PortDiscovery(ttl=10.0, deadline=1.0)
+    d._pool = ThreadPoolExecutor(max_workers=2)
+    yield d
+    d._pool.shutdown(wait=True)
+
+def expire(discovery):
+    for entry in discovery.ports.values():
+        entry['probed_at'] -= discovery.ttl + 1
+
+def test_every_port_is_reprobed_after_ttl(discovery, monkeypatch):
+    results = iter([(STATUS_AVAILABLE, False), (STATUS_WITH_DATA, True)])
+    monkeypatch.setattr(discovery, '_probe', lambda device: next(results))
+    discovery.scan()
+    assert discovery.get_ports()[0]['status'] == STATUS_AVAILABLE
+    discovery.scan()
+    assert discovery.get_ports()[0]['status'] == STATUS_AVAILABLE
+
+    expire(discovery)
+    discovery.scan()
+    assert discovery.get_ports()[0]['status'] == STATUS_WITH_DATA
+
+def test_probe_exception_does_not_leave_port_pending(discovery, monkeypatch):
+    def fail(device):
+        raise RuntimeError('driver crashed')
+
+    monkeypatch.setattr(discovery, '_probe', fail)
+    discovery.scan()
+    assert discovery.get_ports()[0]['status'] == STATUS_BUSY
+    assert discovery.get_stats()['pending'] == 0
+
+    monkeypatch.setattr(discovery, '_probe', lambda device: (STATUS_AVAILABLE, False))
+    expire(discovery)
+    discovery.scan()
+    assert discovery.get_ports()[0]['status'] == STATUS_AVAILABLE
+
+def test_submit_failure_clears_pending(discovery):
+    discovery._pool.shutdown()
+    with pytest.raises(RuntimeError):
+        discovery.scan()
+    assert discovery.get_stats()['pending'] == 0
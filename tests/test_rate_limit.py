@@ -0,0 +1,81 @@
+import pytest
+from conftest import received
+from pty_device import make_sample
+from rate_limit import AGG_LAST, AGG_MAX, AGG_MEAN, MAX_RATE_HZ, WindowCoalescer, build_rate_plan, merge_rate_limits, normalize_rate_limits
+
+LAST_FIELDS = ('time', 'status')
+
+def feed(coalescer, count, per_second=10):
+    out = []
+    for i in range(count):
+        sample = make_sample(i, i * 100)
+        sample['alt'] = float(i)
+        result = coalescer.push({k: sample[k] for k in ('time', 'status', 'alt')}, i / per_second)
+        if result is not None:
+            out.append(result)
+    return out
+
+def test_mean_windows_are_aligned():
+    coalescer = WindowCoalescer((1.0, (), AGG_MEAN), LAST_FIELDS)
+    out = feed(coalescer, 31)
+    assert [o['alt'] for o in out] == [4.5, 14.5, 24.5]
+    assert [o['time'] for o in out] == [900, 1900, 2900]
+    assert coalescer.get_stats() == {'frames_in': 31, 'frames_out': 3}
+
+def test_aggregation_does_not_emit_raw_first_sample():
+    coalescer = WindowCoalescer((1.0, (), AGG_MAX), LAST_FIELDS)
+    assert coalescer.push({'time': 0, 'alt': 100.0}, 0.0) is None
+    assert coalescer.push({'time': 100, 'alt': 5.0}, 0.5) is None
+    assert coalescer.push({'time': 1000, 'alt': 1.0}, 1.0) == {'time': 100, 'alt': 100.0}
+
+def test_last_emits_first_sample_of_each_window():
+    coalescer = WindowCoalescer((1.0, (), AGG_LAST), LAST_FIELDS)
+    out = feed(coalescer, 25)
+    assert [o['alt'] for o in out] == [0.0, 10.0, 20.0]
+    assert [o['time'] for o in out] == [0, 1000, 2000]
+
+def test_unlimited_field_emits_immediately():
+    coalescer = WindowCoalescer((1.0, (('voltage', 0.0),), AGG_MEAN), LAST_FIELDS)
+    out = coalescer.push({'time': 0, 'alt': 1.0, 'voltage': 4.2}, 0.0)
+    assert out == {'time': 0, 'voltage': 4.2}
+    out = coalescer.push({'time': 100, 'alt': 3.0, 'voltage': 4.1}, 0.1)
+    assert out == {'time': 100, 'voltage': 4.1}
+    out = coalescer.push({'time': 1000, 'alt': 5.0, 'voltage': 4.0}, 1.0)
+    assert out == {'time': 1000, 'alt': 2.0, 'voltage': 4.0}
+
+def test_rate_plan_uses_fastest_widget_per_field():
+    limits = normalize_rate_limits({'max_rate': 20, 'widget_rates': {'MapWidget': 2, 'AltitudeChartWidget': 10}})
+    widget_fields = {'MapWidget': ('latitude', 'longitude', 'time'), 'AltitudeChartWidget': ('bmp_altitude', 'time')}
+    default_period, periods, aggregation = build_rate_plan(None, ['MapWidget', 'AltitudeChartWidget'], limits, widget_fields)
+    periods = dict(periods)
+    assert default_period == 1.0 / 20
+    assert periods['latitude'] == 0.5
+    assert periods['bmp_altitude'] == periods['time'] == 0.1
+    assert aggregation == AGG_LAST
+
+def test_normalize_rate_limits():
+    assert normalize_rate_limits(None) is None
+    assert normalize_rate_limits({'max_rate': 0}) is None
+    assert normalize_rate_limits({'max_rate': 10000})['max_rate'] == MAX_RATE_HZ
+    with pytest.raises(ValueError):
+        normalize_rate_limits({'aggregation': 'median'})
+    with pytest.raises(ValueError):
+        normalize_rate_limits({'max_rate': 'fast'})
+
+def test_merge_keeps_slowest_rates():
+    admin = normalize_rate_limits({'max_rate': 5, 'widget_rates': {'MapWidget': 1}})
+    client = normalize_rate_limits({'max_rate': 20, 'widget_rates': {'MapWidget': 0.5}, 'aggregation': AGG_MEAN})
+    merged = merge_rate_limits(admin, client)
+    assert merged['max_rate'] == 5
+    assert merged['widget_rates'] == {'MapWidget': 0.5}
+    assert merged['aggregation'] == AGG_MEAN
+
+def test_client_rate_limits_coalesce_updates(server, connect):
+    client = connect(id='slow')
+    client.emit('set_rate_limits', {'max_rate': 1})
+    client.get_received()
+    for i in range(20):
+        server.fan_out_telemetry(server.EncodedFrame(make_sample(i, i * 10)))
+    assert 1 <= len(received(client, 'data_update')) <= 2
+    client.emit('set_rate_limits', {'max_rate': 'fast'})
+    assert received(client, 'rate_limits_error')
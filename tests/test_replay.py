@@ -0,0 +1,60 @@
+import os
+import time
+import pytest
+from conftest import wait_until
+from flight_recorder import FlightRecorder
+from pty_device import make_sample
+from replay import REPLAY_PREFIX, ReplaySource, list_recordings
+
+SAMPLES = 300
+
+@pytest.fixture
+def recording(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), segment_capacity=128, flush_interval=0)
+    for i in range(SAMPLES):
+        recorder.append(make_sample(i, 1000 + i * 10), recv_time=100.0 + i * 0.001)
+    session = recorder.session_dir
+    recorder.close()
+    return str(tmp_path), os.path.basename(session)
+
+def test_replay_source_paces_and_seeks(recording):
+    base_dir, name = recording
+    assert [r['name'] for r in list_recordings(base_dir)] == [name]
+    replay = ReplaySource(os.path.join(base_dir, name), speed=0)
+    batch = replay.next_batch()
+    assert len(batch) == SAMPLES
+    assert [s['time'] for s in batch[:3]] == [1000, 1010, 1020]
+    assert replay.get_status()['finished']
+
+    replay.seek(0.1)
+    assert replay.generation == 1
+    replay.seek(0.2)
+    assert replay.generation == 1
+    assert replay.next_batch()[0]['time'] == 3000
+
+    replay.resume()
+    assert replay.generation == 2
+    assert replay.get_status()['position'] == 0
+    replay.close()
+
+def test_seek_back_replays_samples(recording):
+    from serial_reader import SerialReader
+
+    base_dir, name = recording
+    reader = SerialReader(port=REPLAY_PREFIX + name, recorder=FlightRecorder(base_dir))
+    captured = []
+    reader.pipeline.add_sink('capture', captured.append)
+    reader.start()
+    try:
+        assert wait_until(lambda: len(captured) == SAMPLES)
+        reader.control_replay('seek', 0.15)
+        assert wait_until(lambda: len(captured) == SAMPLES + 150)
+        reader.control_replay('resume')
+        assert wait_until(lambda: len(captured) == 2 * SAMPLES + 150)
+    finally:
+        reader.stop()
+
+    assert [s['time'] for s in captured[SAMPLES:SAMPLES + 2]] == [2500, 2510]
+    stats = reader.get_ingest_stats()
+    assert stats['merged']['accepted'] == 2 * SAMPLES + 150
+    assert stats['derived']['stale'] == 0
@@ -0,0 +1,79 @@
+from pty_device import make_sample
+from source_merger import RESET_GAPS, SourceMerger
+
+def samples(start, stop, step=10):
+    return [make_sample(i, i * step) for i in range(start, stop)]
+
+def times(accepted):
+    return [s['time'] for s in accepted]
+
+def test_resent_samples_are_dropped():
+    merger = SourceMerger()
+    merger.add_source('A')
+    accepted, dropped = merger.merge('A', samples(0, 10))
+    assert len(accepted) == 10 and dropped == 0
+    accepted, dropped = merger.merge('A', samples(5, 15))
+    assert times(accepted) == list(range(100, 150, 10))
+    assert dropped == 5
+    assert merger.get_stats()['sources']['A']['duplicates'] == 5
+
+def test_backup_source_duplicates_are_dropped():
+    merger = SourceMerger()
+    merger.add_source('A')
+    merger.add_source('B')
+    merger.merge('A', samples(0, 10))
+    accepted, dropped = merger.merge('B', samples(0, 12))
+    assert times(accepted) == [100, 110]
+    assert dropped == 10
+    accepted, dropped = merger.merge('A', samples(10, 13))
+    assert times(accepted) == [120]
+    stats = merger.get_stats()
+    assert stats['sources']['B']['duplicates'] == 10
+    assert stats['sources']['A']['duplicates'] == 2
+    assert stats['merged']['accepted'] == 13
+
+def test_late_samples_from_other_source_are_dropped():
+    merger = SourceMerger()
+    merger.merge('A', samples(0, 10, step=20))
+    accepted, dropped = merger.merge('B', [make_sample(0, 150)])
+    assert accepted == [] and dropped == 1
+    assert merger.get_stats()['sources'] == {}
+
+def test_out_of_order_from_same_source_is_kept():
+    merger = SourceMerger()
+    merger.merge('A', samples(0, 10, step=20))
+    accepted, _ = merger.merge('A', [make_sample(0, 150)])
+    assert times(accepted) == [150]
+
+def test_counter_reset_clears_history():
+    merger = SourceMerger()
+    merger.merge('A', samples(0, 10, step=RESET_GAPS['time']))
+    accepted, dropped = merger.merge('B', samples(0, 5))
+    assert times(accepted) == [0, 10, 20, 30, 40]
+    assert dropped == 0
+    accepted, dropped = merger.merge('A', samples(3, 6))
+    assert times(accepted) == [50]
+    assert dropped == 2
+
+def test_samples_without_key_pass_through():
+    merger = SourceMerger()
+    accepted, dropped = merger.merge('A', [{'voltage': 4.2}, {'voltage': 4.2}])
+    assert len(accepted) == 2 and dropped == 0
+
+def test_link_stats_count_gaps():
+    merger = SourceMerger()
+    merger.add_source('A')
+    kept = [s for i, s in enumerate(samples(0, 100)) if i % 10 != 5]
+    merger.merge('A', kept, now=1.0)
+    stats = merger.get_stats(now=1.5)['sources']['A']
+    assert stats['received'] == 90
+    assert stats['lost'] == 10
+    assert stats['loss_pct'] == 10.0
+    assert stats['link_quality'] == 0.9
+    assert stats['last_seen_ms'] == 500.0
+
+def test_sequence_field_takes_priority():
+    merger = SourceMerger()
+    first = [dict(make_sample(i, 1000), seq=i) for i in range(5)]
+    accepted, dropped = merger.merge('A', first)
+    assert len(accepted) == 5 and dropped == 0
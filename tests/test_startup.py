@@ -0,0 +1,29 @@
+import json
+import subprocess
+import sys
+from conftest import BACKEND_DIR
+from startup import StartupProfiler
+
+HEAVY_MODULES = ['flask', 'flask_socketio', 'numpy', 'serial', 'webview', 'flask_server', 'serial_reader']
+
+def import_in_subprocess(module):
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_main_defers_backend_imports():
+    assert import_in_subprocess('main') == []
+
+def test_window_manager_defers_webview():
+    assert import_in_subprocess('window_manager') == []
+
+def test_check_flags_phases_over_budget():
+    profiler = StartupProfiler()
+    profiler.mark('window_shown')
+    assert profiler.check('window_shown', 60000.0)
+    assert not profiler.check('window_shown', -1.0)
+    assert profiler.check('missing', 0.0)
@@ -0,0 +1,52 @@
+import gzip
+import pytest
+from flask import Flask, request
+from static_assets import IMMUTABLE_CACHE, REVALIDATE_CACHE, StaticManifest, parse_accept_encoding, precompress_dist
+
+SCRIPT = b'console.log("spark");\n' * 100
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'index.html').write_bytes(b'<html><body>SPARK</body></html>')
+    (tmp_path / 'assets' / 'index-AbCdEf12.js').write_bytes(SCRIPT)
+    assert precompress_dist(str(tmp_path)) >= 1
+    manifest = StaticManifest(str(tmp_path))
+    app = Flask(__name__)
+
+    @app.route('/', defaults={'path': 'index.html'})
+    @app.route('/<path:path>')
+    def serve(path):
+        return manifest.serve(request, path)
+
+    return app.test_client()
+
+def test_parse_accept_encoding_skips_zero_quality():
+    assert parse_accept_encoding('gzip;q=0, br, identity;q=0.5') == {'br', 'identity'}
+
+def test_hashed_assets_are_immutable_and_precompressed(client):
+    response = client.get('/assets/index-AbCdEf12.js', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Cache-Control'] == IMMUTABLE_CACHE
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.data) == SCRIPT
+
+    plain = client.get('/assets/index-AbCdEf12.js')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data == SCRIPT
+    assert plain.headers['ETag'] != response.headers['ETag']
+
+def test_index_revalidates_with_etag(client):
+    response = client.get('/')
+    assert response.headers['Cache-Control'] == REVALIDATE_CACHE
+    cached = client.get('/', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304 and cached.data == b''
+
+    fallback = client.get('/admin')
+    assert fallback.data == response.data
+
+def test_missing_dist_returns_404(tmp_path):
+    manifest = StaticManifest(str(tmp_path / 'missing'))
+    app = Flask(__name__)
+    with app.test_request_context('/'):
+        assert manifest.serve(request).status_code == 404
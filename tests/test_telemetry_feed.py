@@ -0,0 +1,60 @@
+import json
+import threading
+import time
+from pty_device import make_sample
+
+def publish(server, i):
+    server.fan_out_telemetry(server.EncodedFrame(make_sample(i, 1000 + i * 10)))
+
+def test_latest_snapshot_projects_fields_and_revalidates(server, server_app):
+    client = server_app.test_client()
+    publish(server, 1)
+    response = client.get('/api/telemetry/latest?fields=pressure')
+    assert response.status_code == 200
+    assert sorted(response.get_json()) == ['pressure', 'status', 'time']
+    seq = int(response.headers['X-Telemetry-Seq'])
+    assert seq == server.FRAME_FEED.seq
+
+    cached = client.get('/api/telemetry/latest?fields=pressure', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    other = client.get('/api/telemetry/latest')
+    assert other.headers['ETag'] != response.headers['ETag']
+
+    publish(server, 2)
+    fresh = client.get('/api/telemetry/latest?fields=pressure', headers={'If-None-Match': response.headers['ETag']})
+    assert fresh.status_code == 200 and fresh.get_json()['time'] == 1020
+
+def test_long_poll_waits_for_next_frame(server, server_app):
+    client = server_app.test_client()
+    publish(server, 1)
+    after = server.FRAME_FEED.seq
+
+    timer = threading.Timer(0.1, publish, (server, 2))
+    timer.start()
+    started = time.monotonic()
+    response = client.get(f'/api/telemetry/wait?after={after}&timeout=5')
+    timer.join()
+    assert response.status_code == 200
+    assert 0.05 <= time.monotonic() - started < 5
+    assert int(response.headers['X-Telemetry-Seq']) == after + 1
+    assert response.get_json()['time'] == 1020
+
+    empty = client.get(f'/api/telemetry/wait?after={after + 1}&timeout=0.05')
+    assert empty.status_code == 204
+
+def test_event_stream_sends_latest_frame(server, server_app):
+    client = server_app.test_client()
+    publish(server, 3)
+    response = client.get('/api/telemetry/stream?fields=voltage', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.response
+    try:
+        assert next(chunks).decode() == 'retry: 1000\n\n'
+        event = next(chunks).decode()
+    finally:
+        response.close()
+    lines = event.strip().split('\n')
+    assert lines[0] == f'id: {server.FRAME_FEED.boot_id}-{server.FRAME_FEED.seq}'
+    data = json.loads(lines[1][len('data: '):])
+    assert sorted(data) == ['status', 'time', 'voltage'] and data['time'] == 1030
+    assert server.FRAME_FEED.streams == 0
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import pytest
+import serial
+from conftest import received
+from binary_frames import FORMAT_BINARY, FrameError, decode_frame
+from frame_reader import FrameReader
+from pty_device import make_sample
+from telemetry_history import TelemetryRing
+
+FIELDS = ['time', 'status', 'pressure', 'bmp_altitude', 'voltage']
+
+def fill(ring, count, start=1000.0, step=0.01, gaps=None):
+    for i in range(count):
+        sample = make_sample(i, i * 10)
+        if gaps is not None:
+            sample.update({name: None for name in gaps(i)})
+        ring.append(sample, start + i * step)
+
+def test_query_window_and_now():
+    ring = TelemetryRing(capacity=1024, fields=FIELDS)
+    fill(ring, 500)
+    result = ring.query(seconds=1.0, fields=['bmp_altitude', 'unknown'])
+    assert result['fields'] == ['bmp_altitude']
+    assert result['count'] == 101
+    assert result['t'][-1] == pytest.approx(1004.99)
+    assert result['now'] == pytest.approx(time.time(), abs=5.0)
+    since = ring.query(since=result['t'][-3])
+    assert since['count'] == 2
+
+def test_query_wraps_and_keeps_gaps_as_none():
+    ring = TelemetryRing(capacity=256, fields=FIELDS)
+    fill(ring, 600, gaps=lambda i: ('pressure',) if i % 2 else ())
+    result = ring.query(seconds=None)
+    assert result['count'] == 256
+    assert result['values']['time'][0] == 3440
+    assert result['values']['pressure'][1::2] == [None] * 128
+    assert None not in result['values']['pressure'][0::2]
+
+def test_binary_query_round_trips():
+    ring = TelemetryRing(capacity=128, fields=FIELDS)
+    fill(ring, 50)
+    result = ring.query(seconds=None, binary=True)
+    times = np.frombuffer(result['t'], dtype=np.float64)
+    altitude = np.frombuffer(result['values']['bmp_altitude'], dtype=np.float32)
+    assert len(times) == len(altitude) == 50
+    assert altitude[10] == pytest.approx(make_sample(10, 0)['bmp_altitude'], abs=1e-3)
+
+def test_history_from_pty_stream(pty_device):
+    device = pty_device(FORMAT_BINARY, rate_hz=500.0)
+    conn = serial.Serial(device.port, 115200, timeout=0.1)
+    reader = FrameReader(conn, frame_format=FORMAT_BINARY)
+    ring = TelemetryRing(capacity=1024)
+    device.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while ring.total < 200 and time.monotonic() < deadline:
+            for frame in reader.read_frames():
+                try:
+                    ring.append(decode_frame(frame))
+                except FrameError:
+                    pass
+    finally:
+        conn.close()
+
+    result = ring.query(seconds=None, fields=['time', 'bmp_altitude'])
+    assert ring.total >= 200
+    assert result['count'] == ring.total
+    assert result['values']['time'] == sorted(result['values']['time'])
+
+def test_history_request_catches_up_late_joiner(server, connect):
+    for i in range(20):
+        server.TELEMETRY_HISTORY.append(make_sample(i, i * 10))
+    client = connect(id='late')
+    client.get_received()
+    client.emit('history_request', {'seconds': 60, 'fields': ['time', 'bmp_altitude']})
+    history = received(client, 'history_data')[-1]
+    assert history['fields'] == ['time', 'bmp_altitude']
+    assert history['values']['time'][-1] == 190
+    assert history['t'][-1] <= history['now']
+
+def test_history_endpoint(server, server_app):
+    server.TELEMETRY_HISTORY.append(make_sample(0, 12345))
+    response = server_app.test_client().get('/api/history?seconds=5&fields=time,voltage')
+    assert response.status_code == 200
+    assert response.json['values']['time'][-1] == 12345
+    assert set(response.json['values']) == {'time', 'voltage'}
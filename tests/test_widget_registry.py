@@ -0,0 +1,34 @@
+import json
+from conftest import received
+from pty_device import make_sample
+from widget_registry import load_manifest, scan_widgets, write_manifest
+
+def write_widget(path, name, body):
+    (path / f'{name}.tsx').write_text(f"import React from 'react';\n\n{body}\n\nexport const {name}: React.FC = () => null;\n")
+
+def test_widgets_declare_their_fields(tmp_path):
+    write_widget(tmp_path, 'SpeedWidget', "export const telemetryFields = ['vertical_velocity', \"time\"];")
+    write_widget(tmp_path, 'LogoWidget', "const title = 'SPARK';")
+    assert scan_widgets(str(tmp_path)) == {'LogoWidget': None, 'SpeedWidget': ['time', 'vertical_velocity']}
+
+    manifest = tmp_path / 'widgets.json'
+    write_manifest(str(manifest), str(tmp_path))
+    assert load_manifest(str(manifest)) == scan_widgets(str(tmp_path))
+
+def test_legacy_manifest_has_unknown_fields(tmp_path):
+    manifest = tmp_path / 'widgets.json'
+    manifest.write_text(json.dumps(['MapWidget', 'AltitudeWidget']))
+    assert load_manifest(str(manifest)) == {'AltitudeWidget': None, 'MapWidget': None}
+
+def test_repo_widgets_all_declare_fields(server):
+    assert server.AVAILABLE_WIDGETS
+    assert sorted(server.WIDGET_FIELDS) == server.AVAILABLE_WIDGETS
+    assert server.WIDGET_FIELDS['MapWidget'] == ['latitude', 'longitude']
+
+def test_viewer_receives_declared_fields_only(server, connect):
+    server.GLOBAL_WIDGETS = ['AltitudeWidget']
+    viewer = connect(id='alt-only')
+    viewer.get_received()
+    server.fan_out_telemetry(server.EncodedFrame(make_sample(1, 1000)))
+    [update] = received(viewer, 'data_update')
+    assert sorted(update) == ['bmp_altitude', 'status', 'time']